@@ -0,0 +1,156 @@
+import time
+import threading
+
+import upbit_http
+
+# -----------------------------------------------------------------------------
+# 계좌 잔고 캐시
+# -----------------------------------------------------------------------------
+class AccountState:
+    """
+    /v1/accounts 응답을 한 곳에 보관하는 잔고 캐시.
+    - 타이머(기본 5초)로 갱신하고, 주문 요청이 나가면 즉시 + 잠시 후(체결 반영) 다시 갱신합니다.
+    - 갱신할 때마다 version이 1씩 올라가므로, 소비자는 version으로 새 잔고인지 확인할 수 있습니다.
+    - 주문 직후 아직 갱신되지 않은 상태(dirty)에서 읽으면 그 자리에서 새로 조회해서 돌려줍니다.
+    """
+    def __init__(self, upbit, refresh_interval=5, follow_up_delays=(1.0, 3.0), balances=None):
+        self.upbit = upbit
+        self.refresh_interval = refresh_interval
+        self.follow_up_delays = follow_up_delays
+        self.version = 0
+        self.updated_at = 0.0
+        self._balances = []
+        self._by_market = {}
+        self._dirty = True
+        self._running = False
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._listeners = []
+        if balances is not None:
+            self._set(balances)
+        upbit_http.add_order_listener(self.notify_order)
+
+    # --- 갱신 ---------------------------------------------------------------
+    def _set(self, balances):
+        by_market = {f"KRW-{b['currency']}": b for b in balances if b['currency'] != 'KRW'}
+        with self._lock:
+            self._balances = list(balances)
+            self._by_market = by_market
+            self.version += 1
+            self.updated_at = time.time()
+            self._dirty = False
+            version = self.version
+        for listener in list(self._listeners):
+            try:
+                listener(version)
+            except Exception as e:
+                print(f"❗️ 잔고 갱신 알림 오류: {e}")
+
+    def refresh(self):
+        """잔고를 새로 조회. 동시에 여러 곳에서 호출돼도 실제 요청은 한 번만 나갑니다."""
+        version_before = self.version
+        with self._refresh_lock:
+            if self.version != version_before and not self._dirty:
+                return  # 기다리는 동안 다른 스레드가 이미 갱신함
+            with upbit_http.request_priority(upbit_http.PRIORITY_ACCOUNT):
+                balances = self.upbit.get_balances()
+            if not isinstance(balances, list):
+                raise ValueError(f"잔고 조회 응답 오류: {balances}")
+            self._set(balances)
+
+    def _refresh_quietly(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"❗️ 잔고 갱신 오류: {e}")
+
+    def notify_order(self, *args):
+        """주문이 나갔음을 알림. 즉시 갱신하고, 체결이 반영되도록 조금 뒤에 한 번 더 갱신합니다."""
+        self._dirty = True
+        threading.Thread(target=self._refresh_after_order, daemon=True).start()
+
+    def _refresh_after_order(self):
+        self._refresh_quietly()
+        for delay in self.follow_up_delays:
+            time.sleep(delay)
+            self._refresh_quietly()
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        threading.Thread(target=self._timer_worker, daemon=True).start()
+
+    def stop(self):
+        self._running = False
+
+    def _timer_worker(self):
+        while self._running:
+            if time.time() - self.updated_at >= self.refresh_interval:
+                self._refresh_quietly()
+            time.sleep(0.5)
+
+    def add_listener(self, listener):
+        """잔고가 갱신될 때마다 listener(version)를 호출 (워커 스레드에서 호출됨)."""
+        self._listeners.append(listener)
+
+    # --- 조회 ---------------------------------------------------------------
+    def _ensure_fresh(self):
+        if self._dirty:
+            self._refresh_quietly()
+
+    def get_balances(self):
+        """pyupbit get_balances()와 같은 형식의 잔고 목록."""
+        self._ensure_fresh()
+        with self._lock:
+            return list(self._balances)
+
+    def balances_by_market(self):
+        """{'KRW-BTC': 잔고 dict, ...} (KRW 제외)."""
+        self._ensure_fresh()
+        return self.cached_by_market()
+
+    def cached_by_market(self):
+        """balances_by_market과 같지만 갱신이 필요해도 조회하지 않고 마지막 값을 반환 (Tk 스레드용)."""
+        with self._lock:
+            return dict(self._by_market)
+
+    def _account(self, market):
+        currency = market.split('-')[1] if '-' in market else market
+        self._ensure_fresh()
+        with self._lock:
+            return next((b for b in self._balances if b['currency'] == currency), None)
+
+    def balance(self, market):
+        """주문 가능 수량 (pyupbit get_balance와 같이 locked 제외)."""
+        account = self._account(market)
+        return float(account['balance']) if account else 0.0
+
+    def avg_buy_price(self, market):
+        account = self._account(market)
+        return float(account.get('avg_buy_price', 0)) if account else 0.0
+
+
+class CapitalBudget:
+    """
+    한 번의 자동매매 루프에서 여러 종목이 같이 쓰는 KRW 예산.
+    루프 시작 시 잔고로 만들고, 매수할 때마다 allocate로 차감하므로 잔고 갱신이 늦어도 초과 주문하지 않습니다.
+    """
+    def __init__(self, total):
+        self.total = max(0.0, float(total))
+        self.remaining = self.total
+        self._lock = threading.Lock()
+
+    def allocate(self, amount, minimum=0.0):
+        """amount(남은 예산까지)를 차감해 돌려줌. minimum보다 적게 남았으면 차감 없이 0."""
+        with self._lock:
+            granted = min(float(amount), self.remaining)
+            if granted < minimum or granted <= 0:
+                return 0.0
+            self.remaining -= granted
+            return granted
+
+    def release(self, amount):
+        """주문 실패 등으로 쓰지 않은 금액을 돌려놓음."""
+        with self._lock:
+            self.remaining = min(self.total, self.remaining + float(amount))
@@ -8,6 +8,7 @@ import mplfinance as mpf
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import threading
+import multiprocessing
 import time
 import platform
 import os
@@ -15,10 +16,33 @@ import requests
 from queue import Queue, Empty
 import json
 from datetime import datetime, timedelta
-from scipy.signal import find_peaks
+from candle_store import CandleStore
+from timeframes import TimeframeStore
+from upbit_ws import UpbitRealtimeFeed
+from candle_builder import CandleBuilder
+from scheduler import CandleScheduler, PriceMoveTrigger, TICK, server_clock
+import upbit_http
+from account_state import AccountState
+from indicator_engine import IndicatorEngine, BASE_COLUMNS, EXTRA_COLUMNS
+from divergence import detect_divergences, recent_signal
+from indicator_columns import columns_of, ensure_columns
+from market_data import MarketMetadataCache, MarketSnapshot, TickerDeltaTracker, fetch_tickers, has_changes
+from screener import MarketMatrix, StrategyScreener
+from signal_fusion import SignalFusion
+import strategy_rules
 from tkinter import filedialog
 import traceback
 
+# pyupbit 내부 요청까지 모두 전역 요청 스케줄러(그룹별 속도 제한, 우선순위)를 거치도록 설정
+upbit_http.install()
+server_clock.attach()   # REST 응답 Date 헤더로 서버 시각 추정 (자동매매 루프가 1분봉 마감 시각 계산에 사용)
+
+# -----------------------------------------------------------------------------
+# 용도별로 필요한 지표 컬럼 (요청한 컬럼과 그 의존 컬럼만 계산)
+# -----------------------------------------------------------------------------
+CHART_COLUMNS = columns_of('trend', 'bands_volume') + ['mfi']          # MA/BB 오버레이, 거래량 MA, OBV, MFI 패널
+TRADE_COLUMNS = ['ma5', 'ma20', 'ma60', 'rsi', 'bb_lower'] + columns_of('div_obv')   # 시장 상태, 매수/매도, OBV 다이버전스
+
 # -----------------------------------------------------------------------------
 # 한글 폰트 설정
 # -----------------------------------------------------------------------------
@@ -43,33 +67,43 @@ def select_login_file():
     root.destroy()
     return file_path
 
-login_file = select_login_file()
-if not login_file:
-    messagebox.showerror("로그인 파일 오류", "login.txt 파일을 선택하지 않았습니다. 프로그램을 종료합니다.")
-    exit()
-
-try:
-    with open(login_file, "r") as f:
-        lines = f.readlines()
-        if len(lines) < 3:
-            raise ValueError("파일에 access key, secret key, 자동매매 비밀번호가 모두 필요합니다.")
-        access = lines[0].strip()
-        secret = lines[1].strip()
-        trade_password = lines[2].strip()
-except FileNotFoundError:
-    messagebox.showerror("로그인 파일 오류", "login.txt 파일을 찾을 수 없습니다.\n선택한 파일을 확인해주세요.")
-    exit()
-except Exception as e:
-    messagebox.showerror("로그인 파일 오류", f"login.txt 파일 처리 중 오류가 발생했습니다.\n\n{e}")
-    exit()
-
-try:
-    upbit = pyupbit.Upbit(access, secret)
-    balances = upbit.get_balances()
-    print("✅ 업비트 로그인 성공")
-except Exception as e:
-    messagebox.showerror("로그인 실패", f"API 키가 유효하지 않거나 네트워크에 문제가 있습니다.\nlogin.txt 파일을 확인해주세요.\n\n{e}")
-    exit()
+# 스크리너 프로세스 풀 워커(spawn)는 이 파일을 '__mp_main__'으로 다시 불러오므로 로그인은 메인 프로세스에서만
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    login_file = select_login_file()
+    if not login_file:
+        messagebox.showerror("로그인 파일 오류", "login.txt 파일을 선택하지 않았습니다. 프로그램을 종료합니다.")
+        exit()
+
+    try:
+        with open(login_file, "r") as f:
+            lines = f.readlines()
+            if len(lines) < 3:
+                raise ValueError("파일에 access key, secret key, 자동매매 비밀번호가 모두 필요합니다.")
+            access = lines[0].strip()
+            secret = lines[1].strip()
+            trade_password = lines[2].strip()
+    except FileNotFoundError:
+        messagebox.showerror("로그인 파일 오류", "login.txt 파일을 찾을 수 없습니다.\n선택한 파일을 확인해주세요.")
+        exit()
+    except Exception as e:
+        messagebox.showerror("로그인 파일 오류", f"login.txt 파일 처리 중 오류가 발생했습니다.\n\n{e}")
+        exit()
+
+    try:
+        upbit = pyupbit.Upbit(access, secret)
+        balances = upbit.get_balances()
+        print("✅ 업비트 로그인 성공")
+    except Exception as e:
+        messagebox.showerror("로그인 실패", f"API 키가 유효하지 않거나 네트워크에 문제가 있습니다.\nlogin.txt 파일을 확인해주세요.\n\n{e}")
+        exit()
+
+    # 로컬 캔들 저장소 (candle_cache/ 폴더에 종목·주기별로 보관)
+    # minute3~240은 minute1, 주봉은 일봉을 묶어서 만들어 종목당 기본 주기 캔들만 조회
+    candle_store = TimeframeStore(CandleStore())
+
+    # 계좌 잔고 캐시 (모든 잔고 조회는 여기서 읽고, 타이머와 주문 직후에 갱신)
+    account_state = AccountState(upbit, balances=balances)
 
 # -----------------------------------------------------------------------------
 # 2. GUI 클래스 및 기능
@@ -89,7 +123,6 @@ class UpbitChartApp(tk.Tk):
         self.selected_interval = tk.StringVar(value='day')
         self.current_price = 0.0
         self.avg_buy_price = 0.0
-        self.balances_data = {}
         self.krw_balance = 0.0
         self.coin_balance = 0.0
         self.master_df = None
@@ -98,12 +131,31 @@ class UpbitChartApp(tk.Tk):
         self.current_chart_ticker = None
         self._ignore_market_select_event = False
         self.data_queue = Queue()
+        # 실시간 시세(WebSocket): 선택 종목 체결가를 받아 차트에 반영, 끊겨 있는 동안만 REST 폴링
+        # 체결(trade)로는 로컬 캔들을 만들어 새 봉을 이어 붙이고 지표 계산에도 사용
+        self.candle_builder = CandleBuilder()
+        # (종목, 주기)별 증분 지표 (새 봉/마지막 봉만 다시 계산). RSI는 14개가 쌓여야 계산, 하락폭이 0이면 100
+        self.indicator_engine = IndicatorEngine(rsi_min_periods=14, nan_on_zero_loss=False)
+        self.realtime_feed = UpbitRealtimeFeed(on_ticker=self._on_realtime_ticker,
+                                               on_trade=self._on_realtime_trade,
+                                               on_reconnect=self._on_realtime_reconnect)
+        self.strategy_scheduler = None
+        self.tick_trigger = PriceMoveTrigger()
+        self.live_ticker = None
+        self.live_interval = None
+        self._live_price = None
+        self._live_price_pending = False
 
         self.ma_vars = {'5': tk.BooleanVar(value=True), '20': tk.BooleanVar(value=True), '60': tk.BooleanVar(), '120': tk.BooleanVar()}
         self.bb_var = tk.BooleanVar(value=True)
         self.is_panning = False
         self.pan_start_pos = None
 
+        self.market_meta = MarketMetadataCache()  # 마켓 목록/유의·정지 상태 (스냅샷 + 느린 주기 갱신)
+        self.market_delta = TickerDeltaTracker()   # 직전 시세 대비 바뀐 값만 GUI로 전달
+        self.market_screener = MarketMatrix()      # KRW 마켓 전체 (종목 x 시간) 지표 매트릭스
+        self._screener_seeding = False
+        self.strategy_screener = StrategyScreener()  # 전략 규칙을 전체 종목에 평가 (프로세스 풀)
         self.ticker_to_display_name = {}
         self.display_name_to_ticker = {}
         self.market_data = []
@@ -134,6 +186,12 @@ class UpbitChartApp(tk.Tk):
         self.load_my_tickers()
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
 
+    @property
+    def balances_data(self):
+        # 보유 코인 잔고 {'KRW-BTC': {...}} - 잔고 캐시(account_state)의 마지막 값 (GUI에서 읽으므로 REST 조회 없음,
+        # 갱신은 타이머/주문 스레드가 담당). 주문 판단에는 account_state.balances_by_market()을 사용
+        return account_state.cached_by_market()
+
     def load_auto_trade_settings(self):
         try:
             with open("auto_trade_settings.json", "r", encoding="utf-8") as f:
@@ -155,6 +213,8 @@ class UpbitChartApp(tk.Tk):
         print("💾 자동매매 설정 저장 완료.")
 
     def start_worker_threads(self):
+        account_state.start()
+        self.realtime_feed.start()
         data_worker = threading.Thread(target=self.data_update_worker, daemon=True)
         data_worker.start()
         self.process_queue()
@@ -162,22 +222,24 @@ class UpbitChartApp(tk.Tk):
     def data_update_worker(self):
         counter = 0
         while self.is_running:
-            self.fetch_current_price()
+            if not self.realtime_feed.is_connected:
+                self.fetch_current_price()
             if counter % 5 == 0: self._fetch_portfolio_data_worker()
             if counter % 10 == 0: self._fetch_market_data_worker()
             time.sleep(1)
             counter += 1
 
+    def _add_ticker_name(self, market_info):
+        market, korean_name, symbol = market_info['market'], market_info['korean_name'], market_info['market'].split('-')[1]
+        display_name = f"{korean_name}({symbol})"
+        self.ticker_to_display_name[market], self.display_name_to_ticker[display_name] = display_name, market
+
     def load_ticker_names(self):
         print("🔍 종목 이름 정보를 로드합니다...")
         try:
-            url = "https://api.upbit.com/v1/market/all?isDetails=true"
-            response = requests.get(url); response.raise_for_status()
-            for market_info in response.json():
-                if market_info['market'].startswith('KRW-'):
-                    market, korean_name, symbol = market_info['market'], market_info['korean_name'], market_info['market'].split('-')[1]
-                    display_name = f"{korean_name}({symbol})"
-                    self.ticker_to_display_name[market], self.display_name_to_ticker[display_name] = display_name, market
+            # 스냅샷이 있으면 네트워크 없이 바로 사용 (최신 목록은 마켓 워커가 갱신)
+            if not self.market_meta.markets: self.market_meta.refresh()
+            for market_info in self.market_meta.markets.values(): self._add_ticker_name(market_info)
             print("✅ 종목 이름 정보 로드 완료.")
         except Exception as e: print(f"❗️ 종목 이름 정보 로드 실패: {e}\n종목 코드를 그대로 사용합니다.")
 
@@ -296,11 +358,15 @@ class UpbitChartApp(tk.Tk):
                 enabled_count = len(self.auto_trade_settings.get('enabled_tickers', []))
                 total_limit = self.auto_trade_settings.get('total_investment_limit', 5000)
                 self.log_auto_trade(f"▶️ 자동매매 시작 (대상: {enabled_count}개, 총 투자한도: {total_limit:,.0f}원)")
+                self._refresh_realtime_codes()
                 self.auto_trade_thread = threading.Thread(target=self.auto_trade_worker, daemon=True)
                 self.auto_trade_thread.start()
             else: messagebox.showerror("인증 실패", "비밀번호가 일치하지 않습니다.")
         else:
             self.is_auto_trading = False
+            if self.strategy_scheduler is not None:
+                self.strategy_scheduler.stop()
+            self._refresh_realtime_codes()
             self.auto_trade_toggle_button.config(text="자동매매 켜기", style="Off.TButton")
             self.log_auto_trade("⏹️ 자동매매 중지")
 
@@ -337,20 +403,21 @@ class UpbitChartApp(tk.Tk):
         if ma5 < ma20 < ma60 and ma20_slope < 0: return '하락장'
         return '횡보장'
 
-    def _check_obv_divergence(self, df, period=60):
+    def _check_obv_divergence(self, df, period=60, lookback=5):
+        # 최근 lookback개 봉 안에서 확정된 OBV regular 다이버전스 (div_obv_* 컬럼, 없으면 직접 계산)
         if df is None or len(df) < period:
             return None, None
-        
-        price_high = df['high'].iloc[-period:]
-        obv_high = df['obv'].iloc[-period:]
-        if price_high.iloc[-1] >= price_high.max() * 0.98 and obv_high.iloc[-1] < obv_high.max() * 0.9:
-             return "Bearish", "OBV 약세 다이버전스(매도) 의심"
-
-        price_low = df['low'].iloc[-period:]
-        obv_low = df['obv'].iloc[-period:]
-        if price_low.iloc[-1] <= price_low.min() * 1.02 and obv_low.iloc[-1] > obv_low.min() * 1.1:
+        recent = df.iloc[-period:]
+        if 'div_obv_regular_bearish' in recent.columns:
+            divs = {kind: recent[f'div_obv_{kind}'].to_numpy() for kind in ('regular_bearish', 'regular_bullish')}
+        else:
+            found = detect_divergences(recent, oscillators=('obv',))
+            divs = {kind: found[f'div_obv_{kind}'] for kind in ('regular_bearish', 'regular_bullish')}
+
+        if recent_signal(divs['regular_bearish'], lookback):
+            return "Bearish", "OBV 약세 다이버전스(매도) 의심"
+        if recent_signal(divs['regular_bullish'], lookback):
             return "Bullish", "OBV 강세 다이버전스(매집) 의심"
-            
         return None, None
 
     def auto_trade_worker(self):
@@ -359,39 +426,50 @@ class UpbitChartApp(tk.Tk):
         SIDEWAYS_MAX_BUY_COUNT = 3
         TREND_MAX_BUY_COUNT = 5
         MIN_HOLD_CANDLES = 3
+        # 1분봉 마감 직후(서버 시각 기준)에 한 사이클씩 평가하고, 그 사이에는 대상 종목 체결가가
+        # 마지막 평가 가격 대비 tick_trigger_pct(%) 이상 움직였을 때만 바로 다시 평가 (손절/익절 지연 최소화)
+        self.strategy_scheduler = scheduler = CandleScheduler(['minute1'])
 
         while self.is_running and self.is_auto_trading:
             try:
                 trend_ratio = self.auto_trade_settings.get('trend_investment_ratio', 0.25)
+                self.tick_trigger.threshold = self.auto_trade_settings.get('tick_trigger_pct', 1.0) / 100 or float('inf')
                 sideways_ratio = self.auto_trade_settings.get('sideways_investment_ratio', 0.15)
 
-                current_krw_balance = upbit.get_balance("KRW")
-                if current_krw_balance is None:
-                    self.log_auto_trade("⚠️ KRW 잔액 조회 실패. 다음 루프에서 재시도합니다.")
+                enabled_tickers = self.auto_trade_settings.get('enabled_tickers', [])
+                if not enabled_tickers:
+                    time.sleep(30)
+                    continue
+
+                # 이번 사이클의 현재가(전 종목 1회)와 잔고(1회)를 한 번에 조회해 모든 종목 판단에 사용
+                try:
+                    snapshot = MarketSnapshot.build(upbit, [t for t in enabled_tickers if not self.market_meta.is_suspended(t)],
+                                                    balances=account_state.get_balances())
+                except Exception as e:
+                    self.log_auto_trade(f"⚠️ 시세/잔액 조회 실패: {e}. 다음 루프에서 재시도합니다.")
                     time.sleep(10)
                     continue
+                current_krw_balance = snapshot.balance("KRW")
                 
                 investment_limit_from_settings = self.auto_trade_settings.get('total_investment_limit', float('inf'))
                 effective_total_investment = min(current_krw_balance, investment_limit_from_settings)
-                
-                enabled_tickers = self.auto_trade_settings.get('enabled_tickers', [])
-                if not enabled_tickers:
-                    time.sleep(30)
-                    continue
 
                 for ticker in enabled_tickers:
                     if not self.is_running or not self.is_auto_trading: break
 
+                    if self.market_meta.is_suspended(ticker): continue  # 거래정지/거래지원 종료 종목은 건너뜀
+
                     if ticker not in trade_states:
                         trade_states[ticker] = {'has_coin': False, 'buy_price': 0, 'buy_amount': 0, 'buy_count': 0, 
                                                 'last_logged_profit_rate': 0, 'last_logged_market_state': '', 'strategy': None,
                                                 'buy_time': None, 'buy_candle_count': 0, 'max_profit_rate': 0.0}
 
-                    df = self.get_technical_indicators(ticker, interval='minute1', count=200)
+                    df = self.get_technical_indicators(ticker, interval='minute1', count=200, columns=TRADE_COLUMNS)
                     if df is None: time.sleep(1); continue
 
-                    current_price = pyupbit.get_current_price(ticker)
+                    current_price = snapshot.price(ticker)
                     if current_price is None: time.sleep(1); continue
+                    self.tick_trigger.reset(ticker, current_price)
                     
                     market_state = self.get_market_state(df)
                     
@@ -400,12 +478,12 @@ class UpbitChartApp(tk.Tk):
                     trend_buy_amount_per_trade = trend_total_investment / TREND_MAX_BUY_COUNT
                     sideways_buy_amount_per_trade = sideways_total_investment / SIDEWAYS_MAX_BUY_COUNT
 
-                    balance = upbit.get_balance(ticker)
+                    balance = snapshot.balance(ticker)
                     state = trade_states[ticker]
                     state['has_coin'] = balance > 0
                     
                     if state['has_coin']:
-                        state['buy_price'] = float(upbit.get_avg_buy_price(ticker))
+                        state['buy_price'] = snapshot.avg_buy_price(ticker)
                         state['buy_amount'] = balance
                         
                         if state.get('strategy') is None:
@@ -581,112 +659,142 @@ class UpbitChartApp(tk.Tk):
                             if buy_signal:
                                 if buy_coin('trend_follow', trend_buy_amount_per_trade, f"신규매수 | 사유: {reason}"):
                                     continue
-                    time.sleep(2)
-                time.sleep(15)
+                scheduler.wait_next()
+                if scheduler.stopped: break   # 자동매매를 끄면 다시 켜졌더라도 이 스레드는 종료 (새 스레드가 이어받음)
 
             except Exception as e:
                 self.log_auto_trade(f"‼️ 자동매매 루프 오류: {e}")
                 self.log_auto_trade(traceback.format_exc())
                 time.sleep(60)
+        if self.strategy_scheduler is scheduler:
+            self.strategy_scheduler = None
         self.log_auto_trade("🤖 다중 종목 자동매매 로직 종료.")
 
-    def get_technical_indicators(self, ticker, interval='day', count=200):
+    def get_technical_indicators(self, ticker, interval='day', count=200, key=None, columns=CHART_COLUMNS):
         try:
-            df = pyupbit.get_ohlcv(ticker, interval=interval, count=count)
+            # 실시간 체결로 만든 캔들이 충분하면 REST 조회 없이 사용
+            df = self.candle_builder.get_frame(ticker, interval, count) if self.realtime_feed.is_connected else None
+            if df is None:
+                df = candle_store.get_ohlcv(ticker, interval=interval, count=count)
+                if ticker in self.realtime_feed.codes:
+                    self.candle_builder.seed(ticker, interval, df)
             if df is None: return None
-            return self.get_technical_indicators_from_raw(df)
+            return self.get_technical_indicators_from_raw(df, key=key or (ticker, interval, count), columns=columns)
         except Exception as e:
             print(f"❗️ {ticker} 지표 계산 오류: {e}")
             return None
 
-    def get_technical_indicators_from_raw(self, df, min_length=20):
+    def get_technical_indicators_from_raw(self, df, min_length=20, key=None, columns=CHART_COLUMNS):
         if df is None or len(df) < min_length: return None
         df = df.copy() 
 
-        for p in [5, 20, 60, 120]: df[f'ma{p}'] = df['close'].rolling(window=p, min_periods=1).mean()
+        # columns(와 의존 컬럼)만 계산 - MA/RSI/MACD/BB/OBV/거래량 MA는 key(종목, 주기, 용도)를 주면 새 봉/마지막 봉만 계산
+        # (MFI/VWAP/CMF/A/D, macd_hist, div_* 다이버전스는 요청할 때만)
+        return ensure_columns(df, columns, engine=self.indicator_engine, key=key)
         
-        delta = df['close'].diff(1); gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['rsi'] = 100 - (100 / (1 + rs))
-
-        df['ema12'] = df['close'].ewm(span=12, adjust=False).mean()
-        df['ema26'] = df['close'].ewm(span=26, adjust=False).mean()
-        df['macd'] = df['ema12'] - df['ema26']; df['signal'] = df['macd'].ewm(span=9, adjust=False).mean()
-        
-        df['bb_middle'] = df['close'].rolling(window=20).mean()
-        df['bb_std'] = df['close'].rolling(window=20).std()
-        df['bb_upper'] = df['bb_middle'] + (df['bb_std'] * 2)
-        df['bb_lower'] = df['bb_middle'] - (df['bb_std'] * 2)
-        
-        obv = (np.sign(df['close'].diff()) * df['volume']).fillna(0).cumsum()
-        df['obv'] = obv
-        df['obv_ema'] = df['obv'].ewm(com=20).mean()
-        
-        typical_price = (df['high'] + df['low'] + df['close']) / 3
-        money_flow = typical_price * df['volume']
-        
-        positive_flow_values = [money_flow.iloc[i] if typical_price.iloc[i] > typical_price.iloc[i-1] else 0 for i in range(1, len(typical_price))]
-        negative_flow_values = [money_flow.iloc[i] if typical_price.iloc[i] < typical_price.iloc[i-1] else 0 for i in range(1, len(typical_price))]
-
-        positive_flow = pd.Series(positive_flow_values, index=typical_price.index[1:])
-        negative_flow = pd.Series(negative_flow_values, index=typical_price.index[1:])
-        
-        positive_mf_14 = positive_flow.rolling(14).sum()
-        negative_mf_14 = negative_flow.rolling(14).sum()
-
-        money_ratio = positive_mf_14 / negative_mf_14
-        money_ratio = money_ratio.replace([np.inf, -np.inf], 0)
-
-        df['mfi'] = 100 - (100 / (1 + money_ratio))
-        df['mfi'] = df['mfi'].fillna(50)
+    def _refresh_market_meta(self):
+        # 마켓 목록은 느린 주기로만 갱신하고, 바뀐 것(diff)이 있을 때만 GUI/자동매매에 알림
+        if not self.market_meta.needs_refresh():
+            return
+        try:
+            diff = self.market_meta.refresh()
+        except Exception as e:
+            print(f"❗️ 마켓 정보 갱신 실패 (이전 목록 사용): {e}")
+            return
+        if has_changes(diff):
+            self.data_queue.put(("update_market_meta", diff))
+
+    def _apply_market_meta_diff(self, diff):
+        for market in diff['listed']:
+            market_info = self.market_meta.markets.get(market)
+            if market_info:
+                self._add_ticker_name(market_info)
+            print(f"🆕 신규 상장: {self.ticker_to_display_name.get(market, market)}")
+        for market in diff['delisted']:
+            print(f"⛔ 거래지원 종료: {self.ticker_to_display_name.get(market, market)}")
+        for market, old, new in diff['warning_changed']:
+            print(f"⚠️ 유의/정지 상태 변경: {self.ticker_to_display_name.get(market, market)} ({old} → {new})")
+        enabled_tickers = set(self.auto_trade_settings.get('enabled_tickers', []))
+        changed = set(diff['delisted']) | {market for market, _, _ in diff['warning_changed']}
+        for market in sorted(enabled_tickers & changed):
+            state = "거래정지" if self.market_meta.is_suspended(market) else self.market_meta.markets.get(market, {}).get('market_warning', 'NONE')
+            self.log_auto_trade(f"⚠️ 자동매매 대상 {self.ticker_to_display_name.get(market, market)} 상태 변경: {state}")
+
+    def _put_market_update(self, market_data):
+        # 종목 구성이 바뀌었을 때만 전체 목록을, 평소에는 바뀐 값만 GUI로 보냄
+        delta = self.market_delta.update(market_data)
+        if delta['added'] or delta['removed']:
+            self.data_queue.put(("update_market", market_data))
+        elif delta['changed']:
+            self.data_queue.put(("update_market_delta", delta['changed']))
 
-        df['volume_ma20'] = df['volume'].rolling(window=20, min_periods=1).mean()
-        return df
-        
     def _fetch_market_data_worker(self):
         try:
-            url_market_info = "https://api.upbit.com/v1/market/all?isDetails=true"
-            res_market_info = requests.get(url_market_info)
-            res_market_info.raise_for_status()
-            
-            live_market_data = {item['market']: item for item in res_market_info.json() if item['market'].startswith('KRW-')}
-
-            initial_krw_tickers = set(self.ticker_to_display_name.keys())
-            live_krw_tickers = set(live_market_data.keys())
-            
-            suspended_tickers = initial_krw_tickers - live_krw_tickers
-            
-            if suspended_tickers:
-                print(f"ℹ️ API 목록에서 제외된 종목 발견 (거래지원 종료 간주): {suspended_tickers}")
-
-            for ticker in suspended_tickers:
-                korean_name = self.ticker_to_display_name.get(ticker, ticker).split('(')[0]
-                live_market_data[ticker] = {'market': ticker, 'korean_name': korean_name, 'market_warning': 'TRADING_SUSPENSION'}
-            
-            all_market_data = live_market_data
-            
-            krw_tickers = list(all_market_data.keys())
-            tickers_for_price_check = [t for t in krw_tickers if t not in suspended_tickers]
-            
-            if tickers_for_price_check:
-                url_ticker_price = f"https://api.upbit.com/v1/ticker?markets={','.join(tickers_for_price_check)}"
-                res_ticker_price = requests.get(url_ticker_price)
-                res_ticker_price.raise_for_status()
-                price_data = {item['market']: item for item in res_ticker_price.json()}
-                for ticker, price_info in price_data.items():
-                    if ticker in all_market_data:
-                        all_market_data[ticker].update(price_info)
-            
-            combined_data = list(all_market_data.values())
+            self._refresh_market_meta()
+            # 거래지원이 종료된 종목은 market_meta가 거래정지로 표시해 두므로 현재가는 정상 종목만 한 번에 조회
+            price_data = fetch_tickers(self.market_meta.tradable_markets())
+            combined_data = []
+            for market_info in self.market_meta.all_markets():
+                market_info.update(price_data.get(market_info['market'], {}))
+                combined_data.append(market_info)
             
             if combined_data:
-                self.data_queue.put(("update_market", combined_data))
+                self._put_market_update(combined_data)
+            if price_data:
+                self._update_market_screener(list(price_data.values()))
 
         except Exception as e:
             print(f"❗️ KRW 마켓 목록 업데이트 중 오류: {e}")
             traceback.print_exc()
 
+    def _update_market_screener(self, tickers):
+        # 전체 종목 스크리너: 현재가 스냅샷으로 진행 중인 봉을 갱신하고, 아직 캔들이 없는 종목은 백그라운드로 채움
+        self.market_screener.update_tickers(tickers)
+        missing = self.market_screener.missing([item['market'] for item in tickers])
+        if missing and not self._screener_seeding:
+            self._screener_seeding = True
+            threading.Thread(target=self._seed_market_screener, args=(missing,), daemon=True).start()
+
+    @upbit_http.with_priority(upbit_http.PRIORITY_BACKFILL)
+    def _seed_market_screener(self, markets, batch_size=20):
+        try:
+            for i in range(0, len(markets), batch_size):
+                if not self.is_running: break
+                frames = {}
+                for market in markets[i:i + batch_size]:
+                    try:
+                        # 스크리너 주기 캔들을 직접 조회 (기본 주기로 묶지 않고 종목당 요청 1회)
+                        frames[market] = candle_store.store.get_ohlcv(market, interval=self.market_screener.interval,
+                                                                      count=self.market_screener.window)
+                    except Exception as e:
+                        print(f"❗️ {market} 스크리너 캔들 조회 실패: {e}")
+                self.market_screener.seed(frames)
+            print(f"✅ 스크리너 캔들 채우기 완료 ({len(self.market_screener.markets)}개 종목)")
+        finally:
+            self._screener_seeding = False
+
+    def screener_top_tickers(self, count=10):
+        """스크리너 점수 상위 종목 (거래정지 제외). 아직 채워진 종목이 count개 미만이면 None."""
+        table = self.market_screener.screen()
+        markets = [m for m in table['market'] if not self.market_meta.is_suspended(m)]
+        return markets[:count] if len(markets) >= count else None
+
+    def strategy_signal_tickers(self):
+        """
+        지금 매수 신호가 난 종목 [(market, reason)] (거래정지 제외). 스크리너 캔들이 아직 없으면 None.
+        전략 규칙(전략1~8)을 스크리너 주기(minute5) 캔들에서 하나라도 신호가 나는지 봅니다. 결과를 기다리는 동안 블록되므로
+        백그라운드 스레드에서 호출합니다.
+        """
+        markets, data = self.market_screener.snapshot()
+        if not markets:
+            return None
+        fusion = SignalFusion.from_settings(self.auto_trade_settings)
+        if not fusion.strategies:
+            fusion = SignalFusion(list(strategy_rules.STRATEGY_RULES))
+        table = self.strategy_screener.scan(markets, data, fusion)
+        return [(market, reason) for market, reason in zip(table['market'], table['reason'])
+                if not self.market_meta.is_suspended(market)]
+
     def _redraw_chart(self):
         self.fig.clear() 
         if self.master_df is None or self.master_df.empty:
@@ -826,6 +934,9 @@ class UpbitChartApp(tk.Tk):
             elif task_name == "update_market":
                 self.market_data = data; self._refresh_market_tree_gui()
             elif task_name == "update_live_candle": self._update_live_data(data)
+            elif task_name == "update_live_price": self._apply_live_price()
+            elif task_name == "update_market_meta": self._apply_market_meta_diff(data)
+            elif task_name == "update_market_delta": self._apply_market_delta(data)
             elif task_name == "draw_chart": self._finalize_chart_drawing(*data)
             elif task_name == "draw_older_chart": self._update_chart_after_loading(*data)
         except Empty:
@@ -834,6 +945,75 @@ class UpbitChartApp(tk.Tk):
             if self.is_running:
                 self.after(100, self.process_queue)
 
+    def _on_realtime_ticker(self, msg):
+        # WebSocket 스레드에서 호출됨: 최신가만 보관하고 큐에는 처리 대기 중인 항목이 없을 때만 넣음
+        if msg.get('code') != self.live_ticker:
+            return
+        self._live_price = (msg['code'], msg['trade_price'])
+        if not self._live_price_pending:
+            self._live_price_pending = True
+            self.data_queue.put(("update_live_price", None))
+
+    def _apply_live_price(self):
+        self._live_price_pending = False
+        if self._live_price and self._live_price[0] == self.live_ticker:
+            self._roll_live_candle()
+            self._update_live_data(self._live_price[1])
+
+    def _roll_live_candle(self):
+        # 체결로 만든 새 봉이 생겼으면 차트에 이어 붙이고 지표를 다시 계산 (같은 봉이면 거래량만 맞춤)
+        if self.master_df is None or self.master_df.empty or not self.live_interval or not hasattr(self, 'fig') or not self.fig.axes:
+            return
+        new_rows = self.candle_builder.get_since(self.live_ticker, self.live_interval, self.master_df.index[-1])
+        if new_rows is None or new_rows.empty:
+            return
+        if len(new_rows) == 1:
+            self.master_df.loc[self.master_df.index[-1], 'volume'] = new_rows['volume'].iloc[-1]
+            return
+        cols = ['open', 'high', 'low', 'close', 'volume']
+        ohlcv = self.master_df[cols]
+        combined = pd.concat([ohlcv[ohlcv.index < new_rows.index[0]], new_rows[cols]])
+        df = self.get_technical_indicators_from_raw(combined, key=(self.live_ticker, self.live_interval, 'chart'))
+        if df is None:
+            return
+        num_added = len(df) - len(self.master_df)
+        x0, x1 = self.fig.axes[0].get_xlim()
+        is_following = x1 >= len(self.master_df) - 1  # 최신 봉을 보고 있었으면 뷰도 같이 이동
+        self._keep_view = True
+        self._finalize_chart_drawing(df, self.live_interval, self.selected_ticker_display.get())
+        if is_following and num_added > 0:
+            self.fig.axes[0].set_xlim(x0 + num_added, x1 + num_added)
+            self.canvas.draw_idle()
+
+    def _on_realtime_trade(self, msg):
+        # WebSocket 스레드: 로컬 캔들 갱신 + 서버 시각 추정 + (자동매매 중) 기준가 대비 급변 시 즉시 재평가
+        self.candle_builder.on_trade(msg)
+        server_clock.observe_ms(msg.get('timestamp'))
+        scheduler = self.strategy_scheduler
+        if scheduler is not None and self.tick_trigger.check(msg.get('code'), msg.get('trade_price')):
+            scheduler.trigger(TICK)
+
+    def _refresh_realtime_codes(self):
+        # 차트 종목 + (자동매매 중이면) 대상 종목을 구독해 자동매매도 실시간 캔들/틱 트리거를 사용
+        codes = [self.live_ticker]
+        if self.is_auto_trading:
+            codes += self.auto_trade_settings.get('enabled_tickers', [])
+        codes = [c for c in codes if c]
+        self.realtime_feed.set_codes(codes)
+        self.candle_builder.retain(codes)
+
+    def _on_realtime_reconnect(self):
+        # 끊긴 동안 놓친 체결이 있으므로 로컬 캔들을 버리고 차트 종목은 REST로 다시 맞춤
+        self.candle_builder.clear()
+        if self.live_ticker and self.live_interval:
+            threading.Thread(target=self._reseed_live_candles, args=(self.live_ticker, self.live_interval), daemon=True).start()
+
+    def _reseed_live_candles(self, ticker, interval):
+        try:
+            self.candle_builder.seed(ticker, interval, candle_store.get_ohlcv(ticker, interval=interval, count=200))
+        except Exception as e:
+            print(f"❗️ 실시간 캔들 재설정 오류: {e}")
+
     def fetch_current_price(self):
         display_name = self.selected_ticker_display.get()
         ticker = None
@@ -849,8 +1029,7 @@ class UpbitChartApp(tk.Tk):
 
     def _fetch_portfolio_data_worker(self):
         try:
-            balances = upbit.get_balances()
-            self.balances_data = {f"KRW-{b['currency']}": b for b in balances if b['currency'] != 'KRW'}
+            balances = account_state.get_balances()
             krw_balance = next((float(b['balance']) for b in balances if b['currency'] == 'KRW'), 0.0)
             krw_balances_data = {f"KRW-{b['currency']}": b for b in balances if b['currency'] != 'KRW' and float(b.get('balance', 0)) > 0}
             
@@ -895,6 +1074,8 @@ class UpbitChartApp(tk.Tk):
         if ticker:
             symbol = ticker.split('-')[1]
             self.buy_amount_symbol_label.config(text=symbol); self.sell_amount_symbol_label.config(text=symbol)
+            self.live_ticker = ticker
+            self._refresh_realtime_codes()
 
     def draw_base_chart(self, *args, keep_current_view=False):
         display_name = self.selected_ticker_display.get()
@@ -920,10 +1101,23 @@ class UpbitChartApp(tk.Tk):
 
     def _fetch_and_draw_chart(self, ticker, interval, display_name):
         try:
-            df = self.get_technical_indicators(ticker, interval=interval, count=200)
+            df = self.get_technical_indicators(ticker, interval=interval, count=200, key=(ticker, interval, 'chart'))
+            self.live_interval = interval
+            self.candle_builder.seed(ticker, interval, df)
             self.data_queue.put(("draw_chart", (df, interval, display_name)))
         except Exception as e: print(f"❗️ 차트 데이터 로딩 오류: {e}")
 
+    def _update_live_indicators(self):
+        # 진행 중인 마지막 봉의 지표만 O(1)로 다시 계산해 반영
+        if not self.live_interval:
+            return
+        last_idx = self.master_df.index[-1]
+        values = self.indicator_engine.update_last((self.live_ticker, self.live_interval, 'chart'), last_idx,
+                                                 self.master_df.loc[last_idx], BASE_COLUMNS + EXTRA_COLUMNS)
+        if values:
+            for column, value in values.items():
+                self.master_df.at[last_idx, column] = value
+
     def _update_live_data(self, price):
         if self.master_df is None or self.master_df.empty or not hasattr(self, 'fig') or not self.fig.axes:
             return
@@ -933,6 +1127,7 @@ class UpbitChartApp(tk.Tk):
         self.master_df.loc[last_idx, 'close'] = price
         if price > self.master_df.loc[last_idx, 'high']: self.master_df.loc[last_idx, 'high'] = price
         if price < self.master_df.loc[last_idx, 'low']: self.master_df.loc[last_idx, 'low'] = price
+        self._update_live_indicators()
 
         current_time = time.time()
         if current_time - self.last_chart_redraw_time < 1.0:
@@ -1084,6 +1279,7 @@ class UpbitChartApp(tk.Tk):
             self.sell_percentage_var.set('')
         except (ValueError, TclError) as e: print(f"매도 비율 계산 중 오류: {e}")
 
+    @upbit_http.with_priority(upbit_http.PRIORITY_ORDER)
     def place_order(self, side):
         display_name = self.selected_ticker_display.get()
         ticker = None
@@ -1113,7 +1309,7 @@ class UpbitChartApp(tk.Tk):
                     if not user_amount_str: raise ValueError("시장가 매도 시 주문 수량(COIN)을 입력해야 합니다.")
                     user_amount = float(user_amount_str)
                     if user_amount <= 0: raise ValueError("주문 수량은 0보다 커야 합니다.")
-                    sellable_balance, current_price = upbit.get_balance(ticker), pyupbit.get_current_price(ticker)
+                    sellable_balance, current_price = account_state.balance(ticker), pyupbit.get_current_price(ticker)
                     amount_to_sell = min(user_amount, sellable_balance)
                     if current_price and (amount_to_sell * current_price < 5000): raise ValueError(f"주문 금액이 최소 기준(5,000원) 미만입니다.\n(예상 주문액: {amount_to_sell * current_price:,.0f}원)")
                     if amount_to_sell <= 0: raise ValueError("매도 가능한 코인 수량이 없습니다.")
@@ -1255,6 +1451,7 @@ class UpbitChartApp(tk.Tk):
         interval, to_date, current_xlim = self.selected_interval.get(), self.master_df.index[0], self.fig.axes[0].get_xlim()
         threading.Thread(target=self._fetch_older_data_worker, args=(ticker, interval, to_date, current_xlim), daemon=True).start()
 
+    @upbit_http.with_priority(upbit_http.PRIORITY_BACKFILL)
     def _fetch_older_data_worker(self, ticker, interval, to_date, current_xlim):
         try:
             if isinstance(to_date, pd.Timestamp):
@@ -1262,7 +1459,7 @@ class UpbitChartApp(tk.Tk):
             else:
                 to_date_str = (pd.to_datetime(to_date) - timedelta(seconds=1)).strftime('%Y-%m-%d %H:%M:%S')
             
-            older_df_raw = pyupbit.get_ohlcv(ticker, interval=interval, count=200, to=to_date_str)
+            older_df_raw = candle_store.get_ohlcv_before(ticker, interval, to_date_str, count=200)
             
             if older_df_raw is None or older_df_raw.empty:
                 print("ℹ️ 더 이상 로드할 과거 데이터가 없습니다.")
@@ -1273,7 +1470,7 @@ class UpbitChartApp(tk.Tk):
             combined_df_raw = pd.concat([older_df_raw, current_ohlcv])
             combined_df_raw = combined_df_raw[~combined_df_raw.index.duplicated(keep='last')].sort_index()
 
-            df_with_indicators = self.get_technical_indicators_from_raw(combined_df_raw)
+            df_with_indicators = self.get_technical_indicators_from_raw(combined_df_raw, key=(ticker, interval, 'chart'))
             
             if df_with_indicators is not None and not df_with_indicators.empty:
                 if len(df_with_indicators) > self.MAX_CANDLES:
@@ -1351,8 +1548,7 @@ class UpbitChartApp(tk.Tk):
         self.pie_fig.tight_layout(); self.pie_canvas.draw()
         self.buy_krw_balance_var.set(f"주문가능: {krw_balance:,.0f} KRW"); self.sell_coin_balance_var.set(f"주문가능: {coin_balance:g} {coin_symbol}")
 
-    def _refresh_market_tree_gui(self):
-        if not self.market_data: return
+    def _sorted_market_data(self):
         sort_key_map = {'display_name': 'market', 'price': 'trade_price', 'change_rate': 'signed_change_rate', 'volume': 'acc_trade_price_24h'}
         key_to_sort = sort_key_map.get(self.sort_column, 'acc_trade_price_24h')
         
@@ -1360,7 +1556,39 @@ class UpbitChartApp(tk.Tk):
         suspended_data = [d for d in self.market_data if d.get('market_warning') == 'TRADING_SUSPENSION']
         
         sorted_normal_data = sorted(normal_data, key=lambda x: x.get(key_to_sort, 0), reverse=not self.sort_ascending)
-        sorted_data = sorted_normal_data + suspended_data
+        return sorted_normal_data + suspended_data
+
+    def _format_market_row(self, item):
+        ticker_name = item['market']
+        display_name = self.ticker_to_display_name.get(ticker_name, ticker_name)
+        
+        warning_status = item.get('market_warning', 'NONE')
+        tags_to_apply = []
+        
+        final_display_name = display_name
+        if warning_status == 'CAUTION':
+            final_display_name = f"[유의] {display_name}"
+            tags_to_apply.append('caution')
+        elif warning_status == 'TRADING_SUSPENSION':
+            final_display_name = f"[정지] {display_name}"
+            tags_to_apply.append('suspended')
+
+        price = item.get('trade_price', 0)
+        change_rate = item.get('signed_change_rate', 0) * 100
+        volume = item.get('acc_trade_price_24h', 0)
+        
+        if change_rate > 0: tags_to_apply.append('red')
+        elif change_rate < 0: tags_to_apply.append('blue')
+        else: tags_to_apply.append('black')
+        
+        price_str = f"{price:,.0f}" if price >= 100 else f"{price:g}"
+        change_rate_str = f"{change_rate:+.2f}%"
+        volume_str = self.format_trade_volume(volume)
+        return (final_display_name, price_str, change_rate_str, volume_str), tuple(tags_to_apply)
+
+    def _refresh_market_tree_gui(self):
+        if not self.market_data: return
+        sorted_data = self._sorted_market_data()
 
         try:
             selected_id = self.market_tree.focus()
@@ -1373,35 +1601,10 @@ class UpbitChartApp(tk.Tk):
             self.market_tree.tag_configure('suspended', foreground='gray', font=('Helvetica', 9, 'italic'))
 
             for item in sorted_data:
-                ticker_name = item['market']
-                display_name = self.ticker_to_display_name.get(ticker_name, ticker_name)
-                
-                warning_status = item.get('market_warning', 'NONE')
-                tags_to_apply = []
-                
-                final_display_name = display_name
-                if warning_status == 'CAUTION':
-                    final_display_name = f"[유의] {display_name}"
-                    tags_to_apply.append('caution')
-                elif warning_status == 'TRADING_SUSPENSION':
-                    final_display_name = f"[정지] {display_name}"
-                    tags_to_apply.append('suspended')
-
-                price = item.get('trade_price', 0)
-                change_rate = item.get('signed_change_rate', 0) * 100
-                volume = item.get('acc_trade_price_24h', 0)
-                
-                if change_rate > 0: tags_to_apply.append('red')
-                elif change_rate < 0: tags_to_apply.append('blue')
-                else: tags_to_apply.append('black')
-                
-                price_str = f"{price:,.0f}" if price >= 100 else f"{price:g}"
-                change_rate_str = f"{change_rate:+.2f}%"
-                volume_str = self.format_trade_volume(volume)
+                values, tags = self._format_market_row(item)
+                item_id = self.market_tree.insert('', 'end', iid=item['market'], values=values, tags=tags)
                 
-                item_id = self.market_tree.insert('', 'end', values=(final_display_name, price_str, change_rate_str, volume_str), tags=tuple(tags_to_apply))
-                
-                if selected_display_name_raw and selected_display_name_raw == final_display_name:
+                if selected_display_name_raw and selected_display_name_raw == values[0]:
                     new_selection_id = item_id
             
             if new_selection_id:
@@ -1411,6 +1614,35 @@ class UpbitChartApp(tk.Tk):
             print(f"Error refreshing market tree: {e}")
             traceback.print_exc()
 
+    def _apply_market_delta(self, changes):
+        # 값이 바뀐 종목의 바뀐 셀만 수정하고, 정렬 순서가 달라진 행만 이동
+        rows = {item['market']: item for item in self.market_data}
+        for market, fields in changes.items():
+            if market in rows: rows[market].update(fields)
+        try:
+            columns = self.market_tree['columns']
+            for market in changes:
+                if market not in rows or not self.market_tree.exists(market): continue
+                values, tags = self._format_market_row(rows[market])
+                current_values = self.market_tree.item(market, 'values')
+                for col, old, new in zip(columns, current_values, values):
+                    if str(old) != str(new): self.market_tree.set(market, col, new)
+                if tuple(self.market_tree.item(market, 'tags')) != tags: self.market_tree.item(market, tags=tags)
+            self._reorder_market_tree()
+        except Exception as e:
+            print(f"❗️ 마켓 목록 부분 갱신 오류: {e}")
+
+    def _reorder_market_tree(self):
+        order = [item['market'] for item in self._sorted_market_data()]
+        current = list(self.market_tree.get_children())
+        if current == order: return
+        for index, market in enumerate(order):
+            if index < len(current) and current[index] == market: continue
+            if not self.market_tree.exists(market): continue
+            self.market_tree.move(market, '', index)
+            if market in current: current.remove(market)
+            current.insert(index, market)
+
     def sort_market_list(self, col):
         if self.sort_column == col: self.sort_ascending = not self.sort_ascending
         else: self.sort_column, self.sort_ascending = col, False
@@ -1431,7 +1663,7 @@ class UpbitChartApp(tk.Tk):
         self.after(0, lambda: self.ticker_combobox.config(values=all_combobox_values))
         
         try:
-            balances = upbit.get_balances()
+            balances = account_state.get_balances()
             my_tickers = [f"KRW-{b['currency']}" for b in balances if b['currency'] != 'KRW' and float(b.get('balance', 0)) > 0]
             if my_tickers:
                 display_name = self.ticker_to_display_name.get(my_tickers[0], my_tickers[0])
@@ -1446,17 +1678,24 @@ class UpbitChartApp(tk.Tk):
 
     def on_closing(self):
         self.is_running = False
+        if self.strategy_scheduler is not None:
+            self.strategy_scheduler.stop()
+        self.realtime_feed.stop()
+        self.strategy_screener.shutdown()
+        account_state.stop()
         time.sleep(1.1)
         if self.settings_window and self.settings_window.winfo_exists():
             self.settings_window.destroy()
         self.destroy()
 
 class AutoTradeSettingsWindow(tk.Toplevel):
+    SIGNAL_REFRESH_SEC = 10   # 전략 신호 종목 모드의 재스캔 간격
+
     def __init__(self, master):
         super().__init__(master)
         self.master_app = master
         self.title("자동매매 설정")
-        self.geometry("420x450")
+        self.geometry("420x480")
         self.resizable(False, False)
         
         self.vars = {
@@ -1464,6 +1703,11 @@ class AutoTradeSettingsWindow(tk.Toplevel):
             'trend_ratio': tk.StringVar(),
             'sideways_ratio': tk.StringVar()
         }
+        self.listed_markets = []        # 리스트박스 행 순서대로의 종목 코드
+        self.signal_mode = tk.BooleanVar(value=False)
+        self._signal_on = False
+        self._signal_wake = threading.Event()
+        self._signal_thread = None
         self.setup_widgets()
         self.load_settings()
 
@@ -1476,7 +1720,7 @@ class AutoTradeSettingsWindow(tk.Toplevel):
         ttk.Button(button_frame, text="저장", command=self.save_and_close).pack(side=tk.RIGHT, padx=5)
         ttk.Button(button_frame, text="닫기", command=self.destroy).pack(side=tk.RIGHT)
         
-        tickers_frame = ttk.LabelFrame(main_frame, text="[1] 자동매매 대상 종목 (거래대금 상위 10개, 단일 선택)", padding=10)
+        tickers_frame = ttk.LabelFrame(main_frame, text="[1] 자동매매 대상 종목 (스크리너 상위 10개, 단일 선택)", padding=10)
         tickers_frame.pack(fill=tk.BOTH, expand=True, pady=5)
         list_frame = ttk.Frame(tickers_frame)
         list_frame.pack(fill=tk.BOTH, expand=True)
@@ -1487,6 +1731,8 @@ class AutoTradeSettingsWindow(tk.Toplevel):
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         refresh_button = ttk.Button(tickers_frame, text="목록 새로고침", command=self.populate_top_tickers)
         refresh_button.pack(pady=(5,0), fill='x')
+        ttk.Checkbutton(tickers_frame, text="전략 신호 종목만 보기 (실시간 갱신)", variable=self.signal_mode,
+                        command=self.on_signal_mode_toggled).pack(anchor='w', pady=(5,0))
 
         ratio_frame = ttk.LabelFrame(main_frame, text="[2] 시장 상황별 투자 비중 (켈리 공식 단순화)", padding=10)
         ratio_frame.pack(fill=tk.X, pady=5)
@@ -1509,13 +1755,15 @@ class AutoTradeSettingsWindow(tk.Toplevel):
         ttk.Label(limit_frame, text="(잔액이 이 금액을 초과해도, 이 금액까지만 투자)", foreground="gray").pack(side=tk.LEFT, padx=5)
 
     def populate_top_tickers(self):
+        if self._signal_on:
+            self._signal_wake.set(); return   # 전략 신호 모드에서는 바로 다시 스캔
         threading.Thread(target=self._populate_worker, daemon=True).start()
 
     def _populate_worker(self):
         try:
             all_tickers_krw = pyupbit.get_tickers(fiat="KRW")
             url = f"https://api.upbit.com/v1/ticker?markets={','.join(all_tickers_krw)}"
-            response = requests.get(url, timeout=5)
+            response = upbit_http.get(url, timeout=5)
             response.raise_for_status()
             market_data = response.json()
             
@@ -1523,15 +1771,22 @@ class AutoTradeSettingsWindow(tk.Toplevel):
                 self.after(0, lambda: messagebox.showwarning("데이터 없음", "업비트에서 마켓 데이터를 가져오지 못했습니다.", parent=self))
                 return
 
-            top_10 = sorted(market_data, key=lambda x: x.get('acc_trade_price_24h', 0), reverse=True)[:10]
+            # 스크리너 점수 상위 10개 (스크리너 캔들을 채우는 중이면 거래대금 상위 10개)
+            top_10 = self.master_app.screener_top_tickers(10)
+            source = "스크리너 점수"
+            if top_10 is None:
+                top_10 = [item['market'] for item in sorted(market_data, key=lambda x: x.get('acc_trade_price_24h', 0), reverse=True)[:10]]
+                source = "거래대금"
             
             def update_listbox():
+                if self._signal_on: return
                 self.ticker_listbox.delete(0, END)
-                for item in top_10:
-                    display_name = self.master_app.ticker_to_display_name.get(item['market'], item['market'])
+                for market in top_10:
+                    display_name = self.master_app.ticker_to_display_name.get(market, market)
                     self.ticker_listbox.insert(END, display_name)
+                self.listed_markets = list(top_10)
                 self.restore_selection()
-                print("✅ 거래대금 상위 10개 종목을 리스트에 업데이트했습니다.")
+                print(f"✅ {source} 상위 10개 종목을 리스트에 업데이트했습니다.")
             
             self.after(0, update_listbox)
 
@@ -1540,6 +1795,53 @@ class AutoTradeSettingsWindow(tk.Toplevel):
         except Exception as e:
             self.after(0, lambda: messagebox.showerror("오류", f"종목 목록을 불러오는 중 오류가 발생했습니다:\n{e}", parent=self))
 
+    def on_signal_mode_toggled(self):
+        # 켜면 백그라운드 스레드가 SIGNAL_REFRESH_SEC초마다 전체 종목 전략 신호를 다시 스캔해 목록을 바꿈
+        self._signal_on = self.signal_mode.get()
+        self._signal_wake.set()
+        if self._signal_on and (self._signal_thread is None or not self._signal_thread.is_alive()):
+            self._signal_thread = threading.Thread(target=self._signal_worker, daemon=True)
+            self._signal_thread.start()
+        elif not self._signal_on:
+            self.populate_top_tickers()
+
+    def _signal_worker(self):
+        while self._signal_on:
+            self._signal_wake.clear()
+            try:
+                signals = self.master_app.strategy_signal_tickers()
+                if signals is None:
+                    print("⏳ 스크리너 캔들을 채우는 중이라 전략 신호 스캔을 건너뜁니다.")
+                else:
+                    self.after(0, self._show_signals, signals)
+            except (TclError, RuntimeError):
+                break   # 창이 닫혔거나 앱 종료로 프로세스 풀이 정리됨
+            except Exception as e:
+                print(f"❗️ 전략 신호 스캔 중 오류: {e}")
+            self._signal_wake.wait(self.SIGNAL_REFRESH_SEC)
+
+    def _show_signals(self, signals):
+        if not self._signal_on or not self.winfo_exists(): return
+        selected = self.selected_market()
+        self.listed_markets = [market for market, _ in signals]
+        self.ticker_listbox.delete(0, END)
+        for market, reason in signals:
+            display_name = self.master_app.ticker_to_display_name.get(market, market)
+            self.ticker_listbox.insert(END, f"{display_name}  [{reason}]")
+        self.restore_selection(selected)
+        print(f"✅ 전략 신호 종목 {len(signals)}개를 리스트에 업데이트했습니다.")
+
+    def selected_market(self):
+        indices = self.ticker_listbox.curselection()
+        if indices and indices[0] < len(self.listed_markets):
+            return self.listed_markets[indices[0]]
+        return None
+
+    def destroy(self):
+        self._signal_on = False
+        self._signal_wake.set()
+        super().destroy()
+
     def load_settings(self):
         s = self.master_app.auto_trade_settings
         self.vars['total_investment_limit'].set(str(s.get('total_investment_limit', 10000000)))
@@ -1551,31 +1853,25 @@ class AutoTradeSettingsWindow(tk.Toplevel):
 
         self.populate_top_tickers()
 
-    def restore_selection(self):
-        s = self.master_app.auto_trade_settings
-        enabled_tickers = s.get('enabled_tickers', [])
-        if not enabled_tickers: return
-        selected_ticker = enabled_tickers[0] 
-        for i in range(self.ticker_listbox.size()):
-            display_name = self.ticker_listbox.get(i)
-            if self.master_app.display_name_to_ticker.get(display_name) == selected_ticker:
-                self.ticker_listbox.selection_set(i)
-                self.ticker_listbox.activate(i)
-                break
+    def restore_selection(self, selected_ticker=None):
+        if selected_ticker is None:
+            enabled_tickers = self.master_app.auto_trade_settings.get('enabled_tickers', [])
+            if not enabled_tickers: return
+            selected_ticker = enabled_tickers[0]
+        if selected_ticker in self.listed_markets:
+            i = self.listed_markets.index(selected_ticker)
+            self.ticker_listbox.selection_set(i); self.ticker_listbox.activate(i)
 
     def save_and_close(self):
         try:
             new_settings = self.master_app.auto_trade_settings.copy()
             selected_ticker_for_chart = None
             
-            selected_indices = self.ticker_listbox.curselection()
             enabled_tickers = []
-            if selected_indices:
-                display_name = self.ticker_listbox.get(selected_indices[0])
-                ticker = self.master_app.display_name_to_ticker.get(display_name)
-                if ticker:
-                    enabled_tickers.append(ticker)
-                    selected_ticker_for_chart = ticker
+            ticker = self.selected_market()
+            if ticker:
+                enabled_tickers.append(ticker)
+                selected_ticker_for_chart = ticker
             new_settings['enabled_tickers'] = enabled_tickers
             
             trend_pct = float(self.vars['trend_ratio'].get())
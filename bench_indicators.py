@@ -0,0 +1,161 @@
+"""
+indicators.py(NumPy) vs 기존 pandas 지표 코드 비교 벤치마크.
+
+    python bench_indicators.py                # 200 / 2,000 / 50,000개 봉
+    python bench_indicators.py --rows 100000 --repeat 5
+
+각 지표마다 기존 pandas 코드와 결과가 같은지 먼저 확인한 뒤 평균 실행 시간을 출력합니다.
+"""
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import indicators
+
+
+def make_candles(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    close = np.round(1e8 * np.exp(np.cumsum(rng.normal(0, 0.002, rows))), -3)
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    high = np.maximum(open_, close) * (1 + rng.random(rows) * 0.002)
+    low = np.minimum(open_, close) * (1 - rng.random(rows) * 0.002)
+    volume = rng.random(rows) * 10
+    index = pd.date_range('2024-01-01', periods=rows, freq='min')
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}, index=index)
+
+
+# --- 기존 앱 코드 (pandas) -------------------------------------------------------
+def pandas_ma(df):
+    return [df['close'].rolling(window=p, min_periods=1).mean() for p in (5, 20, 60, 120)]
+
+
+def pandas_rsi(df):
+    delta = df['close'].diff(1)
+    gain = (delta.where(delta > 0, 0)).rolling(window=14, min_periods=1).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14, min_periods=1).mean()
+    rs = gain / loss.replace(0, np.nan)
+    return 100 - (100 / (1 + rs))
+
+
+def pandas_macd(df):
+    ema12 = df['close'].ewm(span=12, adjust=False, min_periods=1).mean()
+    ema26 = df['close'].ewm(span=26, adjust=False, min_periods=1).mean()
+    macd = ema12 - ema26
+    return macd, macd.ewm(span=9, adjust=False, min_periods=1).mean()
+
+
+def pandas_bollinger(df):
+    middle = df['close'].rolling(window=20).mean()
+    std = df['close'].rolling(window=20).std()
+    return middle + std * 2, middle - std * 2
+
+
+def pandas_obv_loop(df):
+    # run_strategy6의 기존 OBV 루프
+    obv = [0]
+    for i in range(1, len(df)):
+        if df['close'].iloc[i] > df['close'].iloc[i-1]:
+            obv.append(obv[-1] + df['volume'].iloc[i])
+        elif df['close'].iloc[i] < df['close'].iloc[i-1]:
+            obv.append(obv[-1] - df['volume'].iloc[i])
+        else:
+            obv.append(obv[-1])
+    return pd.Series(obv, index=df.index)
+
+
+def pandas_stoch_rsi(rsi):
+    min_rsi = rsi.rolling(window=14, min_periods=1).min()
+    max_rsi = rsi.rolling(window=14, min_periods=1).max()
+    return (rsi - min_rsi) / (max_rsi - min_rsi)
+
+
+def pandas_cci(df):
+    # run_strategy8의 기존 CCI (창마다 파이썬 콜백으로 평균 절대 편차 계산)
+    tp = (df['high'] + df['low'] + df['close']) / 3
+    ma = tp.rolling(window=20, min_periods=1).mean()
+    md = tp.rolling(window=20, min_periods=1).apply(lambda x: np.mean(np.abs(x - np.mean(x))))
+    return (tp - ma) / (0.015 * md)
+
+
+def pandas_mfi(df):
+    typical_price = (df['high'] + df['low'] + df['close']) / 3
+    money_flow = typical_price * df['volume']
+    positive = [money_flow.iloc[i] if typical_price.iloc[i] > typical_price.iloc[i-1] else 0 for i in range(1, len(df))]
+    negative = [money_flow.iloc[i] if typical_price.iloc[i] < typical_price.iloc[i-1] else 0 for i in range(1, len(df))]
+    ratio = (pd.Series(positive, index=df.index[1:]).rolling(14).sum() /
+             pd.Series(negative, index=df.index[1:]).rolling(14).sum()).replace([np.inf, -np.inf], 0)
+    return (100 - (100 / (1 + ratio))).reindex(df.index).fillna(50)
+
+
+# --- 같은 지표의 NumPy 커널 버전 ----------------------------------------------------
+def numpy_ma(a):
+    return [indicators.sma(a['close'], p, min_periods=1) for p in (5, 20, 60, 120)]
+
+
+def numpy_bollinger(a):
+    _, _, upper, lower = indicators.bollinger(a['close'], 20, 2)
+    return upper, lower
+
+
+CASES = [
+    # (이름, pandas 함수, numpy 함수, 큰 데이터에서 건너뛸지(루프 기반))
+    ('MA 5/20/60/120', pandas_ma, numpy_ma, False),
+    ('RSI(14)', pandas_rsi, lambda a: indicators.rsi(a['close']), False),
+    ('MACD/signal', pandas_macd, lambda a: indicators.macd(a['close'])[:2], False),
+    ('Bollinger(20, 2)', pandas_bollinger, numpy_bollinger, False),
+    ('OBV', pandas_obv_loop, lambda a: indicators.obv(a['close'], a['volume']), True),
+    ('StochRSI(14)', lambda df: pandas_stoch_rsi(pandas_rsi(df)),
+     lambda a: indicators.stoch_rsi(indicators.rsi(a['close'])), False),
+    ('CCI(20)', pandas_cci, lambda a: indicators.cci(a['high'], a['low'], a['close']), True),
+    ('MFI(14)', pandas_mfi, lambda a: indicators.money_flow_index(a['high'], a['low'], a['close'], a['volume']), True),
+]
+
+
+def _as_list(result):
+    return list(result) if isinstance(result, (list, tuple)) else [result]
+
+
+def check_same(expected, actual, name):
+    for exp, act in zip(_as_list(expected), _as_list(actual)):
+        exp, act = np.asarray(exp, dtype=float), np.asarray(act, dtype=float)
+        if not np.array_equal(np.isnan(exp), np.isnan(act)):
+            raise AssertionError(f"{name}: NaN 위치가 다릅니다")
+        mask = ~np.isnan(exp)
+        if not np.allclose(exp[mask], act[mask], rtol=1e-7, atol=1e-9):
+            raise AssertionError(f"{name}: 값이 다릅니다 (최대 차이 {np.max(np.abs(exp[mask] - act[mask]))})")
+
+
+def timeit(func, arg, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(rows, repeat, loop_limit):
+    df = make_candles(rows)
+    arrays = {col: df[col].to_numpy(dtype=np.float64) for col in df.columns}
+    print(f"\n[{rows:,}개 봉]")
+    print(f"{'지표':<18}{'pandas(ms)':>12}{'numpy(ms)':>12}{'배속':>9}")
+    for name, pandas_func, numpy_func, is_loop in CASES:
+        if is_loop and rows > loop_limit:
+            print(f"{name:<18}{'(생략)':>12}")
+            continue
+        check_same(pandas_func(df), numpy_func(arrays), name)
+        t_pandas = timeit(pandas_func, df, repeat)
+        t_numpy = timeit(numpy_func, arrays, repeat)
+        print(f"{name:<18}{t_pandas * 1000:>12.3f}{t_numpy * 1000:>12.3f}{t_pandas / t_numpy:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="지표 계산 벤치마크 (pandas vs NumPy 커널)")
+    parser.add_argument("--rows", type=int, nargs='*', default=[200, 2000, 50000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--loop-limit", type=int, default=5000, help="이보다 큰 데이터에서는 루프 기반 기존 코드 측정 생략")
+    args = parser.parse_args()
+    for rows in args.rows:
+        run(rows, args.repeat, args.loop_limit)
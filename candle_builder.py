@@ -0,0 +1,112 @@
+import threading
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from candle_store import KST_OFFSET, OHLCV_COLUMNS, INTERVAL_MINUTES, candle_open_time
+
+# -----------------------------------------------------------------------------
+# 실시간 체결(trade) 스트림으로 로컬 캔들 만들기
+# -----------------------------------------------------------------------------
+OPEN, HIGH, LOW, CLOSE, VOLUME, VALUE = range(6)
+
+
+def trade_time_kst(msg):
+    """trade 메시지의 체결 시각(ms, UTC)을 업비트 캔들 인덱스와 같은 KST naive datetime으로 변환."""
+    ms = msg.get('trade_timestamp') or msg.get('timestamp')
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).replace(tzinfo=None) + KST_OFFSET
+
+
+class CandleBuilder:
+    """
+    REST로 받은 캔들을 시작점(seed)으로, 이후 체결마다 마지막 봉을 갱신하고 주기 경계에서 새 봉을 엽니다.
+    분봉/일봉/주봉 등 고정 길이 주기만 지원합니다. 체결이 없는 구간은 업비트와 같이 봉을 만들지 않습니다.
+    """
+    def __init__(self, max_candles=5000, on_bar=None):
+        self.max_candles = max_candles
+        self.on_bar = on_bar          # on_bar(ticker, interval, is_new_bar) - 워커 스레드에서 호출
+        self._frames = {}             # (ticker, interval) -> DataFrame(OHLCV)
+        self._last_seq = {}           # ticker -> 마지막 체결 번호 (중복 수신 방지)
+        self._lock = threading.Lock()
+
+    def seed(self, ticker, interval, df):
+        """REST 캔들로 (종목, 주기) 추적을 시작/재시작합니다. 마지막 행은 진행 중인 봉으로 간주합니다."""
+        if interval not in INTERVAL_MINUTES or df is None or df.empty:
+            return
+        if 'value' not in df.columns:
+            df = df.assign(value=df['close'] * df['volume'])
+        frame = df[OHLCV_COLUMNS].astype(float).iloc[-self.max_candles:].copy()
+        with self._lock:
+            self._frames[(ticker, interval)] = frame
+
+    def is_tracking(self, ticker, interval):
+        return (ticker, interval) in self._frames
+
+    def retain(self, tickers):
+        """구독에서 빠진 종목은 더 이상 체결을 받지 못하므로 버립니다."""
+        tickers = set(tickers)
+        with self._lock:
+            for key in [k for k in self._frames if k[0] not in tickers]:
+                del self._frames[key]
+
+    def clear(self):
+        """재접속 등으로 체결이 누락됐을 수 있을 때 호출. 다음 조회 시 REST로 다시 seed 됩니다."""
+        with self._lock:
+            self._frames.clear()
+            self._last_seq.clear()
+
+    def get_frame(self, ticker, interval, count=200):
+        """추적 중이고 count개 이상 쌓여 있으면 최신 count개 OHLCV를, 아니면 None을 반환."""
+        with self._lock:
+            frame = self._frames.get((ticker, interval))
+            if frame is None or len(frame) < count:
+                return None
+            return frame.iloc[-count:].copy()
+
+    def get_since(self, ticker, interval, since):
+        """since 시각(포함) 이후의 봉들을 반환. 추적 중이 아니면 None."""
+        with self._lock:
+            frame = self._frames.get((ticker, interval))
+            if frame is None:
+                return None
+            return frame[frame.index >= since].copy()
+
+    def on_trade(self, msg):
+        ticker = msg.get('code')
+        price, volume = msg.get('trade_price'), msg.get('trade_volume', 0.0)
+        if not ticker or price is None:
+            return
+        seq = msg.get('sequential_id')
+        ts = trade_time_kst(msg)
+        events = []
+        with self._lock:
+            if seq is not None:
+                if self._last_seq.get(ticker) == seq:
+                    return
+                self._last_seq[ticker] = seq
+            for (code, interval), frame in list(self._frames.items()):
+                if code != ticker:
+                    continue
+                open_time = candle_open_time(ts, interval)
+                last_time = frame.index[-1]
+                if open_time > last_time:
+                    new_bar = pd.DataFrame([[price, price, price, price, volume, price * volume]],
+                                           index=pd.DatetimeIndex([open_time]), columns=OHLCV_COLUMNS)
+                    frame = pd.concat([frame, new_bar]).iloc[-self.max_candles:]
+                    self._frames[(code, interval)] = frame
+                    events.append((code, interval, True))
+                elif open_time == last_time:
+                    row = len(frame) - 1
+                    values = frame.values
+                    if price > values[row, HIGH]:
+                        frame.iat[row, HIGH] = price
+                    if price < values[row, LOW]:
+                        frame.iat[row, LOW] = price
+                    frame.iat[row, CLOSE] = price
+                    frame.iat[row, VOLUME] = values[row, VOLUME] + volume
+                    frame.iat[row, VALUE] = values[row, VALUE] + price * volume
+                    events.append((code, interval, False))
+                # 이미 지난 봉에 대한 늦은 체결은 무시 (REST 캔들에 이미 반영됨)
+        if self.on_bar:
+            for event in events:
+                self.on_bar(*event)
@@ -0,0 +1,146 @@
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# 캔들 패턴 (NumPy 벡터 연산)
+# -----------------------------------------------------------------------------
+# 모든 함수는 OHLC 프레임을 받아 행마다 패턴 성립 여부(bool ndarray)를 반환합니다.
+# 여러 봉짜리 패턴은 마지막 봉 위치에 True가 표시되고, 앞쪽 봉이 모자란 행은 False입니다.
+DOJI_BODY_RATIO = 0.1       # 몸통이 전체 길이의 10% 이하면 도지
+STAR_BODY_RATIO = 0.3       # 별형(가운데 봉)의 몸통은 첫 봉 몸통의 30% 이하
+
+# 기존 'pattern' 컬럼 라벨 (앞에 있을수록 우선)
+LEGACY_PATTERNS = ('hammer', 'bullish_engulfing', 'shooting_star')
+EXTRA_PATTERNS = ('doji', 'morning_star', 'evening_star', 'three_white_soldiers', 'three_black_crows',
+                  'bullish_harami', 'bearish_harami')
+
+
+class CandleParts:
+    """패턴 계산에 공통으로 쓰는 몸통/꼬리/양봉 배열."""
+    def __init__(self, df):
+        self.open = df['open'].to_numpy(dtype=float)
+        self.high = df['high'].to_numpy(dtype=float)
+        self.low = df['low'].to_numpy(dtype=float)
+        self.close = df['close'].to_numpy(dtype=float)
+        self.body = np.abs(self.close - self.open)
+        self.upper_shadow = self.high - np.maximum(self.open, self.close)
+        self.lower_shadow = np.minimum(self.open, self.close) - self.low
+        self.is_green = self.close > self.open
+        self.is_red = self.close < self.open
+
+
+def _parts(df):
+    return df if isinstance(df, CandleParts) else CandleParts(df)
+
+
+def _shift(values, n, fill):
+    """values를 n칸 뒤로 민 배열 (앞쪽 n칸은 fill)."""
+    out = np.empty_like(values)
+    out[:n] = fill
+    out[n:] = values[:-n] if n else values
+    return out
+
+
+def _prev(c, n=1):
+    """n봉 전 값들 (open, close, body, is_green, is_red)."""
+    return (_shift(c.open, n, np.nan), _shift(c.close, n, np.nan), _shift(c.body, n, np.nan),
+            _shift(c.is_green, n, False), _shift(c.is_red, n, False))
+
+
+def _valid_from(mask, start):
+    mask[:start] = False
+    return mask
+
+
+# --- 한 봉 / 두 봉 패턴 (기존 루프와 같은 조건) -------------------------------
+def hammer(df):
+    c = _parts(df)
+    return _valid_from(c.is_green & (c.lower_shadow > c.body * 2) & (c.upper_shadow < c.body * 0.5), 1)
+
+
+def shooting_star(df):
+    c = _parts(df)
+    return _valid_from(~c.is_green & (c.upper_shadow > c.body * 2) & (c.lower_shadow < c.body * 0.5), 1)
+
+
+def bullish_engulfing(df):
+    c = _parts(df)
+    p_open, p_close, _, p_green, _ = _prev(c)
+    return _valid_from(~p_green & c.is_green & (c.close > p_open) & (c.open < p_close), 1)
+
+
+def doji(df):
+    c = _parts(df)
+    rng = c.high - c.low
+    return (rng > 0) & (c.body <= rng * DOJI_BODY_RATIO)
+
+
+def bullish_harami(df):
+    """큰 음봉 다음, 그 몸통 안에 들어가는 양봉."""
+    c = _parts(df)
+    p_open, p_close, _, _, p_red = _prev(c)
+    return _valid_from(p_red & c.is_green & (c.open > p_close) & (c.close < p_open), 1)
+
+
+def bearish_harami(df):
+    """큰 양봉 다음, 그 몸통 안에 들어가는 음봉."""
+    c = _parts(df)
+    p_open, p_close, _, p_green, _ = _prev(c)
+    return _valid_from(p_green & c.is_red & (c.open < p_close) & (c.close > p_open), 1)
+
+
+# --- 세 봉 패턴 -----------------------------------------------------------------
+def morning_star(df):
+    """음봉 → 작은 몸통(별) → 첫 음봉 몸통 중간 위로 마감하는 양봉."""
+    c = _parts(df)
+    o1, c1, b1, _, r1 = _prev(c, 2)
+    _, _, b2, _, _ = _prev(c, 1)
+    star_small = b2 <= b1 * STAR_BODY_RATIO
+    return _valid_from(r1 & star_small & c.is_green & (c.close > (o1 + c1) / 2), 2)
+
+
+def evening_star(df):
+    """양봉 → 작은 몸통(별) → 첫 양봉 몸통 중간 아래로 마감하는 음봉."""
+    c = _parts(df)
+    o1, c1, b1, g1, _ = _prev(c, 2)
+    _, _, b2, _, _ = _prev(c, 1)
+    star_small = b2 <= b1 * STAR_BODY_RATIO
+    return _valid_from(g1 & star_small & c.is_red & (c.close < (o1 + c1) / 2), 2)
+
+
+def three_white_soldiers(df):
+    """연속 양봉 3개, 종가는 계속 상승하고 각 시가는 직전 몸통 안에서 시작, 위꼬리는 짧게."""
+    c = _parts(df)
+    mask = c.is_green & (c.upper_shadow < c.body * 0.5)
+    o1, c1, _, _, _ = _prev(c, 1)
+    step = mask & _shift(mask, 1, False) & (c.close > c1) & (c.open > o1) & (c.open <= c1)
+    return _valid_from(step & _shift(step, 1, False), 2)
+
+
+def three_black_crows(df):
+    """연속 음봉 3개, 종가는 계속 하락하고 각 시가는 직전 몸통 안에서 시작, 아래꼬리는 짧게."""
+    c = _parts(df)
+    mask = c.is_red & (c.lower_shadow < c.body * 0.5)
+    o1, c1, _, _, _ = _prev(c, 1)
+    step = mask & _shift(mask, 1, False) & (c.close < c1) & (c.open < o1) & (c.open >= c1)
+    return _valid_from(step & _shift(step, 1, False), 2)
+
+
+PATTERN_FUNCS = {
+    'hammer': hammer, 'bullish_engulfing': bullish_engulfing, 'shooting_star': shooting_star,
+    'doji': doji, 'morning_star': morning_star, 'evening_star': evening_star,
+    'three_white_soldiers': three_white_soldiers, 'three_black_crows': three_black_crows,
+    'bullish_harami': bullish_harami, 'bearish_harami': bearish_harami,
+}
+
+
+def detect_patterns(df, names=None):
+    """{패턴 이름: bool ndarray}. names를 주지 않으면 전체 패턴."""
+    c = _parts(df)
+    return {name: PATTERN_FUNCS[name](c) for name in (names or PATTERN_FUNCS)}
+
+
+def classify_patterns(df, names=LEGACY_PATTERNS, masks=None):
+    """행마다 먼저 성립하는 패턴 이름(없으면 'none')을 담은 배열. 기본값은 기존 'pattern' 컬럼과 같은 결과."""
+    masks = masks or detect_patterns(df, names)
+    labels = np.select([masks[name] for name in names], list(names), default='none')
+    return labels.astype(object)
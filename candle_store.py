@@ -0,0 +1,233 @@
+import os
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pyupbit
+
+# -----------------------------------------------------------------------------
+# 캔들 주기 유틸
+# -----------------------------------------------------------------------------
+# 업비트 캔들 인덱스는 KST 기준 시작 시각(naive datetime)이다.
+# 분봉/일봉/주봉 경계는 UTC 기준으로 정렬되어 있으므로(일봉 = KST 09:00) UTC로 내림한 뒤 다시 KST로 변환한다.
+KST_OFFSET = timedelta(hours=9)
+INTERVAL_MINUTES = {
+    'minute1': 1, 'minute3': 3, 'minute5': 5, 'minute10': 10, 'minute15': 15,
+    'minute30': 30, 'minute60': 60, 'minute240': 240,
+    'day': 1440, 'days': 1440, 'week': 10080, 'weeks': 10080,
+}
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'value']
+
+
+def now_kst():
+    return datetime.now(timezone.utc).replace(tzinfo=None) + KST_OFFSET
+
+
+def interval_to_timedelta(interval):
+    minutes = INTERVAL_MINUTES.get(interval)
+    return timedelta(minutes=minutes) if minutes else None
+
+
+def candle_open_time(ts, interval):
+    """ts(KST)가 속한 캔들의 시작 시각(KST)을 반환. 월봉 등 고정 길이가 아닌 주기는 None."""
+    minutes = INTERVAL_MINUTES.get(interval)
+    if minutes is None:
+        return None
+    utc = pd.Timestamp(ts) - KST_OFFSET
+    if minutes == 10080:
+        # 주봉은 월요일 00:00(UTC) 시작
+        day_start = utc.normalize()
+        start = day_start - timedelta(days=day_start.weekday())
+    else:
+        start = utc.floor(f'{minutes}min')
+    return start + KST_OFFSET
+
+
+def next_candle_open_time(ts, interval):
+    start = candle_open_time(ts, interval)
+    if start is None:
+        return None
+    return start + interval_to_timedelta(interval)
+
+
+class KeyedLocks:
+    """키별 Lock. 같은 (종목, 주기)에 대한 동시 조회를 한 번으로 합치는 데 사용."""
+    def __init__(self):
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def __call__(self, key):
+        with self._guard:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+
+# -----------------------------------------------------------------------------
+# 로컬 OHLCV 캔들 저장소
+# -----------------------------------------------------------------------------
+class CandleStore:
+    """
+    (종목, 주기)별 OHLCV 캔들을 디스크에 보관하고, 마지막 저장 캔들 이후분만 API로 조회합니다.
+    마지막 캔들은 진행 중일 수 있으므로 항상 다시 받아 덮어씁니다.
+    """
+    def __init__(self, cache_dir="candle_cache", max_candles=5000):
+        self.cache_dir = cache_dir
+        self.max_candles = max_candles
+        self._frames = {}          # (ticker, interval) -> DataFrame
+        self._exhausted = set()    # 더 이상 과거 데이터가 없는 (ticker, interval)
+        self._lock = KeyedLocks()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, ticker, interval):
+        safe = re.sub(r'[^A-Za-z0-9_\-]', '_', f"{ticker}_{interval}")
+        return os.path.join(self.cache_dir, f"{safe}.pkl")
+
+    def _load(self, key):
+        if key in self._frames:
+            return self._frames[key]
+        path = self._path(*key)
+        df = None
+        if os.path.exists(path):
+            try:
+                df = pd.read_pickle(path)
+            except Exception as e:
+                print(f"❗️ 캔들 캐시 파일 손상({path}): {e} - 새로 받습니다.")
+                df = None
+        self._frames[key] = df
+        return df
+
+    def _save(self, key, df):
+        if len(df) > self.max_candles:
+            df = df.iloc[-self.max_candles:]
+            self._exhausted.discard(key)  # 가장 오래된 캔들이 잘려나감
+        self._frames[key] = df
+        try:
+            tmp_path = self._path(*key) + ".tmp"
+            df.to_pickle(tmp_path)
+            os.replace(tmp_path, self._path(*key))
+        except Exception as e:
+            print(f"❗️ 캔들 캐시 저장 실패({key}): {e}")
+        return df
+
+    @staticmethod
+    def _merge(old, new):
+        if old is None or old.empty:
+            merged = new
+        elif new is None or new.empty:
+            merged = old
+        else:
+            merged = pd.concat([old, new])
+            merged = merged[~merged.index.duplicated(keep='last')]
+        cols = [c for c in OHLCV_COLUMNS if c in merged.columns]
+        return merged[cols].sort_index()
+
+    def _missing_count(self, stored, interval):
+        """마지막 저장 캔들(포함)부터 현재까지 필요한 캔들 수. 고정 길이가 아닌 주기는 2개만 다시 받는다."""
+        step = interval_to_timedelta(interval)
+        if step is None:
+            return 2
+        elapsed = now_kst() - stored.index[-1].to_pydatetime()
+        return max(1, int(elapsed / step) + 1)
+
+    def get_ohlcv(self, ticker, interval='day', count=200):
+        """최신 count개 캔들(OHLCV)을 반환. 저장분이 충분하면 신규 캔들만 조회합니다."""
+        key = (ticker, interval)
+        with self._lock(key):
+            stored = self._load(key)
+            if stored is not None and not stored.empty and (len(stored) >= count or key in self._exhausted):
+                # 저장분 이후 캔들만 조회 (보관 한도 이내면 여러 번에 나눠서라도 빈 구간 없이 이어 붙임)
+                missing = self._missing_count(stored, interval)
+                fetch_count = missing if missing <= self.max_candles else count
+            else:
+                fetch_count = count
+            fresh = pyupbit.get_ohlcv(ticker, interval=interval, count=fetch_count)
+            if fresh is None or fresh.empty:
+                if stored is None or stored.empty:
+                    return None
+                return stored.iloc[-count:].copy()
+            if stored is not None and not stored.empty and fresh.index[0] > stored.index[-1]:
+                # 저장분과 신규분 사이에 빈 구간이 생기면 저장분을 버림
+                stored = None
+                self._exhausted.discard(key)
+            if fetch_count == count and len(fresh) < count:
+                self._exhausted.add(key)  # 신규 상장 등으로 전체 이력이 count개 미만
+            stored = self._save(key, self._merge(stored, fresh))
+            return stored.iloc[-count:].copy()
+
+    def get_ohlcv_before(self, ticker, interval, to, count=200):
+        """
+        to 시각 이전 캔들을 최대 count개 반환(과거 데이터 스크롤용).
+        저장소에 충분히 있으면 API를 호출하지 않습니다. to는 pyupbit get_ohlcv의 to 인자와 같은 형식입니다.
+        """
+        key = (ticker, interval)
+        to_ts = pd.to_datetime(to)
+        with self._lock(key):
+            stored = self._load(key)
+            if stored is not None and not stored.empty:
+                cached = stored[stored.index <= to_ts]
+                if len(cached) >= count or (key in self._exhausted and not cached.empty):
+                    return cached.iloc[-count:].copy()
+            older = pyupbit.get_ohlcv(ticker, interval=interval, count=count, to=to)
+            if older is None or older.empty:
+                return older
+            step = interval_to_timedelta(interval)
+            is_contiguous = stored is not None and not stored.empty and step is not None \
+                and older.index[-1] >= stored.index[0] - step
+            if is_contiguous and len(stored) + len(older) <= self.max_candles:
+                # 저장분 바로 앞(또는 겹치는) 구간이면 보관 한도 안에서 디스크에도 반영
+                if len(older) < count:
+                    self._exhausted.add(key)
+                self._save(key, self._merge(older, stored))
+            return older.copy()
+
+
+# -----------------------------------------------------------------------------
+# 캔들 경계 기준 지표 프레임 메모이제이션
+# -----------------------------------------------------------------------------
+class CandleFrameCache:
+    """
+    (종목, 주기)별로 지표가 계산된 프레임을 다음 캔들이 열릴 때까지 재사용합니다.
+    지금까지 요청된 가장 큰 count로 한 번 받아두고, 더 작은 요청에는 뒤쪽 count개를 잘라서 돌려줍니다.
+    clock: 만료 판단에 쓸 현재 시각(KST) 함수. 캔들 마감에 맞춰 깨어나는 쪽과 같은 시계(서버 시각)를 넘겨야
+    로컬 시계가 늦을 때 마감 직후에 이전 봉 프레임을 돌려주지 않습니다.
+    """
+    def __init__(self, clock=None):
+        self.clock = clock or now_kst
+        self._entries = {}   # (ticker, interval) -> (df, window, expires_at)
+        self._windows = {}   # (ticker, interval) -> 지금까지 요청된 최대 count
+        self._lock = KeyedLocks()
+
+    def get(self, ticker, interval, count, loader, prepare=None):
+        """
+        loader(ticker, interval, count)는 DataFrame(또는 None)을 반환해야 합니다.
+        prepare(df)를 주면 보관 중인 프레임에 필요한 컬럼을 채운 뒤 잘라서 돌려줍니다 (추가된 컬럼은 만료 때까지 유지).
+        """
+        key = (ticker, interval)
+        with self._lock(key):
+            window = max(count, self._windows.get(key, 0))
+            self._windows[key] = window
+            now = self.clock()
+            entry = self._entries.get(key)
+            if entry is not None:
+                df, cached_window, expires_at = entry
+                if now < expires_at and cached_window >= count:
+                    if prepare is not None:
+                        prepare(df)
+                    return df.iloc[-count:].copy()
+            df = loader(ticker, interval, window)
+            if df is None or df.empty:
+                self._entries.pop(key, None)
+                return df
+            # 고정 길이가 아닌 주기(월봉 등)는 1분만 보관
+            expires_at = next_candle_open_time(now, interval) or now + timedelta(minutes=1)
+            self._entries[key] = (df, window, expires_at)
+            if prepare is not None:
+                prepare(df)
+            return df.iloc[-count:].copy()
+
+    def invalidate(self, ticker=None, interval=None):
+        for key in list(self._entries):
+            if (ticker is None or key[0] == ticker) and (interval is None or key[1] == interval):
+                self._entries.pop(key, None)
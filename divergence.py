@@ -0,0 +1,94 @@
+import numpy as np
+from scipy.signal import find_peaks
+
+# -----------------------------------------------------------------------------
+# 다이버전스 (가격 vs 보조지표) 벡터 계산
+# -----------------------------------------------------------------------------
+# 연속한 두 고점(피크)/저점(트로프)에서 가격과 보조지표의 방향을 비교합니다.
+#   regular_bearish: 가격 고점 상승, 지표 고점 하락  (상승 추세 약화)
+#   hidden_bearish : 가격 고점 하락, 지표 고점 상승  (하락 추세 지속)
+#   regular_bullish: 가격 저점 하락, 지표 저점 상승  (하락 추세 약화)
+#   hidden_bullish : 가격 저점 상승, 지표 저점 하락  (상승 추세 지속)
+# 결과는 프레임 길이의 bool 배열이고, 두 번째 고점/저점 위치에 True가 표시됩니다.
+DIVERGENCE_KINDS = ('regular_bearish', 'hidden_bearish', 'regular_bullish', 'hidden_bullish')
+DEFAULT_OSCILLATORS = ('rsi', 'macd_hist', 'obv', 'mfi')
+
+
+def find_pivots(values, distance=5, width=1):
+    """고점/저점 인덱스 (NaN은 0으로 보고 계산 - 기존 RSI 피크 계산과 동일)."""
+    values = np.nan_to_num(np.asarray(values, dtype=np.float64), nan=0.0)
+    try:
+        peaks, _ = find_peaks(values, distance=distance, width=width)
+        troughs, _ = find_peaks(-values, distance=distance, width=width)
+    except Exception:
+        peaks, troughs = np.array([], dtype=int), np.array([], dtype=int)
+    return peaks, troughs
+
+
+def _pairs(pivots, max_gap):
+    first, second = pivots[:-1], pivots[1:]
+    if max_gap is not None:
+        near = (second - first) <= max_gap
+        first, second = first[near], second[near]
+    return first, second
+
+
+def pivot_divergence(oscillator, high, low, peaks, troughs, max_gap=None):
+    """주어진 고점/저점 위치에서 4가지 다이버전스를 계산해 {종류: bool 배열} 로 반환."""
+    osc = np.asarray(oscillator, dtype=np.float64)
+    high, low = np.asarray(high, dtype=np.float64), np.asarray(low, dtype=np.float64)
+    n = len(osc)
+    result = {kind: np.zeros(n, dtype=bool) for kind in DIVERGENCE_KINDS}
+    p1, p2 = _pairs(np.asarray(peaks, dtype=int), max_gap)
+    if len(p2):
+        result['regular_bearish'][p2[(osc[p2] < osc[p1]) & (high[p2] > high[p1])]] = True
+        result['hidden_bearish'][p2[(osc[p2] > osc[p1]) & (high[p2] < high[p1])]] = True
+    t1, t2 = _pairs(np.asarray(troughs, dtype=int), max_gap)
+    if len(t2):
+        result['regular_bullish'][t2[(osc[t2] > osc[t1]) & (low[t2] < low[t1])]] = True
+        result['hidden_bullish'][t2[(osc[t2] < osc[t1]) & (low[t2] > low[t1])]] = True
+    return result
+
+
+def oscillator_values(df, name):
+    """프레임에서 보조지표 배열을 꺼냄. macd_hist 컬럼이 없으면 macd - signal로 계산, 없으면 None."""
+    if name in df.columns:
+        return df[name].to_numpy(dtype=np.float64)
+    if name == 'macd_hist' and 'macd' in df.columns and 'signal' in df.columns:
+        return df['macd'].to_numpy(dtype=np.float64) - df['signal'].to_numpy(dtype=np.float64)
+    return None
+
+
+def detect_divergences(df, oscillators=DEFAULT_OSCILLATORS, distance=5, width=1, max_gap=None):
+    """
+    가격 고점(high)/저점(low)을 프레임당 한 번만 찾고, 그 위치에서 여러 보조지표의 다이버전스를 한 번에 계산.
+    반환: {'div_rsi_regular_bearish': bool 배열, ...} (프레임에 없는 지표는 건너뜀)
+    """
+    high, low = df['high'].to_numpy(dtype=np.float64), df['low'].to_numpy(dtype=np.float64)
+    peaks, _ = find_pivots(high, distance, width)
+    _, troughs = find_pivots(low, distance, width)
+    result = {}
+    for name in oscillators:
+        osc = oscillator_values(df, name)
+        if osc is None:
+            continue
+        for kind, mask in pivot_divergence(osc, high, low, peaks, troughs, max_gap).items():
+            result[f'div_{name}_{kind}'] = mask
+    return result
+
+
+def rsi_pivot_divergence(df, distance=5, width=1):
+    """
+    기존 bearish_div / bullish_div 컬럼 계산 (RSI 고점/저점 기준 regular 다이버전스).
+    반환: (bearish bool 배열, bullish bool 배열)
+    """
+    rsi = df['rsi'].to_numpy(dtype=np.float64)
+    peaks, troughs = find_pivots(rsi, distance, width)
+    result = pivot_divergence(rsi, df['high'].to_numpy(dtype=np.float64), df['low'].to_numpy(dtype=np.float64),
+                              peaks, troughs)
+    return result['regular_bearish'], result['regular_bullish']
+
+
+def recent_signal(mask, lookback):
+    """최근 lookback개 봉 안에 True가 있으면 True."""
+    return bool(len(mask) and np.any(mask[-lookback:]))
@@ -0,0 +1,177 @@
+import numpy as np
+
+import indicators
+from candle_patterns import CandleParts, EXTRA_PATTERNS, classify_patterns, detect_patterns
+from divergence import DEFAULT_OSCILLATORS, DIVERGENCE_KINDS, detect_divergences, rsi_pivot_divergence
+from indicator_engine import BASE_COLUMNS, EXTRA_COLUMNS, IndicatorEngine
+
+# -----------------------------------------------------------------------------
+# 지표 레지스트리 (컬럼 그룹 + 의존 관계)
+# -----------------------------------------------------------------------------
+# 지표마다 만드는 컬럼(provides)과 입력 컬럼(requires)을 한 번만 정의합니다.
+# 전략/매도조건/차트/설정 화면은 자기가 쓰는 컬럼 이름만 넘기고, ensure_columns가 그 컬럼을 만드는 그룹과
+# 입력 컬럼의 그룹까지 의존 순서대로 계산합니다.
+# 계산한 그룹은 프레임 버전(마지막 봉의 시각/OHLCV)과 함께 df.attrs에 기록해 두고, 같은 버전에서는
+# 다시 계산하지 않습니다. 새 봉이 붙거나 진행 중인 봉이 바뀌면 그 뒤 첫 요청에서 한 번만 다시 계산합니다.
+# 그룹 함수는 func(df, engine, key) 형태이고 df에 컬럼을 직접 씁니다.
+COLUMN_GROUPS = {}   # 그룹 이름 -> (provides, requires, func)
+_PROVIDERS = {}      # 컬럼 이름 -> 그룹 이름
+
+RAW_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def column_group(name, provides, requires=()):
+    """지표 그룹 등록 데코레이터."""
+    def register(func):
+        COLUMN_GROUPS[name] = (tuple(provides), tuple(requires), func)
+        for column in provides:
+            _PROVIDERS[column] = name
+        return func
+    return register
+
+
+def columns_of(*groups):
+    """그룹 이름들이 만드는 컬럼 목록."""
+    return [column for name in groups for column in COLUMN_GROUPS[name][0]]
+
+
+def plan(columns, present=()):
+    """columns를 만들기 위해 실행할 그룹 이름 목록 (의존 그룹이 먼저)."""
+    present, order, visiting = set(present), [], set()
+
+    def visit(column):
+        if column in present or column in RAW_COLUMNS:
+            return
+        group = _PROVIDERS.get(column)
+        if group is None:
+            raise KeyError(f"알 수 없는 지표 컬럼: {column}")
+        if group in order:
+            return
+        if group in visiting:
+            raise ValueError(f"지표 그룹 순환 의존: {group}")
+        visiting.add(group)
+        for required in COLUMN_GROUPS[group][1]:
+            visit(required)
+        visiting.discard(group)
+        order.append(group)
+
+    for column in columns:
+        visit(column)
+    return order
+
+
+def frame_version(df):
+    """마지막 봉의 (시각, OHLCV). 새 봉이 붙거나 진행 중인 봉이 바뀌면 달라집니다."""
+    if df.empty:
+        return None
+    return (df.index[-1],) + tuple(float(df[col].iat[-1]) for col in RAW_COLUMNS if col in df.columns)
+
+
+def ensure_columns(df, columns, engine=None, key=None):
+    """
+    df에 columns(와 그 의존 컬럼)가 없거나 이전 버전에서 계산된 것이면 계산해 넣고 df를 그대로 반환합니다.
+    engine/key는 MA·RSI·MACD 등 IndicatorEngine 지표에 쓰입니다 (key가 있으면 새 봉/마지막 봉만 계산).
+    """
+    version = frame_version(df)
+    computed = df.attrs.get('indicator_versions', {})   # 그룹 이름 -> 계산한 프레임 버전
+    stale = {column for name, seen in computed.items() if seen != version for column in COLUMN_GROUPS[name][0]}
+    groups = plan(columns, [column for column in df.columns if column not in stale])
+    if not groups:
+        return df
+    if engine is None:
+        engine = IndicatorEngine()
+    computed = dict(computed)
+    for name in groups:
+        COLUMN_GROUPS[name][2](df, engine, key)
+        computed[name] = version
+    df.attrs['indicator_versions'] = computed
+    return df
+
+
+# --- 그룹 정의 -------------------------------------------------------------------
+@column_group('trend', BASE_COLUMNS, requires=('close',))
+def _trend(df, engine, key):
+    # MA 5/20/60/120, RSI, EMA12/26, MACD, signal
+    engine.apply(key, df, BASE_COLUMNS)
+
+
+@column_group('bands_volume', EXTRA_COLUMNS, requires=('close', 'volume'))
+def _bands_volume(df, engine, key):
+    # 볼린저 밴드, OBV, OBV EMA, 거래량 MA20
+    engine.apply(key, df, EXTRA_COLUMNS)
+
+
+@column_group('candle_parts', ('body', 'upper_shadow', 'lower_shadow', 'is_green'),
+              requires=('open', 'high', 'low', 'close'))
+def _candle_parts(df, engine, key):
+    parts = CandleParts(df)
+    df['body'] = parts.body
+    df['upper_shadow'] = parts.upper_shadow
+    df['lower_shadow'] = parts.lower_shadow
+    df['is_green'] = parts.is_green
+
+
+@column_group('patterns', ['pattern'] + [f'cdl_{name}' for name in EXTRA_PATTERNS],
+              requires=('open', 'high', 'low', 'close'))
+def _patterns(df, engine, key):
+    # 'pattern': hammer > bullish_engulfing > shooting_star 순으로 하나만 표시, 그 밖의 패턴은 cdl_* 컬럼(bool)
+    parts = CandleParts(df)
+    masks = detect_patterns(parts)
+    df['pattern'] = classify_patterns(parts, masks=masks)
+    for name in EXTRA_PATTERNS:
+        df[f'cdl_{name}'] = masks[name]
+
+
+@column_group('rsi_divergence', ('bearish_div', 'bullish_div'), requires=('rsi', 'high', 'low'))
+def _rsi_divergence(df, engine, key):
+    # RSI 고점/저점 기준 다이버전스 (기존 bearish_div / bullish_div)
+    df['bearish_div'], df['bullish_div'] = rsi_pivot_divergence(df)
+
+
+@column_group('macd_hist', ('macd_hist',), requires=('macd', 'signal'))
+def _macd_hist(df, engine, key):
+    df['macd_hist'] = df['macd'] - df['signal']
+
+
+@column_group('stochrsi', ('stochrsi',), requires=('rsi',))
+def _stochrsi(df, engine, key):
+    df['stochrsi'] = indicators.stoch_rsi(df['rsi'], period=14, min_periods=1)
+
+
+@column_group('cci', ('cci',), requires=('high', 'low', 'close'))
+def _cci(df, engine, key):
+    # CCI(20) = (전형가격 - 20봉 평균) / (0.015 * 20봉 평균 절대 편차)
+    df['cci'] = indicators.cci(df['high'], df['low'], df['close'], period=20, min_periods=1)
+
+
+@column_group('atr', ('atr',), requires=('high', 'low', 'close'))
+def _atr(df, engine, key):
+    df['atr'] = indicators.atr(df['high'], df['low'], df['close'], period=14)
+
+
+@column_group('adx', ('plus_di', 'minus_di', 'adx'), requires=('high', 'low', 'close'))
+def _adx(df, engine, key):
+    df['plus_di'], df['minus_di'], df['adx'] = indicators.adx(df['high'], df['low'], df['close'], period=14)
+
+
+@column_group('volume_flow', ('mfi', 'vwap', 'cmf', 'ad_line'), requires=('high', 'low', 'close', 'volume'))
+def _volume_flow(df, engine, key):
+    # 거래량 가중 지표 (MFI, VWAP, CMF, A/D)
+    high, low, close, volume = (df[col].to_numpy(dtype=np.float64) for col in ('high', 'low', 'close', 'volume'))
+    df['mfi'] = indicators.money_flow_index(high, low, close, volume, period=14)
+    df['vwap'] = indicators.vwap(high, low, close, volume, window=20)
+    df['cmf'] = indicators.chaikin_money_flow(high, low, close, volume, period=20)
+    df['ad_line'] = indicators.accumulation_distribution(high, low, close, volume)
+
+
+def _divergence_group(oscillator):
+    # 가격 고점/저점 기준 regular/hidden 다이버전스 (div_{지표}_{종류})
+    def compute(df, engine, key):
+        for column, mask in detect_divergences(df, oscillators=(oscillator,)).items():
+            df[column] = mask
+    column_group(f'div_{oscillator}', [f'div_{oscillator}_{kind}' for kind in DIVERGENCE_KINDS],
+                 requires=(oscillator, 'high', 'low'))(compute)
+
+
+for _oscillator in DEFAULT_OSCILLATORS:
+    _divergence_group(_oscillator)
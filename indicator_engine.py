@@ -0,0 +1,259 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import indicators
+
+# -----------------------------------------------------------------------------
+# (종목, 주기)별 증분 지표 계산
+# -----------------------------------------------------------------------------
+MA_PERIODS = (5, 20, 60, 120)
+RSI_PERIOD = 14
+BB_PERIOD = 20
+VOLUME_MA_PERIOD = 20
+OBV_EMA_ALPHA = 1 / 21   # ewm(com=20)
+
+# get_technical_indicators_from_raw에서 공통으로 쓰는 지표 / AI 앱에서 추가로 쓰는 지표
+BASE_COLUMNS = [f'ma{p}' for p in MA_PERIODS] + ['rsi', 'ema12', 'ema26', 'macd', 'signal']
+EXTRA_COLUMNS = ['bb_middle', 'bb_std', 'bb_upper', 'bb_lower', 'obv', 'obv_ema', 'volume_ma20']
+
+PRICE_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def _ema_alpha(span):
+    return 2 / (span + 1)
+
+
+class IndicatorSeries:
+    """
+    한 (종목, 주기)의 OHLCV와 지표 계산 상태(이동합, EMA, OBV 누적값)를 행 단위 배열로 보관합니다.
+    처음(seed)에는 전체를 벡터 연산으로 계산하고, 이후 새 봉 추가(append)와 마지막 봉 변경(update_last)은
+    직전 행의 상태만으로 O(1)에 계산합니다. 결과는 pandas rolling/ewm으로 전체를 다시 계산한 값과 같습니다.
+    """
+    def __init__(self, rsi_min_periods=1, nan_on_zero_loss=True):
+        self.rsi_min_periods = rsi_min_periods
+        self.nan_on_zero_loss = nan_on_zero_loss   # False면 하락폭 합이 0일 때 RSI=100 (상승도 0이면 NaN)
+        self.index = []
+        self.n = 0
+        self._data = {}
+
+    # --- 버퍼 관리 ----------------------------------------------------------
+    def _fields(self):
+        fields = list(PRICE_FIELDS) + [f'sum{p}' for p in MA_PERIODS]
+        fields += ['gain', 'loss', 'gain_sum', 'loss_sum', 'ema12', 'ema26', 'signal',
+                   'sq_sum20', 'obv', 'obv_num', 'obv_den', 'vol_sum20']
+        return fields
+
+    def _reserve(self, size):
+        capacity = len(self._data['close']) if self._data else 0
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2, 256)
+        for name in self._fields():
+            buf = np.full(capacity, np.nan)
+            if name in self._data:
+                buf[:self.n] = self._data[name][:self.n]
+            self._data[name] = buf
+
+    # --- 전체 계산 ----------------------------------------------------------
+    def seed(self, df):
+        """OHLCV 프레임 전체로 상태를 새로 만듭니다 (벡터 연산)."""
+        n = len(df)
+        self._data = {}
+        self.n = 0
+        self._reserve(n)
+        d = self._data
+        for name in PRICE_FIELDS:
+            d[name][:n] = df[name].to_numpy(dtype=float)
+        close, volume = d['close'][:n], d['volume'][:n]
+        self._shift = close[0] if n else 0.0   # 분산 계산 시 자릿수 손실을 줄이기 위한 기준값
+        for p in MA_PERIODS:
+            d[f'sum{p}'][:n] = indicators.rolling_sum(close, p, min_periods=1)
+        delta = np.diff(close, prepend=np.nan)
+        gain, loss = np.where(delta > 0, delta, 0.0), np.where(delta < 0, -delta, 0.0)
+        d['gain'][:n], d['loss'][:n] = gain, loss
+        d['gain_sum'][:n] = indicators.rolling_sum(gain, RSI_PERIOD, min_periods=1)
+        d['loss_sum'][:n] = indicators.rolling_sum(loss, RSI_PERIOD, min_periods=1)
+        d['ema12'][:n] = indicators.ema(close, span=12)
+        d['ema26'][:n] = indicators.ema(close, span=26)
+        d['signal'][:n] = indicators.ema(d['ema12'][:n] - d['ema26'][:n], span=9)
+        d['sq_sum20'][:n] = indicators.rolling_sum((close - self._shift) ** 2, BB_PERIOD, min_periods=1)
+        obv = indicators.obv(close, volume)
+        d['obv'][:n] = obv
+        # 조정(adjust=True) EMA = 가중합 / 가중치합 으로 분리해 두면 다음 값도 O(1)로 계산 가능
+        decay = 1 - OBV_EMA_ALPHA
+        den = (1 - decay ** np.arange(1, n + 1)) / OBV_EMA_ALPHA
+        d['obv_den'][:n] = den
+        d['obv_num'][:n] = indicators.ema(obv, alpha=OBV_EMA_ALPHA, adjust=True) * den
+        d['vol_sum20'][:n] = indicators.rolling_sum(volume, VOLUME_MA_PERIOD, min_periods=1)
+        self.index = list(df.index)
+        self.n = n
+
+    # --- 증분 계산 ----------------------------------------------------------
+    def _compute_row(self, i):
+        d = self._data
+        close, volume = d['close'][i], d['volume'][i]
+        if i == 0:
+            self._shift = close
+            for p in MA_PERIODS:
+                d[f'sum{p}'][0] = close
+            for name in ('gain', 'loss', 'gain_sum', 'loss_sum', 'obv'):
+                d[name][0] = 0.0
+            d['ema12'][0] = d['ema26'][0] = close
+            d['signal'][0] = 0.0
+            d['sq_sum20'][0] = 0.0
+            d['obv_num'][0], d['obv_den'][0] = 0.0, 1.0
+            d['vol_sum20'][0] = volume
+            return
+        prev_close = d['close'][i - 1]
+        for p in MA_PERIODS:
+            d[f'sum{p}'][i] = d[f'sum{p}'][i - 1] + close - (d['close'][i - p] if i >= p else 0.0)
+        change = close - prev_close
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        d['gain'][i], d['loss'][i] = gain, loss
+        old = i - RSI_PERIOD
+        d['gain_sum'][i] = d['gain_sum'][i - 1] + gain - (d['gain'][old] if old >= 0 else 0.0)
+        d['loss_sum'][i] = d['loss_sum'][i - 1] + loss - (d['loss'][old] if old >= 0 else 0.0)
+        for span in (12, 26):
+            a = _ema_alpha(span)
+            d[f'ema{span}'][i] = a * close + (1 - a) * d[f'ema{span}'][i - 1]
+        a = _ema_alpha(9)
+        d['signal'][i] = a * (d['ema12'][i] - d['ema26'][i]) + (1 - a) * d['signal'][i - 1]
+        old = i - BB_PERIOD
+        d['sq_sum20'][i] = (d['sq_sum20'][i - 1] + (close - self._shift) ** 2
+                            - ((d['close'][old] - self._shift) ** 2 if old >= 0 else 0.0))
+        d['obv'][i] = d['obv'][i - 1] + np.sign(change) * volume
+        decay = 1 - OBV_EMA_ALPHA
+        d['obv_num'][i] = d['obv'][i] + decay * d['obv_num'][i - 1]
+        d['obv_den'][i] = 1.0 + decay * d['obv_den'][i - 1]
+        old = i - VOLUME_MA_PERIOD
+        d['vol_sum20'][i] = d['vol_sum20'][i - 1] + volume - (d['volume'][old] if old >= 0 else 0.0)
+
+    def _write_prices(self, i, bar):
+        for name in PRICE_FIELDS:
+            self._data[name][i] = float(bar[name])
+
+    def append(self, timestamp, bar):
+        """새 봉 추가. bar는 open/high/low/close/volume을 가진 dict 또는 Series."""
+        self._reserve(self.n + 1)
+        self._write_prices(self.n, bar)
+        self._compute_row(self.n)
+        self.index.append(timestamp)
+        self.n += 1
+
+    def update_last(self, bar):
+        """진행 중인 마지막 봉의 값이 바뀌었을 때 마지막 행만 다시 계산."""
+        if self.n == 0:
+            return
+        self._write_prices(self.n - 1, bar)
+        self._compute_row(self.n - 1)
+
+    def sync(self, df):
+        """
+        df(OHLCV)에 맞춰 상태를 갱신. 보관 중인 행 뒤에 봉이 이어지기만 했으면 마지막 봉 갱신 + 새 봉 추가만 하고,
+        시작 시각이 다르거나(과거 데이터 추가, 조회 구간 이동) 짧아졌으면 전체를 다시 계산합니다.
+        반환값: 'seed' / 'incremental'
+        """
+        n = self.n
+        index = df.index
+        if n == 0 or len(index) < n or index[0] != self.index[0] or index[n - 1] != self.index[-1]:
+            self.seed(df)
+            return 'seed'
+        prices = df[list(PRICE_FIELDS)].to_numpy(dtype=float)
+        last = prices[n - 1]
+        if any(last[k] != self._data[name][n - 1] for k, name in enumerate(PRICE_FIELDS)):
+            self.update_last(dict(zip(PRICE_FIELDS, last)))
+        for row in range(n, len(index)):
+            self.append(index[row], dict(zip(PRICE_FIELDS, prices[row])))
+        return 'incremental'
+
+    # --- 결과 --------------------------------------------------------------
+    def _columns(self, start, stop):
+        d = self._data
+        counts = np.arange(start, stop) + 1   # 행별 관측 개수 (min_periods 처리용)
+        out = {}
+        for p in MA_PERIODS:
+            out[f'ma{p}'] = d[f'sum{p}'][start:stop] / np.minimum(counts, p)
+        gain_sum, loss_sum = d['gain_sum'][start:stop], d['loss_sum'][start:stop]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = gain_sum / loss_sum
+            rsi = 100 - (100 / (1 + rs))
+        if self.nan_on_zero_loss:
+            rsi[loss_sum == 0] = np.nan
+        rsi[counts < self.rsi_min_periods] = np.nan
+        out['rsi'] = rsi
+        out['ema12'], out['ema26'] = d['ema12'][start:stop].copy(), d['ema26'][start:stop].copy()
+        out['macd'] = out['ema12'] - out['ema26']
+        out['signal'] = d['signal'][start:stop].copy()
+        middle = d['sum20'][start:stop] / BB_PERIOD
+        shifted_sum = d['sum20'][start:stop] - BB_PERIOD * self._shift
+        variance = (d['sq_sum20'][start:stop] - shifted_sum ** 2 / BB_PERIOD) / (BB_PERIOD - 1)
+        std = np.sqrt(np.maximum(variance, 0.0))
+        warm = counts >= BB_PERIOD
+        out['bb_middle'] = np.where(warm, middle, np.nan)
+        out['bb_std'] = np.where(warm, std, np.nan)
+        out['bb_upper'] = out['bb_middle'] + out['bb_std'] * 2
+        out['bb_lower'] = out['bb_middle'] - out['bb_std'] * 2
+        out['obv'] = d['obv'][start:stop].copy()
+        out['obv_ema'] = d['obv_num'][start:stop] / d['obv_den'][start:stop]
+        out['volume_ma20'] = d['vol_sum20'][start:stop] / np.minimum(counts, VOLUME_MA_PERIOD)
+        return out
+
+    def columns(self, names=BASE_COLUMNS):
+        """전체 행에 대한 지표 배열 {컬럼: ndarray}."""
+        out = self._columns(0, self.n)
+        return {name: out[name] for name in names}
+
+    def last_values(self, names=BASE_COLUMNS):
+        """마지막 행의 지표 값 {컬럼: float} (실시간 틱마다 차트 마지막 봉만 갱신할 때 사용)."""
+        out = self._columns(self.n - 1, self.n)
+        return {name: float(out[name][0]) for name in names}
+
+
+class IndicatorEngine:
+    """
+    (종목, 주기[, 용도]) 키별 IndicatorSeries 보관소. 오래 쓰지 않은 키는 max_series 개를 넘으면 버립니다.
+    차트처럼 봉이 뒤로 이어지는 프레임은 증분으로, 최근 N개 조회처럼 시작점이 움직이는 프레임은 다시 계산됩니다.
+    """
+    def __init__(self, max_series=64, **series_options):
+        self.max_series = max_series
+        self.series_options = series_options
+        self._series = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_series(self, key):
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = IndicatorSeries(**self.series_options)
+            while len(self._series) > self.max_series:
+                self._series.popitem(last=False)
+        self._series.move_to_end(key)
+        return series
+
+    def apply(self, key, df, names=BASE_COLUMNS):
+        """df(OHLCV)에 지표 컬럼을 채워 넣고 그대로 반환. key가 None이면 상태를 보관하지 않고 한 번만 계산."""
+        with self._lock:
+            series = self._get_series(key) if key is not None else IndicatorSeries(**self.series_options)
+            series.sync(df)
+            columns = series.columns(names)
+        for name, values in columns.items():
+            df[name] = values
+        return df
+
+    def update_last(self, key, timestamp, bar, names=BASE_COLUMNS):
+        """추적 중인 키의 마지막 봉(timestamp)만 갱신하고 마지막 행 지표를 반환. 마지막 봉이 다르면 None."""
+        with self._lock:
+            series = self._series.get(key)
+            if series is None or series.n == 0 or series.index[-1] != timestamp:
+                return None
+            series.update_last(bar)
+            return series.last_values(names)
+
+    def drop(self, key):
+        with self._lock:
+            self._series.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
@@ -0,0 +1,313 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+# -----------------------------------------------------------------------------
+# 지표 계산 (float64 배열 기반)
+# -----------------------------------------------------------------------------
+# 입력은 1차원 배열(또는 Series.to_numpy())이고 결과도 같은 길이의 float64 배열입니다.
+# 앞쪽에 창(window)이 다 차지 않은 구간은 NaN (pandas rolling 기본값과 동일).
+
+
+def as_array(values):
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _window_reduce(values, window, ufunc):
+    """
+    창 크기 단위 블록 안에서 앞→뒤/뒤→앞 누적(ufunc.accumulate)을 한 번씩 구해 모든 창의 결과를 O(n)에 계산.
+    창 [i-window+1, i]는 최대 두 블록에 걸치므로 (앞 블록의 뒤쪽 누적) ∘ (뒤 블록의 앞쪽 누적)이 됩니다.
+    합계도 한 번에 최대 2*window개만 더하므로 전체 누적합 차이보다 오차가 작습니다.
+    앞쪽 창이 다 차지 않은 행은 있는 값만으로 계산합니다 (min_periods 처리는 호출하는 쪽에서).
+    """
+    n = len(values)
+    if n <= window:
+        return ufunc.accumulate(values)
+    blocks = -(-n // window)
+    padded = np.empty(blocks * window)
+    padded[:n] = values
+    padded[n:] = values[-1]
+    padded = padded.reshape(blocks, window)
+    prefix_blocks = ufunc.accumulate(padded, axis=1)
+    prefix = prefix_blocks.ravel()[:n]
+    if ufunc is np.add:
+        # 합계는 (블록 합 - 앞쪽 누적 + 자기 값)으로 뒤쪽 누적을 바로 구함
+        suffix_blocks = np.subtract(prefix_blocks[:, -1:], prefix_blocks)
+        suffix_blocks += padded
+    else:
+        suffix_blocks = ufunc.accumulate(padded[:, ::-1], axis=1)[:, ::-1]
+    suffix = suffix_blocks.ravel()[1:n - window + 1]
+    out = prefix.copy()
+    # 행 i(>= window)의 창 시작은 i-window+1, 창이 블록과 정확히 겹치는 행은 prefix 그대로
+    ufunc(suffix, prefix[window:], out=out[window:])
+    out[2 * window - 1::window] = prefix[2 * window - 1::window]
+    return out
+
+
+def _counts(values, window):
+    """(창 안의 유효 값 개수, NaN 존재 여부)"""
+    nan_mask = np.isnan(values)
+    if not nan_mask.any():
+        return np.minimum(np.arange(1, len(values) + 1), window).astype(np.float64), False
+    return _window_reduce((~nan_mask).astype(np.float64), window, np.add), True
+
+
+def _mask_min_periods(out, counts, window, min_periods, floor=1):
+    out[counts < max(window if min_periods is None else min_periods, floor)] = np.nan
+    return out
+
+
+def rolling_count(values, window):
+    """창 안의 유효(NaN 아닌) 값 개수."""
+    return _counts(as_array(values), window)[0]
+
+
+def rolling_sum(values, window, min_periods=None):
+    """pandas rolling(window, min_periods).sum()과 같은 결과 (NaN은 건너뛰고, 유효 개수가 min_periods 미만이면 NaN)."""
+    values = as_array(values)
+    counts, has_nan = _counts(values, window)
+    sums = _window_reduce(np.nan_to_num(values, nan=0.0) if has_nan else values, window, np.add)
+    return _mask_min_periods(sums, counts, window, min_periods)
+
+
+def sma(values, window, min_periods=None):
+    """단순 이동평균 = rolling(window, min_periods).mean()."""
+    values = as_array(values)
+    counts, has_nan = _counts(values, window)
+    sums = _window_reduce(np.nan_to_num(values, nan=0.0) if has_nan else values, window, np.add)
+    sums /= counts
+    return _mask_min_periods(sums, counts, window, min_periods)
+
+
+def rolling_min(values, window, min_periods=None):
+    values = as_array(values)
+    out = _window_reduce(values, window, np.fmin)   # fmin/fmax는 NaN을 건너뜀
+    return _mask_min_periods(out, _counts(values, window)[0], window, min_periods)
+
+
+def rolling_max(values, window, min_periods=None):
+    values = as_array(values)
+    out = _window_reduce(values, window, np.fmax)
+    return _mask_min_periods(out, _counts(values, window)[0], window, min_periods)
+
+
+def rolling_mean_std(values, window, min_periods=None):
+    """(rolling mean, 표본 표준편차(ddof=1)) - 평균을 뺀 값으로 1, 2차 합을 한 번씩만 계산."""
+    values = as_array(values)
+    counts, has_nan = _counts(values, window)
+    shift = np.nanmean(values) if len(values) and counts.any() else 0.0   # 자릿수 손실을 줄이기 위한 기준값
+    centered = values - shift
+    if has_nan:
+        centered = np.nan_to_num(centered, nan=0.0)
+    s1 = _window_reduce(centered, window, np.add)
+    s2 = _window_reduce(centered * centered, window, np.add)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = s1 / counts
+        m2 = s2 - s1 * mean
+        m2[m2 <= s2 * 1e-13] = 0.0   # 값이 모두 같은 창은 반올림 오차 대신 정확히 0
+        std = np.sqrt(m2 / (counts - 1))
+    mean += shift
+    return (_mask_min_periods(mean, counts, window, min_periods),
+            _mask_min_periods(std, counts, window, min_periods, floor=2))
+
+
+def rolling_std(values, window, min_periods=None):
+    """표본 표준편차(ddof=1) = rolling(window, min_periods).std()."""
+    return rolling_mean_std(values, window, min_periods)[1]
+
+
+def mean_abs_deviation(values, window, min_periods=None):
+    """
+    창 안의 평균 절대 편차 = rolling(window, min_periods).apply(lambda x: np.mean(np.abs(x - np.mean(x)))).
+    창마다 평균이 달라 누적합으로는 못 구하므로, 복사 없는 (n, window) 창 뷰(stride tricks)에서 한 번에 계산합니다.
+    창 크기가 고정이면 O(n). 입력에 NaN이 없다고 가정합니다 (가격/전형가격).
+    """
+    values = as_array(values)
+    n = len(values)
+    out = np.empty(n)
+    if n == 0:
+        return out
+    # 앞쪽 window-1개 행은 창이 다 차지 않으므로 NaN으로 채운 뒤 nanmean
+    view = sliding_window_view(np.concatenate((np.full(window - 1, np.nan), values)), window)
+    head = min(window - 1, n)
+    if head:
+        partial = view[:head]
+        out[:head] = np.nanmean(np.abs(partial - np.nanmean(partial, axis=1)[:, None]), axis=1)
+    if n > head:
+        full = view[head:]
+        out[head:] = np.abs(full - full.mean(axis=1)[:, None]).mean(axis=1)
+    return _mask_min_periods(out, _counts(values, window)[0], window, min_periods)
+
+
+def ema(values, span=None, alpha=None, adjust=False):
+    """
+    지수이동평균 = ewm(span|alpha, adjust).mean(). 재귀식을 scipy lfilter로 한 번에 계산합니다.
+    입력에 NaN이 없다고 가정합니다 (가격/거래량, 그로부터 만든 MACD 등).
+    """
+    values = as_array(values)
+    alpha = 2 / (span + 1) if alpha is None else alpha
+    decay = 1 - alpha
+    if len(values) == 0:
+        return values.copy()
+    if adjust:
+        # 가중합 / 가중치합 (가중치 1, decay, decay^2, ...)
+        num = lfilter([1.0], [1.0, -decay], values)
+        den = lfilter([1.0], [1.0, -decay], np.ones_like(values))
+        return num / den
+    out = np.empty_like(values)
+    out[0] = values[0]
+    if len(values) > 1:
+        out[1:], _ = lfilter([alpha], [1.0, -decay], values[1:], zi=[decay * values[0]])
+    return out
+
+
+# --- 가격 지표 -------------------------------------------------------------------
+def rsi(close, period=14, min_periods=1, nan_on_zero_loss=True):
+    """
+    단순 이동평균 방식 RSI. 첫 봉의 변화량은 0으로 봅니다.
+    nan_on_zero_loss=True면 하락폭 합이 0일 때 NaN (upbit.py), False면 100 (상승폭도 0이면 NaN, AI 앱).
+    """
+    close = as_array(close)
+    delta = np.diff(close, prepend=np.nan)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    gain_sum = rolling_sum(gain, period, min_periods)
+    loss_sum = rolling_sum(loss, period, min_periods)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = 100 - (100 / (1 + gain_sum / loss_sum))
+    if nan_on_zero_loss:
+        out[loss_sum == 0] = np.nan
+    return out
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """(macd, signal, histogram)"""
+    line = ema(close, span=fast) - ema(close, span=slow)
+    signal_line = ema(line, span=signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(close, period=20, k=2):
+    """(middle, std, upper, lower) - 창이 다 차기 전은 NaN."""
+    middle, std = rolling_mean_std(close, period)
+    return middle, std, middle + std * k, middle - std * k
+
+
+def obv(close, volume):
+    """On-Balance Volume. 종가 상승이면 +거래량, 하락이면 -거래량, 첫 봉은 0."""
+    close, volume = as_array(close), as_array(volume)
+    step = np.sign(np.diff(close, prepend=np.nan)) * volume
+    return np.cumsum(np.nan_to_num(step, nan=0.0))
+
+
+def cci(high, low, close, period=20, min_periods=1, constant=0.015):
+    """
+    CCI = (전형가격 - period 평균) / (constant * period 평균 절대 편차).
+    평균 절대 편차가 0인 창(값이 모두 같은 창, 첫 봉)은 기존 계산처럼 NaN.
+    """
+    tp = typical_price(high, low, close)
+    ma = sma(tp, period, min_periods)
+    md = mean_abs_deviation(tp, period, min_periods)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = (tp - ma) / (constant * md)
+    out[md == 0] = np.nan
+    return out
+
+
+def true_range(high, low, close):
+    """max(고가-저가, |고가-전봉 종가|, |저가-전봉 종가|). 첫 봉은 고가-저가."""
+    high, low, close = as_array(high), as_array(low), as_array(close)
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def atr(high, low, close, period=14):
+    """Average True Range (Wilder 평활 = ewm(alpha=1/period, adjust=False))."""
+    return ema(true_range(high, low, close), alpha=1 / period)
+
+
+def adx(high, low, close, period=14):
+    """(+DI, -DI, ADX) - Wilder 평활. 첫 봉의 방향 이동폭은 0, 변동이 없던 구간의 DI/DX는 0."""
+    high, low = as_array(high), as_array(low)
+    up = np.diff(high, prepend=high[:1])
+    down = -np.diff(low, prepend=low[:1])
+    plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+    minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+    tr = atr(high, low, close, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = np.where(tr > 0, 100 * ema(plus_dm, alpha=1 / period) / tr, 0.0)
+        minus_di = np.where(tr > 0, 100 * ema(minus_dm, alpha=1 / period) / tr, 0.0)
+        di_sum = plus_di + minus_di
+        dx = np.where(di_sum > 0, 100 * np.abs(plus_di - minus_di) / di_sum, 0.0)
+    return plus_di, minus_di, ema(dx, alpha=1 / period)
+
+
+def stoch_rsi(rsi_values, period=14, min_periods=1):
+    """(RSI - 기간 최저) / (기간 최고 - 기간 최저)"""
+    rsi_values = as_array(rsi_values)
+    low, high = rolling_min(rsi_values, period, min_periods), rolling_max(rsi_values, period, min_periods)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (rsi_values - low) / (high - low)
+
+
+# --- 거래량 가중 지표 -----------------------------------------------------------
+def typical_price(high, low, close):
+    return (as_array(high) + as_array(low) + as_array(close)) / 3
+
+
+def money_flow_index(high, low, close, volume, period=14):
+    """
+    MFI. 기존 AI 앱 계산과 같은 규칙을 따릅니다.
+    - 첫 봉과 period번째 봉까지는 50
+    - 하락 자금 흐름 합이 0이면(상승만 있으면) money ratio 0 → MFI 0, 둘 다 0이면 50
+    """
+    tp = typical_price(high, low, close)
+    flow = tp * as_array(volume)
+    n = len(tp)
+    mfi = np.full(n, 50.0)
+    if n < 2:
+        return mfi
+    rising, falling = tp[1:] > tp[:-1], tp[1:] < tp[:-1]
+    positive = rolling_sum(np.where(rising, flow[1:], 0.0), period)
+    negative = rolling_sum(np.where(falling, flow[1:], 0.0), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = positive / negative
+    ratio[np.isinf(ratio)] = 0.0
+    values = 100 - (100 / (1 + ratio))
+    mfi[1:] = np.where(np.isnan(values), 50.0, values)
+    return mfi
+
+
+def money_flow_volume(high, low, close, volume):
+    """Chaikin money flow volume = ((종가-저가) - (고가-종가)) / (고가-저가) * 거래량. 고가=저가면 0."""
+    high, low, close = as_array(high), as_array(low), as_array(close)
+    spread = high - low
+    with np.errstate(divide='ignore', invalid='ignore'):
+        multiplier = np.where(spread > 0, ((close - low) - (high - close)) / spread, 0.0)
+    return multiplier * as_array(volume)
+
+
+def accumulation_distribution(high, low, close, volume):
+    """A/D 라인 (money flow volume 누적합)."""
+    return np.nancumsum(money_flow_volume(high, low, close, volume))
+
+
+def chaikin_money_flow(high, low, close, volume, period=20):
+    """CMF = period 기간 money flow volume 합 / 거래량 합."""
+    mfv_sum = rolling_sum(money_flow_volume(high, low, close, volume), period)
+    volume_sum = rolling_sum(volume, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cmf = mfv_sum / volume_sum
+    cmf[volume_sum == 0] = 0.0   # 거래가 없던 구간
+    return cmf
+
+
+def vwap(high, low, close, volume, window=None):
+    """거래량 가중 평균가 (전형가격 기준). window를 주면 최근 window개 봉 기준, 없으면 프레임 시작부터 누적."""
+    tp, volume = typical_price(high, low, close), as_array(volume)
+    if window is None:
+        pv, vol = np.nancumsum(tp * volume), np.nancumsum(volume)
+    else:
+        pv, vol = rolling_sum(tp * volume, window), rolling_sum(volume, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(vol > 0, pv / vol, np.nan)
@@ -0,0 +1,192 @@
+import os
+import json
+import time
+import threading
+
+import upbit_http
+
+# -----------------------------------------------------------------------------
+# 마켓 메타데이터(종목명, 유의/정지 상태) 캐시
+# -----------------------------------------------------------------------------
+MARKET_ALL_URL = "https://api.upbit.com/v1/market/all?isDetails=true"
+TICKER_URL = "https://api.upbit.com/v1/ticker"
+META_FIELDS = ('market', 'korean_name', 'english_name', 'market_warning')
+
+
+def diff_markets(old, new):
+    """이전/현재 마켓 목록을 비교해 신규 상장, 상장 폐지, 유의/정지 상태 변경을 반환."""
+    listed = sorted(set(new) - set(old))
+    delisted = sorted(set(old) - set(new))
+    warning_changed = [
+        (market, old[market].get('market_warning', 'NONE'), new[market].get('market_warning', 'NONE'))
+        for market in sorted(set(old) & set(new))
+        if old[market].get('market_warning', 'NONE') != new[market].get('market_warning', 'NONE')
+    ]
+    return {'listed': listed, 'delisted': delisted, 'warning_changed': warning_changed}
+
+
+def has_changes(diff):
+    return bool(diff and (diff['listed'] or diff['delisted'] or diff['warning_changed']))
+
+
+class MarketMetadataCache:
+    """
+    market/all 응답을 로컬 스냅샷으로 보관하고, 시작 시에는 스냅샷을, 이후에는 느린 주기(기본 1시간)로 갱신합니다.
+    갱신할 때마다 이전 목록과의 차이(diff)를 돌려주므로 변경이 있을 때만 GUI/자동매매에 반영하면 됩니다.
+    목록에서 사라진 종목은 세션 동안 거래정지(TRADING_SUSPENSION)로 표시합니다.
+    """
+    def __init__(self, snapshot_path="market_snapshot.json", refresh_interval=3600, quote="KRW"):
+        self.snapshot_path = snapshot_path
+        self.refresh_interval = refresh_interval
+        self.quote = quote
+        self.markets = {}        # market -> 메타데이터
+        self.delisted = {}       # 세션 중 사라진 market -> 메타데이터(거래정지 표시)
+        self.last_refresh = 0.0  # 마지막으로 서버에서 받은 시각 (스냅샷 로드만 했으면 0)
+        self._lock = threading.Lock()
+        self.load_snapshot()
+
+    def load_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self.markets = {item['market']: item for item in snapshot.get('markets', [])}
+            print(f"✅ 마켓 정보 스냅샷 로드 완료 ({len(self.markets)}개)")
+            return True
+        except (OSError, ValueError, KeyError) as e:
+            print(f"❗️ 마켓 정보 스냅샷 로드 실패: {e}")
+            return False
+
+    def save_snapshot(self):
+        try:
+            tmp_path = self.snapshot_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({'saved_at': time.time(), 'markets': list(self.markets.values())}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            print(f"❗️ 마켓 정보 스냅샷 저장 실패: {e}")
+
+    def needs_refresh(self):
+        return time.time() - self.last_refresh >= self.refresh_interval
+
+    def refresh(self):
+        """서버에서 마켓 목록을 받아 갱신하고 diff를 반환. 실패하면 예외를 그대로 올립니다."""
+        response = upbit_http.get(MARKET_ALL_URL)
+        response.raise_for_status()
+        prefix = f"{self.quote}-"
+        live = {
+            item['market']: {k: item.get(k) for k in META_FIELDS if k in item}
+            for item in response.json() if item['market'].startswith(prefix)
+        }
+        with self._lock:
+            diff = diff_markets(self.markets, live)
+            for market in diff['delisted']:
+                info = dict(self.markets[market])
+                info['market_warning'] = 'TRADING_SUSPENSION'
+                self.delisted[market] = info
+            for market in diff['listed']:
+                self.delisted.pop(market, None)
+            self.markets = live
+            self.last_refresh = time.time()
+        if has_changes(diff) or not os.path.exists(self.snapshot_path):
+            self.save_snapshot()
+        return diff
+
+    def tradable_markets(self):
+        return list(self.markets)
+
+    def all_markets(self):
+        """정상 마켓 + 상장폐지(거래정지 표시) 마켓의 메타데이터 사본."""
+        with self._lock:
+            items = [dict(info) for info in self.markets.values()]
+            items += [dict(info) for info in self.delisted.values()]
+        return items
+
+    def is_suspended(self, market):
+        if market in self.delisted:
+            return True
+        return self.markets.get(market, {}).get('market_warning') == 'TRADING_SUSPENSION'
+
+
+def fetch_tickers(markets):
+    """여러 마켓의 현재가 정보를 한 번의 /v1/ticker 요청으로 조회해 {market: ticker} 로 반환."""
+    if not markets:
+        return {}
+    response = upbit_http.get(TICKER_URL, params={'markets': ','.join(markets)})
+    response.raise_for_status()
+    return {item['market']: item for item in response.json()}
+
+
+# -----------------------------------------------------------------------------
+# 마켓 시세 변경분(delta) 추적
+# -----------------------------------------------------------------------------
+DELTA_FIELDS = ('trade_price', 'signed_change_rate', 'acc_trade_price_24h', 'market_warning')
+
+
+class TickerDeltaTracker:
+    """
+    직전 시세 스냅샷을 기억해 두고, 새 시세에서 값이 바뀐 필드만 {market: {필드: 값}} 으로 돌려줍니다.
+    종목이 새로 생기거나 빠지면 added/removed로 알려주므로 그때만 목록 전체를 다시 그리면 됩니다.
+    """
+    def __init__(self, fields=DELTA_FIELDS):
+        self.fields = fields
+        self.previous = {}
+
+    def update(self, rows):
+        current = {row['market']: {f: row.get(f) for f in self.fields} for row in rows}
+        changed = {}
+        for market, values in current.items():
+            prev = self.previous.get(market)
+            if prev is None:
+                continue
+            fields = {f: v for f, v in values.items() if prev.get(f) != v}
+            if fields:
+                changed[market] = fields
+        added = [m for m in current if m not in self.previous]
+        removed = [m for m in self.previous if m not in current]
+        self.previous = current
+        return {'changed': changed, 'added': added, 'removed': removed}
+
+    def reset(self):
+        self.previous = {}
+
+
+# -----------------------------------------------------------------------------
+# 자동매매 1회 순회용 시세/잔고 스냅샷
+# -----------------------------------------------------------------------------
+class MarketSnapshot:
+    """
+    자동매매 한 사이클 동안 사용할 현재가와 잔고를 한 번에 받아 둡니다.
+    현재가는 /v1/ticker 한 번(여러 마켓), 잔고는 /v1/accounts 한 번으로 조회합니다.
+    """
+    def __init__(self, tickers, balances):
+        self.tickers = tickers        # market -> /v1/ticker 응답
+        self.accounts = {b['currency']: b for b in balances if isinstance(b, dict) and 'currency' in b}
+        self.created_at = time.time()
+
+    @classmethod
+    def build(cls, upbit, markets, balances=None):
+        """balances를 넘기면(예: 잔고 캐시) accounts 조회를 생략합니다."""
+        tickers = fetch_tickers(list(markets))
+        if balances is None:
+            balances = upbit.get_balances()
+        return cls(tickers, balances or [])
+
+    def price(self, market):
+        info = self.tickers.get(market)
+        return info.get('trade_price') if info else None
+
+    def _account(self, market):
+        # market: 'KRW-BTC' -> 통화 'BTC', 'KRW' -> 'KRW'
+        currency = market.split('-')[1] if '-' in market else market
+        return self.accounts.get(currency)
+
+    def balance(self, market):
+        """주문 가능 수량 (pyupbit get_balance와 같이 locked 제외)."""
+        account = self._account(market)
+        return float(account['balance']) if account else 0.0
+
+    def avg_buy_price(self, market):
+        account = self._account(market)
+        return float(account.get('avg_buy_price', 0)) if account else 0.0
@@ -0,0 +1,179 @@
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+from email.utils import parsedate_to_datetime
+from statistics import median
+
+import upbit_http
+from candle_store import candle_open_time, next_candle_open_time, now_kst
+
+# -----------------------------------------------------------------------------
+# 캔들 마감 시각에 맞춘 전략 실행 스케줄러
+# -----------------------------------------------------------------------------
+# 고정 간격(60초 등)으로 쉬면 평가 시점이 캔들 마감과 어긋나 새 봉 신호를 최대 한 주기 늦게 보거나
+# 바뀌지 않은 데이터를 다시 평가하게 됩니다. 여기서는 업비트 서버 시각 기준으로 각 주기(minute1, minute5 ...)
+# 캔들이 마감된 직후(settle초 뒤)에 깨어나고, 그 사이에는 체결 틱 조건(PriceMoveTrigger 등)이 trigger()를
+# 호출했을 때만 깨어납니다.
+#
+# 서버 시각: REST 응답의 Date 헤더(초 단위)와 WebSocket 메시지의 timestamp(ms)로 로컬 시계와의 차이를 추정합니다.
+TICK = 'tick'   # 체결 틱 트리거 키
+
+
+class ServerClock:
+    """업비트 서버 시각 추정 (로컬 시계 + 추정 오프셋)."""
+    def __init__(self, max_samples=64):
+        self.offset = 0.0                             # 서버 시각 - 로컬 시각 (초)
+        self._ms_samples = deque(maxlen=max_samples)  # WebSocket timestamp 기반 (지연만큼 작게 나옴)
+        self._date_samples = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+        self._attached = False
+
+    def observe_ms(self, server_ms, received=None):
+        """WebSocket 메시지의 timestamp(ms). 전송 지연이 가장 작은(=값이 가장 큰) 표본을 사용합니다."""
+        if not server_ms:
+            return
+        received = time.time() if received is None else received
+        with self._lock:
+            self._ms_samples.append(server_ms / 1000 - received)
+            self.offset = max(self._ms_samples)
+
+    def observe_http_date(self, value, received=None):
+        """REST 응답 Date 헤더 (초 단위로 잘린 값이므로 0.5초를 더해 중앙값 사용). ms 표본이 있으면 그쪽을 우선."""
+        if not value:
+            return
+        received = time.time() if received is None else received
+        try:
+            server_time = parsedate_to_datetime(value).timestamp()
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self._date_samples.append(server_time + 0.5 - received)
+            if not self._ms_samples:
+                self.offset = median(self._date_samples)
+
+    def attach(self):
+        """전역 요청 스케줄러의 모든 응답에서 Date 헤더를 읽도록 등록."""
+        if self._attached:
+            return self
+        self._attached = True
+        upbit_http.add_response_listener(lambda method, url, response: self.observe_http_date(response.headers.get('Date')))
+        return self
+
+    def now(self):
+        """서버 기준 현재 시각 (KST naive datetime)."""
+        return now_kst() + timedelta(seconds=self.offset)
+
+
+server_clock = ServerClock()
+
+
+def closed_bars(df, interval, now):
+    """
+    now(서버 시각) 기준 진행 중인 봉을 뺀 마감된 봉만. 캔들 마감 직후(settle초 뒤)에는 마지막 행이
+    막 열린 새 봉(체결 1~2초 분량)이므로 거래량/캔들 모양을 보는 규칙은 마감된 봉으로 평가해야 합니다.
+    """
+    if df is None or df.empty:
+        return df
+    start = candle_open_time(now, interval)
+    return df if start is None else df[df.index < start]
+
+
+class PriceMoveTrigger:
+    """종목별 기준가 대비 threshold(%) 이상 움직인 체결이 오면 True (캔들 마감 전 손절/익절 재평가용)."""
+    def __init__(self, threshold_pct=1.0):
+        self.threshold = threshold_pct / 100
+        self._reference = {}   # code -> 마지막 평가 시 가격
+        self._lock = threading.Lock()
+
+    def reset(self, code, price):
+        """평가할 때의 가격을 기준가로 둠."""
+        if price:
+            with self._lock:
+                self._reference[code] = price
+
+    def check(self, code, price):
+        with self._lock:
+            reference = self._reference.get(code)
+            if not reference or not price or abs(price / reference - 1) < self.threshold:
+                return False
+            self._reference[code] = price
+            return True
+
+
+class CandleScheduler:
+    """
+    wait_next()는 다음 캔들 마감(+settle초) 또는 trigger() 호출까지 기다렸다가 이번에 실행할 키 집합을 돌려줍니다.
+    키는 마감된 주기 이름('minute1', 'minute5' ...)과 trigger()로 넘긴 키입니다.
+    같은 키의 trigger는 min_trigger_gap초 안에 한 번만 받아 틱이 몰려도 평가가 반복되지 않습니다.
+    """
+    def __init__(self, intervals, clock=None, settle=1.5, min_trigger_gap=5.0):
+        self.clock = clock or server_clock
+        self.settle = timedelta(seconds=settle)
+        self.min_trigger_gap = min_trigger_gap
+        self._next = {}        # interval -> 다음 실행 시각 (서버 시각)
+        self._pending = set()
+        self._last_trigger = {}
+        self._stopped = False
+        self._cond = threading.Condition()
+        self.set_intervals(intervals)
+
+    def set_intervals(self, intervals):
+        with self._cond:
+            now = self.clock.now()
+            self._next = {interval: self._next.get(interval) or self._due_after(now, interval)
+                          for interval in dict.fromkeys(intervals)}
+            self._cond.notify_all()
+
+    def _due_after(self, now, interval):
+        # now 이후 처음 마감되는 캔들의 실행 시각 (월봉 등 고정 길이가 아닌 주기는 1분 뒤)
+        boundary = next_candle_open_time(now - self.settle, interval)
+        return boundary + self.settle if boundary is not None else now + timedelta(minutes=1)
+
+    def trigger(self, key=TICK):
+        """다른 스레드(WebSocket 콜백 등)에서 즉시 실행을 요청."""
+        now = time.monotonic()
+        with self._cond:
+            if now - self._last_trigger.get(key, float('-inf')) < self.min_trigger_gap:
+                return False
+            self._last_trigger[key] = now
+            self._pending.add(key)
+            self._cond.notify_all()
+        return True
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    @property
+    def stopped(self):
+        return self._stopped
+
+    def seconds_until_next(self):
+        with self._cond:
+            if not self._next:
+                return None
+            return max(0.0, (min(self._next.values()) - self.clock.now()).total_seconds())
+
+    def wait_next(self, timeout=None):
+        """실행할 키 집합. timeout초 안에 아무것도 없거나 stop()되면 빈 집합 (둘은 stopped로 구분)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._stopped:
+                now = self.clock.now()
+                due = {interval for interval, at in self._next.items() if now >= at}
+                if due or self._pending:
+                    for interval in due:
+                        self._next[interval] = self._due_after(now, interval)
+                    due |= self._pending
+                    self._pending = set()
+                    return due
+                wait = min((at - now).total_seconds() for at in self._next.values()) if self._next else None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return set()
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._cond.wait(wait)
+            return set()
@@ -0,0 +1,284 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+import strategy_rules
+from candle_builder import trade_time_kst
+from candle_store import candle_open_time, interval_to_timedelta
+from indicator_columns import ensure_columns
+from signal_fusion import SignalFusion
+
+# -----------------------------------------------------------------------------
+# KRW 마켓 전체 지표 매트릭스 (종목 x 시간) 스크리너
+# -----------------------------------------------------------------------------
+# 모든 종목의 최근 window개 봉을 (종목 수, window) 배열로 들고 있다가 RSI, MA 교차, 거래량 급증,
+# 볼린저 밴드 위치를 행렬 연산 한 번으로 계산해 점수순 표로 돌려줍니다.
+# 처음에는 종목별 캔들(REST)로 채우고(seed), 이후에는 _fetch_market_data_worker가 이미 받아오는
+# 전체 종목 현재가(ticker) 스냅샷으로 진행 중인 봉을 갱신하고 주기 경계에서 새 봉을 엽니다.
+RSI_PERIOD = 14
+MA_FAST, MA_SLOW = 5, 20
+BB_PERIOD, BB_K = 20, 2
+VOLUME_PERIOD = 20
+MIN_BARS = MA_SLOW + 1
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+SCREEN_COLUMNS = ['market', 'close', 'change_rate', 'rsi', 'ma_fast', 'ma_slow', 'ma_cross',
+                  'volume_ratio', 'bb_position', 'score']
+
+
+class MarketMatrix:
+    """
+    (종목, 시간) 2차원 OHLCV 배열. 열은 interval 캔들 시작 시각이고 마지막 열이 진행 중인 봉입니다.
+    체결이 없던 봉은 직전 종가로 채우고 거래량 0으로 둡니다.
+    """
+    def __init__(self, interval='minute5', window=120):
+        self.interval = interval
+        self.window = window
+        self.markets = []
+        self._rows = {}                  # market -> 행 번호
+        self.times = pd.DatetimeIndex([])
+        self.data = {field: np.full((0, window), np.nan) for field in FIELDS}
+        self._acc_volume = {}            # market -> 마지막으로 본 누적 거래량 (스냅샷 간 차이로 봉 거래량 계산)
+        self._lock = threading.Lock()
+
+    # --- 채우기 ---------------------------------------------------------------
+    def missing(self, markets):
+        """아직 캔들로 채우지 않은 종목."""
+        return [m for m in markets if m not in self._rows]
+
+    def _grid(self, end):
+        step = interval_to_timedelta(self.interval)
+        return pd.date_range(end=end, periods=self.window, freq=step)
+
+    def _add_rows(self, markets):
+        new = [m for m in markets if m not in self._rows]
+        for market in new:
+            self._rows[market] = len(self.markets)
+            self.markets.append(market)
+        if new:
+            for field in FIELDS:
+                self.data[field] = np.vstack([self.data[field], np.full((len(new), self.window), np.nan)])
+
+    def seed(self, frames):
+        """{market: OHLCV DataFrame}로 해당 종목 행을 채움 (시간축은 가장 최근 봉 기준으로 맞춤)."""
+        frames = {m: df for m, df in frames.items() if df is not None and not df.empty}
+        if not frames:
+            return
+        with self._lock:
+            latest = max(df.index[-1] for df in frames.values())
+            if len(self.times) == 0 or latest > self.times[-1]:
+                self._roll_to(latest)
+            self._add_rows(frames)
+            for market, df in frames.items():
+                aligned = df.reindex(self.times)
+                close = aligned['close'].ffill()
+                row = self._rows[market]
+                self.data['close'][row] = close.to_numpy(dtype=np.float64)
+                for field in ('open', 'high', 'low'):
+                    self.data[field][row] = aligned[field].fillna(close).to_numpy(dtype=np.float64)
+                self.data['volume'][row] = aligned['volume'].fillna(0.0).to_numpy(dtype=np.float64)
+
+    def _roll_to(self, end):
+        """
+        마지막 열이 end 봉이 되도록 시간축을 밀고, 새로 생긴 열은 종가=직전 종가, 거래량 0으로 채움.
+        새 열의 시가/고가/저가는 첫 체결에서 정하고, 체결 없이 지나간 봉은 종가로 채웁니다.
+        """
+        grid = self._grid(end)
+        if len(self.times) == 0:
+            self.times = grid
+            return
+        shift = int(np.searchsorted(grid, self.times[-1], side='right'))
+        shift = self.window - shift if shift else self.window
+        if shift <= 0:
+            return
+        self.times = grid
+        last_close = self.data['close'][:, -1:].copy()
+        fill = {'open': np.nan, 'high': np.nan, 'low': np.nan, 'close': last_close, 'volume': 0.0}
+        for field in FIELDS:
+            values = self.data[field]
+            if field in ('open', 'high', 'low'):
+                values[:, -1] = np.where(np.isnan(values[:, -1]), last_close[:, 0], values[:, -1])
+            if shift < self.window:
+                values[:, :-shift] = values[:, shift:]
+            values[:, -shift:] = fill[field]
+            if field in ('open', 'high', 'low') and shift > 1:
+                values[:, -shift:-1] = last_close
+
+    # --- 현재가 스냅샷으로 갱신 ----------------------------------------------------
+    def update_tickers(self, tickers):
+        """REST/웹소켓 ticker 응답 목록으로 각 종목의 진행 중인 봉을 갱신합니다 (채우지 않은 종목은 건너뜀)."""
+        with self._lock:
+            if len(self.times) == 0:
+                return
+            for item in tickers:
+                row = self._rows.get(item.get('market'))
+                price = item.get('trade_price')
+                if row is None or price is None:
+                    continue
+                if item.get('trade_timestamp') or item.get('timestamp'):
+                    open_time = candle_open_time(trade_time_kst(item), self.interval)
+                    if open_time > self.times[-1]:
+                        self._roll_to(open_time)
+                    elif open_time < self.times[-1]:
+                        continue   # 마지막 체결이 이전 봉이면 새 정보 없음
+                acc = item.get('acc_trade_volume')
+                prev_acc = self._acc_volume.get(item['market'])
+                if acc is not None:
+                    self._acc_volume[item['market']] = acc
+                    if prev_acc is not None:
+                        # 누적 거래량은 매일 UTC 0시에 초기화되므로 줄어들었으면 새 누적값 전체가 이번 봉 몫
+                        self.data['volume'][row, -1] += acc - prev_acc if acc >= prev_acc else acc
+                if np.isnan(self.data['open'][row, -1]):
+                    self.data['open'][row, -1] = price
+                self.data['close'][row, -1] = price
+                self.data['high'][row, -1] = np.fmax(self.data['high'][row, -1], price)
+                self.data['low'][row, -1] = np.fmin(self.data['low'][row, -1], price)
+
+    # --- 행렬 지표 ---------------------------------------------------------------
+    def snapshot(self):
+        with self._lock:
+            return list(self.markets), {field: values.copy() for field, values in self.data.items()}
+
+    def screen(self, top=None):
+        """종목별 지표와 점수 표 (점수 내림차순)."""
+        markets, data = self.snapshot()
+        table = screen_matrix(markets, data)
+        return table.head(top) if top else table
+
+
+def screen_matrix(markets, data):
+    """
+    {필드: (종목 수, 시간) 배열}에서 종목별 마지막 봉 기준 지표를 한 번에 계산.
+    score: 과매도(RSI 낮음, BB 하단 근처), 골든크로스, 거래량 급증일수록 높은 단순 가중합.
+    """
+    close, volume = data['close'], data['volume']
+    if close.size == 0:
+        return pd.DataFrame(columns=SCREEN_COLUMNS)
+    valid = np.isfinite(close[:, -MIN_BARS:]).all(axis=1)
+    close = np.where(np.isfinite(close), close, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta = np.diff(close[:, -(RSI_PERIOD + 1):], axis=1)
+        gain = np.where(delta > 0, delta, 0.0).mean(axis=1)
+        loss = np.where(delta < 0, -delta, 0.0).mean(axis=1)
+        rsi = np.where(loss > 0, 100 - 100 / (1 + gain / loss), np.where(gain > 0, 100.0, 50.0))
+
+        ma_fast = close[:, -MA_FAST:].mean(axis=1)
+        ma_slow = close[:, -MA_SLOW:].mean(axis=1)
+        prev_fast = close[:, -MA_FAST - 1:-1].mean(axis=1)
+        prev_slow = close[:, -MA_SLOW - 1:-1].mean(axis=1)
+        ma_cross = np.where((prev_fast <= prev_slow) & (ma_fast > ma_slow), 1,
+                            np.where((prev_fast >= prev_slow) & (ma_fast < ma_slow), -1, 0))
+
+        avg_volume = volume[:, -VOLUME_PERIOD - 1:-1].mean(axis=1)
+        volume_ratio = np.where(avg_volume > 0, volume[:, -1] / avg_volume, 0.0)
+
+        bb_window = close[:, -BB_PERIOD:]
+        bb_mid, bb_std = bb_window.mean(axis=1), bb_window.std(axis=1, ddof=1)
+        bb_width = 2 * BB_K * bb_std
+        bb_position = np.where(bb_width > 0, (close[:, -1] - (bb_mid - BB_K * bb_std)) / bb_width, 0.5)
+
+        change_rate = np.where(close[:, -2] > 0, (close[:, -1] / close[:, -2] - 1) * 100, 0.0)
+
+    score = ((50 - rsi) / 10 + (0.5 - bb_position) * 2 + np.clip(volume_ratio, 0, 5) + ma_cross * 2)
+    table = pd.DataFrame({
+        'market': markets, 'close': close[:, -1], 'change_rate': change_rate, 'rsi': rsi,
+        'ma_fast': ma_fast, 'ma_slow': ma_slow, 'ma_cross': ma_cross, 'volume_ratio': volume_ratio,
+        'bb_position': bb_position, 'score': score,
+    }, columns=SCREEN_COLUMNS)
+    return table[valid].sort_values('score', ascending=False).reset_index(drop=True)
+
+
+# -----------------------------------------------------------------------------
+# 전략 신호 스크리너 (프로세스 풀)
+# -----------------------------------------------------------------------------
+# MarketMatrix 스냅샷(종목 x 시간 OHLCV)을 공유 메모리 한 블록에 올리고, 종목 묶음(행 범위)마다 프로세스 풀에서
+# 전략 규칙(strategy_rules + signal_fusion)을 평가합니다. 워커에는 공유 메모리 이름/모양과 행 범위, 결합 설정만
+# 넘기므로 DataFrame을 피클링하지 않고, 지표 계산(CPU)은 다른 프로세스에서 돌아 Tk/시세 스레드가 GIL을 기다리지 않습니다.
+# 워커는 spawn으로 시작하므로 앱 파일을 '__mp_main__'으로 다시 불러옵니다 (로그인 등은 __main__에서만 실행).
+SIGNAL_COLUMNS = ['market', 'side', 'strategies', 'reason']
+
+
+def _scan_rows(shm_name, shape, start, stop, fusion_config):
+    """워커 프로세스: 공유 메모리의 [start, stop) 행을 평가해 [(행, side, reason)] 반환."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    block = None
+    try:
+        block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        fusion = SignalFusion(**fusion_config)
+        columns = list(dict.fromkeys(c for name in fusion.strategies for c in strategy_rules.rule_columns(name)))
+        out = []
+        for row in range(start, stop):
+            valid = np.isfinite(block[FIELDS.index('close'), row])
+            if valid.sum() < MIN_BARS:
+                continue
+            # 불리언 인덱싱으로 복사되므로 DataFrame은 공유 메모리를 참조하지 않음
+            df = pd.DataFrame(block[:, row, valid].T, columns=FIELDS)
+            ensure_columns(df, columns)
+            decision = fusion.decide({name: df for name in fusion.strategies})
+            if decision is not None:
+                out.append((row,) + decision)
+        return out
+    finally:
+        # shm.buf를 참조하는 배열이 남아 있으면 close()가 BufferError를 내고 원래 예외를 가리므로 먼저 해제
+        del block
+        shm.close()
+
+
+class StrategyScreener:
+    """
+    scan(markets, data, fusion): MarketMatrix.snapshot() 결과에서 지금 신호가 난 종목 표 (SIGNAL_COLUMNS).
+    프로세스 풀은 처음 scan할 때 만들고 shutdown()으로 정리합니다 (이후 scan은 RuntimeError). scan은 결과를 기다리는 동안 블록되므로
+    Tk 스레드가 아닌 백그라운드 스레드에서 호출해야 합니다.
+    """
+    def __init__(self, max_workers=None, chunks_per_worker=2):
+        self.max_workers = max_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.chunks_per_worker = chunks_per_worker
+        self._pool = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def _executor(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("전략 스크리너가 이미 종료되었습니다.")
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+            return self._pool
+
+    def scan(self, markets, data, fusion):
+        n = len(markets)
+        if n == 0 or not fusion.strategies:
+            return pd.DataFrame(columns=SIGNAL_COLUMNS)
+        shape = (len(FIELDS), n, data['close'].shape[1])
+        shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+        try:
+            block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+            try:
+                for i, field in enumerate(FIELDS):
+                    block[i] = data[field]
+            finally:
+                del block
+            pool = self._executor()
+            step = max(1, -(-n // (self.max_workers * self.chunks_per_worker)))
+            futures = [pool.submit(_scan_rows, shm.name, shape, start, min(start + step, n), fusion.config())
+                       for start in range(0, n, step)]
+            rows = [row for future in futures for row in future.result()]
+        finally:
+            shm.close()
+            shm.unlink()
+        table = pd.DataFrame([(markets[row], side, reason.split(':')[0], reason) for row, side, reason in rows],
+                             columns=SIGNAL_COLUMNS)
+        return table.sort_values('market').reset_index(drop=True)
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
@@ -0,0 +1,128 @@
+import math
+
+import strategy_rules
+
+# -----------------------------------------------------------------------------
+# 전략 신호 결합 (종목별로 한 번에 평가해 주문 하나만 결정)
+# -----------------------------------------------------------------------------
+# 켜진 전략들의 매수/매도 규칙(strategy_rules)을 같은 프레임에서 한 번에 평가하고, 아래 방식으로 합쳐
+# 종목마다 매수/매도/없음 중 하나만 정합니다. 전략마다 따로 시장가 주문을 내던 중복 주문이 없어집니다.
+#  - any: 하나라도 신호가 나면 (기존 개별 실행과 같은 진입 조건)
+#  - n_of_m: min_signals개 이상 겹칠 때
+#  - vote: 켜진 전략의 과반수가 같은 방향일 때
+#  - weighted: 신호가 난 전략의 가중치 합이 threshold 이상일 때
+# window: 최근 몇 봉 안의 신호까지 겹친 것으로 볼지 (전략마다 교차 시점이 한두 봉씩 어긋나므로 결합 방식에서 사용)
+FUSION_MODES = ('any', 'n_of_m', 'vote', 'weighted')
+
+# Doc/전략선택.txt 추천 조합
+FUSION_PRESETS = {
+    "개별 실행": {'strategies': None, 'mode': 'any'},
+    "안정형 (1+3+5+6)": {   # 신호가 겹칠 때만 진입
+        'strategies': ["전략1", "전략3", "전략5", "전략6"], 'mode': 'n_of_m', 'min_signals': 2, 'window': 3,
+    },
+    "공격형 (2+4+7+8)": {   # 단타: 하나라도 신호가 나면 바로 진입/청산
+        'strategies': ["전략2", "전략4", "전략7", "전략8"], 'mode': 'any',
+    },
+    "균형형 (1+2+3+5+6)": {
+        'strategies': ["전략1", "전략2", "전략3", "전략5", "전략6"], 'mode': 'n_of_m', 'min_signals': 2, 'window': 3,
+    },
+    "추세+반전 (1+3+5+7)": {   # 추세 신호 2개 이상 또는 StochRSI 반전 단독
+        'strategies': ["전략1", "전략3", "전략5", "전략7"], 'mode': 'weighted',
+        'weights': {"전략1": 1.0, "전략3": 1.0, "전략5": 1.0, "전략7": 2.0}, 'threshold': 2.0, 'window': 3,
+    },
+}
+DEFAULT_PRESET = "개별 실행"
+
+
+class SignalFusion:
+    """
+    strategies: 결합할 전략 이름 목록, mode/min_signals/weights/threshold/window: 매수 결합 방식.
+    매도는 sell_mode(기본 any, 한 전략이라도 청산 신호면 매도)로 따로 합칩니다.
+    """
+    def __init__(self, strategies, mode='any', min_signals=1, weights=None, threshold=None, window=1,
+                 sell_mode='any'):
+        if mode not in FUSION_MODES or sell_mode not in FUSION_MODES:
+            raise ValueError(f"알 수 없는 신호 결합 방식: {mode}/{sell_mode}")
+        self.strategies = [name for name in strategies if name in strategy_rules.STRATEGY_RULES]
+        self.mode = mode
+        self.sell_mode = sell_mode
+        self.min_signals = min_signals
+        self.weights = weights or {}
+        self.threshold = threshold if threshold is not None else min_signals
+        self.window = window
+
+    @classmethod
+    def from_settings(cls, settings):
+        """자동매매 설정의 'fusion'(프리셋 이름 또는 설정 dict)과 켜진 전략(strategy1~8)으로 생성."""
+        enabled = [f"전략{k}" for k in range(1, 9) if settings.get(f'strategy{k}')]
+        config = settings.get('fusion') or DEFAULT_PRESET
+        if not isinstance(config, dict):
+            config = FUSION_PRESETS.get(config, FUSION_PRESETS[DEFAULT_PRESET])
+        config = {key: value for key, value in config.items() if key != 'strategies'}
+        return cls(enabled, **config)
+
+    def config(self):
+        """생성 인자 dict (프로세스 풀 워커에 넘길 때 사용)."""
+        return {'strategies': list(self.strategies), 'mode': self.mode, 'min_signals': self.min_signals,
+                'weights': dict(self.weights), 'threshold': self.threshold, 'window': self.window,
+                'sell_mode': self.sell_mode}
+
+    @property
+    def buy_window(self):
+        """매수 신호를 겹쳐 보는 봉 수 (any는 마지막 봉만)."""
+        return 1 if self.mode == 'any' else self.window
+
+    def signals(self, frames, side, window=1):
+        """{전략: 사유} - frames[전략]에서 최근 window개 봉 안에 side 신호가 난 전략."""
+        fired = {}
+        for name in self.strategies:
+            reason = strategy_rules.match(name, side, frames.get(name), window=window)
+            if reason:
+                fired[name] = reason
+        return fired
+
+    def _accepts(self, fired, mode):
+        if not fired:
+            return False
+        if mode == 'any':
+            return True
+        if mode == 'n_of_m':
+            return len(fired) >= self.min_signals
+        if mode == 'vote':
+            return len(fired) > len(self.strategies) / 2
+        return sum(self.weights.get(name, 1.0) for name in fired) >= self.threshold
+
+    def decide(self, frames, holding=False):
+        """
+        (side, reason) 또는 None. 보유 중이면 매도 신호를 먼저 보고, 매도 신호가 나는 중에는 추가 매수하지 않습니다.
+        매도 규칙에는 추적 손절(고점 대비 하락) 같은 포지션 관리 조건이 섞여 있어 눌림목 매수 시점과 자주 겹치므로,
+        보유하지 않은 종목의 매수는 막지 않습니다.
+        reason은 '전략1+전략3: 사유 / 사유' 형식 (앞부분이 매수 전략으로 기록됨).
+        """
+        if holding:
+            sell = self.signals(frames, 'sell')
+            if self._accepts(sell, self.sell_mode):
+                return 'sell', _describe(sell)
+            if sell:
+                return None
+        buy = self.signals(frames, 'buy', window=self.buy_window)
+        if self._accepts(buy, self.mode):
+            return 'buy', _describe(buy)
+        return None
+
+    def describe(self):
+        names = '+'.join(name[2:] for name in self.strategies) or '없음'
+        if self.mode == 'n_of_m':
+            rule = f"{self.min_signals}개 이상 일치"
+        elif self.mode == 'vote':
+            rule = f"과반수({math.floor(len(self.strategies) / 2) + 1}개) 일치"
+        elif self.mode == 'weighted':
+            rule = f"가중치 합 {self.threshold:g} 이상"
+        else:
+            rule = "하나라도"
+        window = f", 최근 {self.window}봉" if self.mode != 'any' and self.window > 1 else ""
+        return f"전략 {names} ({rule}{window})"
+
+
+def _describe(fired):
+    return '+'.join(fired) + ': ' + ' / '.join(fired.values())
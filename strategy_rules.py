@@ -0,0 +1,349 @@
+import re
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+import indicators
+
+# -----------------------------------------------------------------------------
+# 선언형 전략 규칙 (문자열 조건식 -> 벡터 연산 함수)
+# -----------------------------------------------------------------------------
+# 조건식 예: "rsi < 30 & ma5 > ma20 & volume > 2 * sma(volume, 10)"
+#  - 이름은 지표 컬럼(indicator_columns 레지스트리) 또는 open/high/low/close/volume
+#  - 연산자 우선순위: | < & < ~ < 비교(<, <=, >, >=, ==, !=) < +, - < *, /  (and/or/not도 사용 가능)
+#    파이썬과 달리 &, |가 비교보다 나중에 묶이므로 괄호 없이 조건을 이어 쓸 수 있습니다.
+#  - 함수: sma(x, n), highest(x, n), lowest(x, n), quantile(x, q, n), prev(x, k=1), abs(x),
+#          cross_up(a, b), cross_down(a, b)   (n, q, k는 숫자)
+# compile_rule은 조건식을 한 번만 파싱해 배열 연산 함수로 만들고, 같은 함수로
+#  - evaluate(df): 전체 봉에 대한 bool 배열 (백테스트)
+#  - last(df): 마지막 봉만 (실시간 자동매매, 필요한 뒤쪽 lookback+1개 봉만 잘라서 계산)
+# 을 계산합니다. 값이 NaN인 비교는 거짓입니다.
+
+# 전략별 매수/매도 규칙: (조건식, 로그용 사유) 목록 - 앞의 규칙부터 확인해 처음 맞는 것을 사용
+STRATEGY_RULES = {
+    "전략1": {   # 5분봉, RSI+이동평균+거래량 (저위험)
+        'buy': [("rsi < 30 & ma5 > ma20 & volume > 2 * sma(volume, 10)", "RSI<30 & 5MA>20MA & 거래량급증")],
+        'sell': [("rsi > 70 & ma5 < ma20", "RSI>70 & 5MA<20MA")],
+        'min_bars': 30,
+    },
+    "전략2": {   # 1분봉, 볼린저밴드+캔들패턴 (고수익)
+        'buy': [("close < bb_lower & pattern == 'hammer'", "BB하단돌파+해머형")],
+        'sell': [("close > bb_upper & pattern == 'shooting_star'", "BB상단돌파+슈팅스타")],
+        'min_bars': 30,
+    },
+    "전략3": {   # 5분봉, MACD+트레일링스탑 (추세추종) - 매도 규칙은 보유 중일 때만 확인
+        'buy': [("cross_up(macd, signal)", "MACD상향돌파")],
+        'sell': [("cross_down(macd, signal)", "MACD하향돌파"),
+                 ("close < 0.97 * highest(high, 20)", "트레일링스탑 -3%")],
+        'min_bars': 30,
+    },
+    "전략4": {   # 1분봉, 강한캔들+볼륨펌핑 (초단타)
+        # 몸통 기준은 예전 코드의 '받아 온 프레임 전체' 상위 20%(df['body'].quantile(0.8))에서 최근 30봉 상위 20%로 바뀜
+        # (프레임 길이와 무관하게 같은 신호, 백테스트와 실시간이 일치). 30봉 미만이면 min_bars에서 평가하지 않음
+        'buy': [("is_green & volume > 3 * prev(volume) & body > quantile(body, 0.8, 30)", "강한양봉+볼륨펌핑")],
+        'sell': [("~is_green & volume > 2 * prev(volume)", "강한음봉+볼륨급증")],
+        'min_bars': 30,   # quantile(body, 0.8, 30)의 lookback + 1
+    },
+    "전략5": {   # MA 골든/데드크로스 (5/20MA)
+        'buy': [("cross_up(ma5, ma20)", "MA 골든크로스")],
+        'sell': [("cross_down(ma5, ma20)", "MA 데드크로스")],
+        'min_bars': 30,
+    },
+    "전략6": {   # OBV 추세전환
+        'buy': [("prev(obv) < prev(obv, 2) & obv > prev(obv)", "OBV 상승전환")],
+        'sell': [("prev(obv) > prev(obv, 2) & obv < prev(obv)", "OBV 하락전환")],
+        'min_bars': 30,
+    },
+    "전략7": {   # StochRSI 돌파
+        'buy': [("prev(stochrsi) < 0.2 & stochrsi >= 0.2", "StochRSI 상향돌파")],
+        'sell': [("prev(stochrsi) > 0.8 & stochrsi <= 0.8", "StochRSI 하향돌파")],
+        'min_bars': 30,
+    },
+    "전략8": {   # CCI 돌파
+        'buy': [("prev(cci) < 100 & cci >= 100", "CCI 100 상향돌파")],
+        'sell': [("prev(cci) > -100 & cci <= -100", "CCI -100 하향돌파")],
+        'min_bars': 30,
+    },
+}
+
+_TOKEN = re.compile(r"\s*(?:(\d+\.\d*|\.\d+|\d+)|('[^']*'|\"[^\"]*\")|([A-Za-z_]\w*)|(<=|>=|==|!=|[<>&|~+\-*/(),]))")
+_KEYWORDS = {'and': '&', 'or': '|', 'not': '~'}
+_COMPARE = {
+    '<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal,
+    '==': np.equal, '!=': np.not_equal,
+}
+_ARITH = {'+': np.add, '-': np.subtract, '*': np.multiply, '/': np.divide}
+
+
+def _tokenize(source):
+    tokens, pos = [], 0
+    source = source.rstrip()
+    while pos < len(source):
+        match = _TOKEN.match(source, pos)
+        if match is None:
+            raise ValueError(f"전략 규칙 구문 오류: '{source[pos:]}' ({source})")
+        number, string, name, op = match.groups()
+        if number is not None:
+            tokens.append(('num', float(number)))
+        elif string is not None:
+            tokens.append(('str', string[1:-1]))
+        elif name is not None and name in _KEYWORDS:
+            tokens.append(('op', _KEYWORDS[name]))
+        elif name is not None:
+            tokens.append(('name', name))
+        else:
+            tokens.append(('op', op))
+        pos = match.end()
+    return tokens
+
+
+def _truth(values):
+    """조건 값 -> bool 배열 (NaN/None은 거짓)."""
+    values = np.asarray(values)
+    if values.dtype == bool:
+        return values
+    if values.dtype.kind in 'fiu':
+        return np.nan_to_num(values.astype(np.float64), nan=0.0) != 0
+    return np.fromiter((v is not None and v == v and bool(v) for v in values.ravel()), bool, values.size)
+
+
+def _shift(values, periods):
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if periods < len(values):
+        out[periods:] = values[:len(values) - periods]
+    return out
+
+
+def _rolling_quantile(values, q, window):
+    """rolling(window).quantile(q)와 같은 결과 (선형 보간, 창이 다 차지 않았거나 NaN이 있으면 NaN)."""
+    values = indicators.as_array(values)
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = np.quantile(sliding_window_view(values, window), q, axis=1)
+    return out
+
+
+def _cross(a, b, up):
+    prev_a, prev_b = _shift(a, 1), _shift(b, 1)
+    if up:
+        return (prev_a < prev_b) & (np.asarray(a) > np.asarray(b))
+    return (prev_a > prev_b) & (np.asarray(a) < np.asarray(b))
+
+
+# 함수 이름 -> (인자 중 배열 개수, 숫자 인자 기본값, 계산 함수, 추가로 필요한 과거 봉 수)
+_FUNCTIONS = {
+    'sma': (1, (None,), lambda x, n: indicators.sma(x, int(n)), lambda n: int(n) - 1),
+    'highest': (1, (None,), lambda x, n: indicators.rolling_max(x, int(n)), lambda n: int(n) - 1),
+    'lowest': (1, (None,), lambda x, n: indicators.rolling_min(x, int(n)), lambda n: int(n) - 1),
+    'quantile': (1, (None, None), lambda x, q, n: _rolling_quantile(x, q, int(n)), lambda q, n: int(n) - 1),
+    'prev': (1, (1,), lambda x, k: _shift(x, int(k)), lambda k: int(k)),
+    'abs': (1, (), lambda x: np.abs(np.asarray(x, dtype=np.float64)), lambda: 0),
+    'cross_up': (2, (), lambda a, b: _cross(a, b, True), lambda: 1),
+    'cross_down': (2, (), lambda a, b: _cross(a, b, False), lambda: 1),
+}
+
+
+class _Parser:
+    """재귀 하강 파서. 각 노드는 (func(env), lookback, columns)로 바로 컴파일합니다."""
+    def __init__(self, source):
+        self.source = source
+        self.tokens = _tokenize(source)
+        self.pos = 0
+
+    def error(self, message):
+        return ValueError(f"전략 규칙 구문 오류: {message} ({self.source})")
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, value=None):
+        token = self.peek()
+        if token[0] is None or (value is not None and token != ('op', value)):
+            raise self.error(f"'{value}'가 필요합니다" if value else "식이 끝났습니다")
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.logical('|', np.logical_or, self.conjunction)
+        if self.pos != len(self.tokens):
+            raise self.error(f"예상하지 못한 '{self.peek()[1]}'")
+        return node
+
+    def logical(self, op, ufunc, operand):
+        node = operand()
+        while self.peek() == ('op', op):
+            self.take()
+            node = _combine(ufunc, [node, operand()], truth=True)
+        return node
+
+    def conjunction(self):
+        return self.logical('&', np.logical_and, self.negation)
+
+    def negation(self):
+        if self.peek() == ('op', '~'):
+            self.take()
+            return _combine(np.logical_not, [self.negation()], truth=True)
+        return self.comparison()
+
+    def comparison(self):
+        node = self.binary(('+', '-'), self.term)
+        kind, op = self.peek()
+        if kind == 'op' and op in _COMPARE:
+            self.take()
+            node = _combine(_COMPARE[op], [node, self.binary(('+', '-'), self.term)])
+        return node
+
+    def binary(self, ops, operand):
+        node = operand()
+        while self.peek()[0] == 'op' and self.peek()[1] in ops:
+            op = self.take()[1]
+            node = _combine(_ARITH[op], [node, operand()])
+        return node
+
+    def term(self):
+        return self.binary(('*', '/'), self.unary)
+
+    def unary(self):
+        if self.peek() == ('op', '-'):
+            self.take()
+            return _combine(np.negative, [self.unary()])
+        return self.atom()
+
+    def atom(self):
+        kind, value = self.take()
+        if kind in ('num', 'str'):
+            return (lambda env: value), 0, frozenset()
+        if kind == 'name':
+            if self.peek() == ('op', '('):
+                return self.call(value)
+            return (lambda env: env(value)), 0, frozenset([value])
+        if value == '(':
+            node = self.logical('|', np.logical_or, self.conjunction)
+            self.take(')')
+            return node
+        raise self.error(f"예상하지 못한 '{value}'")
+
+    def call(self, name):
+        if name not in _FUNCTIONS:
+            raise self.error(f"알 수 없는 함수 {name}")
+        n_series, defaults, func, lookback = _FUNCTIONS[name]
+        self.take('(')
+        args = []
+        while self.peek() != ('op', ')'):
+            if args:
+                self.take(',')
+            args.append(self.logical('|', np.logical_or, self.conjunction) if len(args) < n_series
+                        else self.number())
+        self.take(')')
+        params = args[n_series:] + list(defaults[len(args) - n_series:])
+        if len(args) < n_series or len(params) != len(defaults) or None in params:
+            raise self.error(f"{name} 인자 개수가 맞지 않습니다")
+        series = args[:n_series]
+        funcs = [node[0] for node in series]
+        return ((lambda env: func(*[f(env) for f in funcs], *params)),
+                max(node[1] for node in series) + lookback(*params),
+                frozenset().union(*[node[2] for node in series]))
+
+    def number(self):
+        sign = -1 if self.peek() == ('op', '-') else 1
+        if sign < 0:
+            self.take()
+        kind, value = self.take()
+        if kind != 'num':
+            raise self.error("함수의 기간/분위 인자는 숫자여야 합니다")
+        return sign * value
+
+
+def _combine(ufunc, nodes, truth=False):
+    funcs = [node[0] for node in nodes]
+    if truth:
+        func = lambda env: ufunc(*[_truth(f(env)) for f in funcs])
+    else:
+        func = lambda env: ufunc(*[f(env) for f in funcs])
+    return func, max(node[1] for node in nodes), frozenset().union(*[node[2] for node in nodes])
+
+
+class StrategyRule:
+    """컴파일된 조건식. columns: 필요한 컬럼, lookback: 마지막 봉 판정에 필요한 과거 봉 수."""
+    def __init__(self, source):
+        self.source = source
+        self._func, self.lookback, columns = _Parser(source).parse()
+        self.columns = tuple(sorted(columns))
+
+    def _run(self, df, size=None):
+        n = len(df) if size is None else min(size, len(df))
+        arrays = {column: df[column].to_numpy()[len(df) - n:] for column in self.columns}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = _truth(self._func(arrays.__getitem__))
+        return np.broadcast_to(result, (n,)) if result.ndim == 0 else result
+
+    def evaluate(self, df):
+        """모든 봉에 대한 bool 배열 (백테스트용)."""
+        return self._run(df)
+
+    def last(self, df):
+        """마지막 봉에서 조건이 맞는지 (실시간용)."""
+        return self.recent(df, 1)
+
+    def recent(self, df, window):
+        """최근 window개 봉 중 하나라도 조건이 맞았는지 (여러 전략 신호를 몇 봉 범위 안에서 겹쳐 볼 때)."""
+        if df is None or df.empty:
+            return False
+        return bool(self._run(df, self.lookback + window)[-window:].any())
+
+    def __repr__(self):
+        return f"StrategyRule({self.source!r})"
+
+
+_compiled = {}
+
+
+def compile_rule(source):
+    """조건식을 컴파일 (같은 식은 한 번만)."""
+    rule = _compiled.get(source)
+    if rule is None:
+        rule = _compiled[source] = StrategyRule(source)
+    return rule
+
+
+def strategy_rules(name, side):
+    """전략 name의 side('buy'/'sell') 규칙 [(StrategyRule, 사유)]."""
+    return [(compile_rule(source), reason) for source, reason in STRATEGY_RULES[name][side]]
+
+
+def rule_columns(name):
+    """전략 name의 매수/매도 규칙이 쓰는 컬럼 (지표 레지스트리에 넘길 목록)."""
+    columns = []
+    for side in ('buy', 'sell'):
+        for rule, _ in strategy_rules(name, side):
+            columns += [column for column in rule.columns if column not in columns]
+    return columns
+
+
+def min_bars(name):
+    """전략 name을 평가할 최소 봉 수. 선언한 min_bars와 규칙 lookback + 1 중 큰 값 (부족하면 규칙이 NaN으로 꺼지므로)."""
+    lookback = max(rule.lookback for side in ('buy', 'sell') for rule, _ in strategy_rules(name, side))
+    return max(STRATEGY_RULES[name].get('min_bars', 0), lookback + 1)
+
+
+def match(name, side, df, window=1):
+    """마지막 봉(window를 주면 최근 window개 봉)에서 처음 맞는 규칙의 사유 (없으면 None). 봉이 min_bars(name)보다 적으면 None."""
+    if df is None or len(df) < min_bars(name):
+        return None
+    for rule, reason in strategy_rules(name, side):
+        if rule.recent(df, window):
+            return reason
+    return None
+
+
+def signals(df, name):
+    """백테스트용 전체 봉 신호 DataFrame (buy, sell: bool). 지표 컬럼은 미리 계산되어 있어야 합니다."""
+    out = {}
+    for side in ('buy', 'sell'):
+        mask = np.zeros(len(df), dtype=bool)
+        for rule, _ in strategy_rules(name, side):
+            mask |= rule.evaluate(df)
+        out[side] = mask
+    return pd.DataFrame(out, index=df.index)
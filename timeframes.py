@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+
+from candle_store import INTERVAL_MINUTES, KST_OFFSET, KeyedLocks, OHLCV_COLUMNS
+
+# -----------------------------------------------------------------------------
+# 기본 주기 한 개로 상위 주기 캔들 만들기 (멀티 타임프레임)
+# -----------------------------------------------------------------------------
+# 종목마다 기본 주기(분봉은 minute1, 주봉은 day)만 받아 두고 minute5/15, week 등은 그 캔들을 묶어서 만듭니다.
+# 업비트 상위 주기 캔들도 같은 구간의 하위 캔들을 합친 값(시가=첫 봉, 고가=최고, 저가=최저, 종가=마지막 봉,
+# 거래량/거래대금=합)이고 구간 경계도 UTC 기준으로 같으므로 결과가 같습니다. 체결이 없던 구간은 봉이 없습니다.
+DERIVED_FROM = {
+    'minute3': 'minute1', 'minute5': 'minute1', 'minute10': 'minute1', 'minute15': 'minute1',
+    'minute30': 'minute1', 'minute60': 'minute1', 'minute240': 'minute1',
+    'week': 'day', 'weeks': 'day',
+}
+AGGREGATORS = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum', 'value': 'sum'}
+
+
+def base_interval(interval):
+    return DERIVED_FROM.get(interval)
+
+
+def bar_factor(interval, base):
+    """상위 주기 한 봉에 들어가는 기본 주기 봉 수."""
+    return INTERVAL_MINUTES[interval] // INTERVAL_MINUTES[base]
+
+
+def bucket_starts(index, interval):
+    """각 캔들 시각(KST)이 속한 interval 캔들의 시작 시각 (candle_open_time의 벡터 버전)."""
+    minutes = INTERVAL_MINUTES[interval]
+    utc = pd.DatetimeIndex(index) - KST_OFFSET
+    if minutes == 10080:
+        # 주봉은 월요일 00:00(UTC) 시작
+        days = utc.normalize()
+        start = days - pd.to_timedelta(days.weekday, unit='D')
+    else:
+        start = utc.floor(f'{minutes}min')
+    return start + KST_OFFSET
+
+
+def resample(base_df, interval):
+    """기본 주기 캔들을 interval 캔들로 묶음. 입력은 시간순 정렬되어 있어야 합니다."""
+    cols = [c for c in OHLCV_COLUMNS if c in base_df.columns]
+    if base_df.empty:
+        return base_df[cols].copy()
+    starts = bucket_starts(base_df.index, interval)
+    # 정렬된 입력이므로 구간이 바뀌는 위치만 찾아 reduceat으로 한 번에 집계
+    bounds = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    last = np.r_[bounds[1:], len(base_df)] - 1
+    out = {}
+    for col in cols:
+        values = base_df[col].to_numpy(dtype=np.float64)
+        how = AGGREGATORS[col]
+        if how == 'first':
+            out[col] = values[bounds]
+        elif how == 'last':
+            out[col] = values[last]
+        elif how == 'max':
+            out[col] = np.maximum.reduceat(values, bounds)
+        elif how == 'min':
+            out[col] = np.minimum.reduceat(values, bounds)
+        else:
+            out[col] = np.add.reduceat(values, bounds)
+    return pd.DataFrame(out, index=pd.DatetimeIndex(starts[bounds]), columns=cols)
+
+
+class TimeframeSeries:
+    """
+    한 (종목, 상위 주기) 캔들. 기본 주기 프레임을 받을 때마다 마지막 상위 봉 구간부터만 다시 묶어
+    진행 중인 봉을 갱신하고 새 봉을 덧붙입니다.
+    """
+    def __init__(self, interval, max_candles=5000):
+        self.interval = interval
+        self.max_candles = max_candles
+        self.frame = None
+
+    def update(self, base_df):
+        if base_df is None or base_df.empty:
+            return self.frame
+        starts = bucket_starts(base_df.index[:1], self.interval)
+        if base_df.index[0] != starts[0]:
+            # 앞쪽이 구간 중간에서 잘린 기본 캔들은 그 상위 봉이 불완전하므로 버림
+            base_df = base_df[bucket_starts(base_df.index, self.interval) > starts[0]]
+        if self.frame is None or self.frame.empty or base_df.empty or base_df.index[0] > self.frame.index[-1]:
+            self.frame = resample(base_df, self.interval).iloc[-self.max_candles:]
+            return self.frame
+        last_start = self.frame.index[-1]
+        tail = resample(base_df[base_df.index >= last_start], self.interval)
+        if tail.empty:
+            return self.frame
+        # 마지막(진행 중이던) 상위 봉은 새로 묶은 값으로 교체하고 이후 봉을 이어 붙임
+        frame = pd.concat([self.frame[self.frame.index < tail.index[0]], tail])
+        self.frame = frame.iloc[-self.max_candles:]
+        return self.frame
+
+
+class TimeframeStore:
+    """
+    CandleStore 앞에 두고 같은 get_ohlcv / get_ohlcv_before 인터페이스로 사용합니다.
+    상위 주기는 기본 주기 캔들(CandleStore가 디스크에 보관하고 신규분만 조회)을 묶어 만들고,
+    필요한 기본 캔들 수가 저장 한도(max_base_candles)를 넘는 경우(minute60 200개 등)에만 해당 주기를 직접 받습니다.
+    """
+    def __init__(self, store, max_base_candles=None):
+        self.store = store
+        self.max_base_candles = max_base_candles or store.max_candles
+        self._series = {}   # (ticker, interval) -> TimeframeSeries
+        self._lock = KeyedLocks()
+
+    def _base_count(self, interval, count):
+        """interval 캔들 count개를 만드는 데 필요한 기본 캔들 수 (맨 앞 불완전 구간 몫 포함). 못 만들면 None."""
+        base = base_interval(interval)
+        if base is None:
+            return None
+        needed = (count + 1) * bar_factor(interval, base)
+        return needed if needed <= self.max_base_candles else None
+
+    def _derive(self, ticker, interval, base_df, count):
+        if base_df is None or base_df.empty:
+            return base_df
+        key = (ticker, interval)
+        with self._lock(key):
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = TimeframeSeries(interval, self.max_base_candles)
+            frame = series.update(base_df)
+            return frame.iloc[-count:].copy() if frame is not None else None
+
+    def get_ohlcv(self, ticker, interval='day', count=200):
+        base_count = self._base_count(interval, count)
+        if base_count is None:
+            return self.store.get_ohlcv(ticker, interval=interval, count=count)
+        base_df = self.store.get_ohlcv(ticker, interval=base_interval(interval), count=base_count)
+        return self._derive(ticker, interval, base_df, count)
+
+    def get_frames(self, ticker, intervals, count=200):
+        """
+        여러 주기를 한 번에 반환 {interval: DataFrame}. 기본 주기별로 캔들을 한 번만 조회하고 상위 주기는 그것으로 만듭니다.
+        (멀티 타임프레임 확인용 - 예: minute1 + minute5 + minute15)
+        """
+        frames, by_base = {}, {}
+        for interval in intervals:
+            base = base_interval(interval) if self._base_count(interval, count) else None
+            by_base.setdefault(base or interval, []).append(interval)
+        for base, group in by_base.items():
+            need = max(self._base_count(i, count) or count for i in group)
+            base_df = self.store.get_ohlcv(ticker, interval=base, count=need)
+            for interval in group:
+                if interval == base:
+                    frames[interval] = base_df.iloc[-count:].copy() if base_df is not None else None
+                else:
+                    frames[interval] = self._derive(ticker, interval, base_df, count)
+        return {interval: frames[interval] for interval in intervals}
+
+    def get_ohlcv_before(self, ticker, interval, to, count=200):
+        # 과거 스크롤은 구간이 제각각이라 해당 주기를 그대로 조회
+        return self.store.get_ohlcv_before(ticker, interval, to, count=count)
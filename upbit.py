@@ -8,18 +8,55 @@ import mplfinance as mpf
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import threading
+from concurrent.futures import ThreadPoolExecutor
 import time
 import platform
 import os
-import requests
 from queue import Queue, Empty
 import json
 from datetime import datetime, timedelta
-from scipy.signal import find_peaks
+from candle_store import CandleStore, CandleFrameCache, INTERVAL_MINUTES
+from timeframes import TimeframeStore
+from upbit_ws import UpbitRealtimeFeed
+from candle_builder import CandleBuilder
+from scheduler import CandleScheduler, PriceMoveTrigger, TICK, closed_bars, server_clock
+import upbit_http
+from account_state import AccountState, CapitalBudget
+from indicator_engine import IndicatorEngine
+import indicators
+import strategy_rules
+from signal_fusion import FUSION_PRESETS, DEFAULT_PRESET, SignalFusion
+from indicator_columns import columns_of, ensure_columns
+from market_data import MarketMetadataCache, TickerDeltaTracker, fetch_tickers, has_changes
 import openpyxl
 from openpyxl.utils import get_column_letter
 from tkinter import filedialog   # ← 추가
 
+# pyupbit 내부 요청까지 모두 전역 요청 스케줄러(그룹별 속도 제한, 우선순위)를 거치도록 설정
+upbit_http.install()
+server_clock.attach()   # REST 응답 Date 헤더로 서버 시각 추정 (전략 스케줄러가 캔들 마감 시각 계산에 사용)
+
+# -----------------------------------------------------------------------------
+# 용도별로 필요한 지표 컬럼 (요청한 컬럼과 그 의존 컬럼만 계산)
+# -----------------------------------------------------------------------------
+CHART_COLUMNS = columns_of('trend')   # MA 오버레이 + 실시간으로 갱신되는 RSI/MACD
+# 전략 매수/매도 조건은 strategy_rules.STRATEGY_RULES의 조건식, 필요한 컬럼도 조건식에서 가져옴
+STRATEGY_COLUMNS = {name: strategy_rules.rule_columns(name) for name in strategy_rules.STRATEGY_RULES}
+# 전략별 (캔들 주기, 개수) - 자동매매 루프 시작 시 모든 종목의 프레임을 이 기준으로 미리 받아 둠
+STRATEGY_FRAMES = {
+    "전략1": ('minute5', 200),
+    "전략2": ('minute1', 100),
+    "전략3": ('minute5', 100),
+    "전략4": ('minute1', 30),
+    "전략5": ('minute5', 100),
+    "전략6": ('minute5', 100),
+    "전략7": ('minute5', 100),
+    "전략8": ('minute5', 100),
+}
+SELL_CHECK_FRAME = ('minute5', 200)
+FETCH_WORKERS = 4   # 종목별 캔들/지표 동시 조회 수 (요청 속도 제한은 upbit_http가 관리)
+SETTINGS_COLUMNS = ['rsi', 'ma5', 'ma20', 'bb_lower', 'pattern', 'macd', 'signal', 'body', 'is_green']
+
 # ----------------------------------------------------------------------------- 
 # 한글 폰트 설정
 # -----------------------------------------------------------------------------
@@ -72,6 +109,13 @@ except Exception as e:
     messagebox.showerror("로그인 실패", f"API 키가 유효하지 않거나 네트워크에 문제가 있습니다.\nlogin.txt 파일을 확인해주세요.\n\n{e}")
     exit()
 
+# 로컬 캔들 저장소 (candle_cache/ 폴더에 종목·주기별로 보관)
+# minute3~240은 minute1, 주봉은 일봉을 묶어서 만들어 종목당 기본 주기 캔들만 조회
+candle_store = TimeframeStore(CandleStore())
+
+# 계좌 잔고 캐시 (모든 잔고 조회는 여기서 읽고, 타이머와 주문 직후에 갱신)
+account_state = AccountState(upbit, balances=balances)
+
 # ----------------------------------------------------------------------------- 
 # 2. GUI 클래스 및 기능
 # -----------------------------------------------------------------------------
@@ -85,7 +129,7 @@ class UpbitChartApp(tk.Tk):
         self.selected_ticker_display = tk.StringVar()
         self.selected_interval = tk.StringVar(value='day')
         self.current_price = 0.0; self.avg_buy_price = 0.0
-        self.balances_data = {}; self.is_running = True
+        self.is_running = True
         self.chart_elements = {'main': [], 'overlay': []}
         self.krw_balance_summary_var = tk.StringVar(value="보유 KRW: 0 원")
         self.total_investment_var = tk.StringVar(value="총 투자금액: 0 원")
@@ -97,6 +141,8 @@ class UpbitChartApp(tk.Tk):
         self.data_bounds = {'x': None, 'y': None}
         self.ma_vars = {'5': tk.BooleanVar(value=True), '20': tk.BooleanVar(value=True), '60': tk.BooleanVar(), '120': tk.BooleanVar()}
         self.bb_var = tk.BooleanVar(value=True)
+        self.market_meta = MarketMetadataCache()  # 마켓 목록/유의·정지 상태 (스냅샷 + 느린 주기 갱신)
+        self.market_delta = TickerDeltaTracker()   # 직전 시세 대비 바뀐 값만 GUI로 전달
         self.ticker_to_display_name = {}
         self.display_name_to_ticker = {}
         self.load_ticker_names()
@@ -113,11 +159,25 @@ class UpbitChartApp(tk.Tk):
         self.sell_coin_balance_var = tk.StringVar(value="주문가능: 0 COIN")
         self._is_calculating = False
         self.data_queue = Queue()
+        # 실시간 시세(WebSocket): 선택 종목 체결가를 받아 차트에 반영, 끊겨 있는 동안만 REST 폴링
+        # 체결(trade)로는 로컬 캔들을 만들어 새 봉을 이어 붙이고 지표 계산에도 사용
+        self.candle_builder = CandleBuilder()
+        self.realtime_feed = UpbitRealtimeFeed(on_ticker=self._on_realtime_ticker,
+                                               on_trade=self._on_realtime_trade,
+                                               on_reconnect=self._on_realtime_reconnect)
+        self.strategy_scheduler = None
+        self.tick_trigger = PriceMoveTrigger()
+        self.live_ticker = None
+        self.live_interval = None
+        self._live_price = None
+        self._live_price_pending = False
         self.trade_history_data = []
         self.is_auto_trading = False
         self.auto_trade_settings = {}
         self.auto_trade_thread = None
         self.last_sell_time = {}
+        self.indicator_cache = CandleFrameCache(clock=server_clock.now)  # 전략/매도조건 공용 지표 프레임 (서버 시각 캔들 마감 시 만료)
+        self.indicator_engine = IndicatorEngine()  # (종목, 주기)별 증분 지표 (새 봉/마지막 봉만 다시 계산)
         self.load_auto_trade_settings()
         self.create_widgets()
         self.add_variable_traces()
@@ -129,6 +189,12 @@ class UpbitChartApp(tk.Tk):
         self._keep_view = False  # 차트 뷰 상태 유지용 플래그
         self._ignore_market_select_event = False  # 마켓 트리 이벤트 루프 방지
 
+    @property
+    def balances_data(self):
+        # 보유 코인 잔고 {'KRW-BTC': {...}} - 잔고 캐시(account_state)의 마지막 값 (GUI에서 읽으므로 REST 조회 없음,
+        # 갱신은 타이머/주문 스레드가 담당). 주문 판단에는 account_state.balances_by_market()을 사용
+        return account_state.cached_by_market()
+
     def load_auto_trade_settings(self):
         try:
             with open("auto_trade_settings.json", "r", encoding="utf-8") as f:
@@ -159,24 +225,27 @@ class UpbitChartApp(tk.Tk):
         print("💾 자동매매 설정 저장 완료.")
 
     def start_updates(self):
+        account_state.start()
+        self.realtime_feed.start()
         self.update_loop()
         self.process_queue()
 
+    def _add_ticker_name(self, market_info):
+        market = market_info['market']
+        korean_name = market_info['korean_name']
+        symbol = market.split('-')[1]
+        display_name = f"{korean_name}({symbol})"
+        self.ticker_to_display_name[market] = display_name
+        self.display_name_to_ticker[display_name] = market
+
     def load_ticker_names(self):
         print("🔍 종목 이름 정보를 로드합니다...")
         try:
-            url = "https://api.upbit.com/v1/market/all?isDetails=true"
-            response = requests.get(url)
-            response.raise_for_status()
-            all_market_info = response.json()
-            for market_info in all_market_info:
-                if market_info['market'].startswith('KRW-'):
-                    market = market_info['market']
-                    korean_name = market_info['korean_name']
-                    symbol = market.split('-')[1]
-                    display_name = f"{korean_name}({symbol})"
-                    self.ticker_to_display_name[market] = display_name
-                    self.display_name_to_ticker[display_name] = market
+            # 스냅샷이 있으면 네트워크 없이 바로 사용 (최신 목록은 마켓 워커가 갱신)
+            if not self.market_meta.markets:
+                self.market_meta.refresh()
+            for market_info in self.market_meta.markets.values():
+                self._add_ticker_name(market_info)
             print("✅ 종목 이름 정보 로드 완료.")
         except Exception as e:
             print(f"❗️ 종목 이름 정보 로드 실패: {e}\n종목 코드를 그대로 사용합니다.")
@@ -397,17 +466,22 @@ class UpbitChartApp(tk.Tk):
                     f"매수비중 {buy_ratio}%, 쿨다운 {cooldown}시간, "
                     f"미보유코인매수 {'ON' if unowned else 'OFF'}, "
                     f"전략: {strategy_desc}, "
+                    f"신호결합: {SignalFusion.from_settings(s).describe()}, "
                     f"매수시나리오: {', '.join(buy_scenarios) if buy_scenarios else '없음'}, "
                     f"매도시나리오: {', '.join(sell_scenarios) if sell_scenarios else '없음'}, "
                     f"대상종목: {target_desc}"
                 )
                 self.show_auto_trade_monitor()  # 자동매매 시작 시 모니터 창 자동 표시
+                self._refresh_realtime_codes()
                 self.auto_trade_thread = threading.Thread(target=self.auto_trade_worker, daemon=True)
                 self.auto_trade_thread.start()
             else:
                 messagebox.showerror("인증 실패", "비밀번호가 일치하지 않습니다.")
         else:
             self.is_auto_trading = False
+            if self.strategy_scheduler is not None:
+                self.strategy_scheduler.stop()
+            self._refresh_realtime_codes()
             self.auto_trade_toggle_button.config(text="자동매매 켜기", style="Off.TButton")
             self.log_auto_trade("⏹️ 자동매매 중지")
 
@@ -415,15 +489,28 @@ class UpbitChartApp(tk.Tk):
         settings_window = AutoTradeSettingsWindow(self)
         settings_window.grab_set()
 
-    def get_technical_indicators(self, ticker, interval='day', count=200):
+    def get_technical_indicators(self, ticker, interval='day', count=200, key=None, columns=CHART_COLUMNS):
         try:
-            df = pyupbit.get_ohlcv(ticker, interval=interval, count=count)
-            return self.get_technical_indicators_from_raw(df)
+            # 실시간 체결로 만든 캔들이 충분하면 REST 조회 없이 사용
+            df = self.candle_builder.get_frame(ticker, interval, count) if self.realtime_feed.is_connected else None
+            if df is None:
+                df = candle_store.get_ohlcv(ticker, interval=interval, count=count)
+                if ticker in self.realtime_feed.codes:
+                    self.candle_builder.seed(ticker, interval, df)
+            return self.get_technical_indicators_from_raw(df, key=key or (ticker, interval, count), columns=columns)
         except Exception as e:
             self.log_auto_trade(f"❗️ {ticker} 지표 계산 오류: {e}")
             return None
+
+    def get_strategy_indicators(self, ticker, interval='minute5', count=200, columns=()):
+        # 같은 캔들 안에서는 전략1~8, 매도조건이 한 번 받은 프레임을 같이 사용하고, 아직 없는 컬럼만 추가 계산
+        return self.indicator_cache.get(
+            ticker, interval, count,
+            lambda t, i, c: self.get_technical_indicators(t, i, c, columns=()),
+            prepare=lambda df: self.get_technical_indicators_from_raw(df, key=(ticker, interval, 'strategy'), columns=columns))
     
     # <<<<< [핵심 수정] 과거 데이터 로딩 및 신규 상장 코인 차트 표시 개선 >>>>>
+    @upbit_http.with_priority(upbit_http.PRIORITY_BACKFILL)
     def _fetch_older_data_worker(self, ticker, interval, to_date, current_xlim):
         try:
             # pyupbit의 to 파라미터는 해당 시점 '이전'까지 200개를 반환하므로, to_date에서 1초 빼기
@@ -434,7 +521,7 @@ class UpbitChartApp(tk.Tk):
                 to_date_str = to_date_str.strftime('%Y-%m-%d %H:%M:%S')
 
             # 과거 데이터 요청 (최대 200개)
-            older_df_raw = pyupbit.get_ohlcv(ticker, interval=interval, count=200, to=to_date_str)
+            older_df_raw = candle_store.get_ohlcv_before(ticker, interval, to_date_str, count=200)
             # 만약 데이터가 없거나 1개 이하만 반환되면, 더 이상 로드할 데이터가 없음
             if older_df_raw is None or len(older_df_raw) < 2:
                 print("ℹ️ 더 이상 로드할 과거 데이터가 없습니다.")
@@ -450,7 +537,7 @@ class UpbitChartApp(tk.Tk):
             combined_df_raw = combined_df_raw.sort_index()
 
             # 지표 계산 최소 데이터 개수 완화 (신규상장 코인 대응)
-            df_with_indicators = self.get_technical_indicators_from_raw(combined_df_raw, min_length=2)
+            df_with_indicators = self.get_technical_indicators_from_raw(combined_df_raw, min_length=2, key=(ticker, interval, 'chart'))
             # 기존 master_df보다 더 많은 데이터가 있으면 갱신
             if df_with_indicators is not None and not df_with_indicators.empty:
                 num_candles_added = len(df_with_indicators) - len(self.master_df)
@@ -465,329 +552,118 @@ class UpbitChartApp(tk.Tk):
         self.is_loading_older = False
 
     # get_technical_indicators_from_raw의 최소 데이터 개수 파라미터화 및 신규상장 코인 대응
-    def get_technical_indicators_from_raw(self, df, min_length=2):
+    # key(종목, 주기, 용도)를 주면 이전 계산 상태를 이어서 새 봉/마지막 봉만 계산
+    def get_technical_indicators_from_raw(self, df, min_length=2, key=None, columns=CHART_COLUMNS):
         if df is None or len(df) < min_length:
             return None
-        for p in [5, 20, 60, 120]:
-            df[f'ma{p}'] = df['close'].rolling(window=p, min_periods=1).mean()
-        delta = df['close'].diff(1)
-        gain = (delta.where(delta > 0, 0)).rolling(window=14, min_periods=1).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14, min_periods=1).mean()
-        rs = gain / loss.replace(0, np.nan)
-        df['rsi'] = 100 - (100 / (1 + rs))
-        df['ema12'] = df['close'].ewm(span=12, adjust=False, min_periods=1).mean()
-        df['ema26'] = df['close'].ewm(span=26, adjust=False, min_periods=1).mean()
-        df['macd'] = df['ema12'] - df['ema26']
-        df['signal'] = df['macd'].ewm(span=9, adjust=False, min_periods=1).mean()
-        df['body'] = abs(df['close'] - df['open'])
-        df['upper_shadow'] = df['high'] - df[['open', 'close']].max(axis=1)
-        df['lower_shadow'] = df[['open', 'close']].min(axis=1) - df['low']
-        df['is_green'] = df['close'] > df['open']
-        patterns = []
-        for i in range(1, len(df)):
-            prev, curr = df.iloc[i-1], df.iloc[i]
-            pattern = 'none'
-            if curr['is_green'] and (curr['lower_shadow'] > curr['body'] * 2) and (curr['upper_shadow'] < curr['body'] * 0.5): pattern = 'hammer'
-            elif not prev['is_green'] and curr['is_green'] and curr['close'] > prev['open'] and curr['open'] < prev['close']: pattern = 'bullish_engulfing'
-            elif not curr['is_green'] and (curr['upper_shadow'] > curr['body'] * 2) and (curr['lower_shadow'] < curr['body'] * 0.5): pattern = 'shooting_star'
-            patterns.append(pattern)
-        df['pattern'] = ['none'] + patterns if len(df) > 1 else ['none']
-        try:
-            rsi_peaks, _ = find_peaks(df['rsi'].fillna(0), distance=5, width=1)
-            rsi_troughs, _ = find_peaks(-df['rsi'].fillna(0), distance=5, width=1)
-        except Exception:
-            rsi_peaks, rsi_troughs = [], []
-        # --- 핵심 수정: _check_divergence를 인스턴스 메서드가 아닌 staticmethod로 분리 ---
-        df['bearish_div'] = UpbitChartApp._check_divergence_static(df, rsi_peaks, 'bearish')
-        df['bullish_div'] = UpbitChartApp._check_divergence_static(df, rsi_troughs, 'bullish')
-        return df
-
-    @staticmethod
-    def _check_divergence_static(df, peaks, div_type):
-        # rsi와 가격의 피크/트로프를 비교하여 다이버전스 여부를 반환
-        if len(peaks) < 2:
-            return [False] * len(df)
-        result = [False] * len(df)
-        for i in range(1, len(peaks)):
-            idx1, idx2 = peaks[i-1], peaks[i]
-            if div_type == 'bearish':
-                # RSI는 하락, 가격은 상승
-                if df['rsi'].iloc[idx2] < df['rsi'].iloc[idx1] and df['high'].iloc[idx2] > df['high'].iloc[idx1]:
-                    result[idx2] = True
-            elif div_type == 'bullish':
-                # RSI는 상승, 가격은 하락
-                if df['rsi'].iloc[idx2] > df['rsi'].iloc[idx1] and df['low'].iloc[idx2] < df['low'].iloc[idx1]:
-                    result[idx2] = True
-        return result
+        # columns(와 의존 컬럼)만 계산 - MA/RSI/MACD는 key(종목, 주기, 용도)별로 새 봉/마지막 봉만 계산
+        # (패턴: 'pattern', cdl_* / 다이버전스: bearish_div, bullish_div, div_rsi_*, div_macd_hist_* 등은 요청할 때만)
+        return ensure_columns(df, columns, engine=self.indicator_engine, key=key)
 
     def auto_trade_worker(self):
         self.log_auto_trade(f"자동매매 스레드 시작.")
-        while self.is_auto_trading:
+        # 전략별 캔들(minute1/minute5) 마감 직후에 켜진 전략을 종목별로 한 번에 평가해 신호를 결합(signal_fusion)하고
+        # 종목마다 주문 하나만 냄. 그 사이에는 체결가가 기준가 대비 tick_trigger_pct(%) 이상 움직였을 때 보유 종목 매도만 확인
+        # 캔들 마감으로 깨어난 평가는 마감된 봉까지만 보고, 진행 중인 봉은 틱 트리거 평가에서만 사용
+        # 결합은 항상 켜진 전략 전체로 판단하고, 이번에 마감되지 않은 주기의 전략은 마지막으로 마감된 봉 기준 신호를 사용
+        # (해당 프레임은 캐시에서 그대로 읽음). 보유 종목 매도조건(SELL_CHECK_FRAME)은 그 주기가 마감될 때만 확인
+        self.strategy_scheduler = scheduler = CandleScheduler([SELL_CHECK_FRAME[0]])
+        due = None   # 시작 직후 한 번은 바로 평가
+        while self.is_auto_trading and not scheduler.stopped:
+            if due is not None and not due:
+                due = scheduler.wait_next()   # 실행할 것이 없음
+                continue
             try:
                 s = self.auto_trade_settings
-                enabled_tickers = s.get('enabled_tickers', [])
-                if enabled_tickers:
-                    ticker = enabled_tickers[0]
-                    my_coins = self.balances_data
-                    coin_info = my_coins.get(ticker)
-                    if coin_info and float(coin_info.get('balance', 0)) > 0:
-                        self.check_sell_condition(ticker, coin_info)
-                # 전략별 분기 실행 (run_strategyX 내부에서 매수/매도 모두 처리)
-                if s.get('strategy1'):
-                    self.run_strategy1()
-                if s.get('strategy2'):
-                    self.run_strategy2()
-                if s.get('strategy3'):
-                    self.run_strategy3()
-                if s.get('strategy4'):
-                    self.run_strategy4()
-                if s.get('strategy5'):
-                    self.run_strategy5()
-                if s.get('strategy6'):
-                    self.run_strategy6()
-                if s.get('strategy7'):
-                    self.run_strategy7()
-                if s.get('strategy8'):
-                    self.run_strategy8()
+                self.tick_trigger.threshold = s.get('tick_trigger_pct', 1.0) / 100 or float('inf')
+                fusion = SignalFusion.from_settings(s)
+                # 거래정지/거래지원 종료 종목은 주문하지 않음
+                tickers = [t for t in s.get('enabled_tickers', []) if not self.market_meta.is_suspended(t)]
+                scheduler.set_intervals([SELL_CHECK_FRAME[0]] + [STRATEGY_FRAMES[name][0] for name in fusion.strategies])
+                tick_only = due is not None and not (due - {TICK})
+                closed_at = None if tick_only else server_clock.now()
+                sell_check = due is None or TICK in due or SELL_CHECK_FRAME[0] in due
+                my_coins = account_state.balances_by_market()
+                if tick_only:
+                    # 지표 프레임은 캔들 마감까지 재사용되므로 틱 트리거 때는 보유 종목의 진행 중인 봉을 다시 반영
+                    tickers = [t for t in tickers if float(my_coins.get(t, {}).get('balance', 0)) > 0]
+                    for ticker in tickers:
+                        self.indicator_cache.invalidate(ticker)
+                self._prefetch_strategy_frames(tickers, fusion.strategies, sell_check=sell_check)
+                # 이번 루프의 매수는 모두 루프 시작 시점 KRW 잔고 한도 안에서 나눠 씀
+                self.capital_budget = CapitalBudget(account_state.balance("KRW"))
+                for ticker in tickers:
+                    if not self.is_auto_trading:
+                        break
+                    self.tick_trigger.reset(ticker, self.realtime_feed.last_price.get(ticker))
+                    self.run_fused_strategies(ticker, fusion, my_coins.get(ticker), sell_only=tick_only,
+                                              closed_at=closed_at, sell_check=sell_check)
             except Exception as e:
                 import traceback
                 self.log_auto_trade(f"❗️ 자동매매 루프 오류: {e}\n{traceback.format_exc()}")
-            time.sleep(60)
-
-    # 3. [UpbitChartApp] 각 전략별 함수 뼈대 추가 (조건 구현은 각 전략 설명 참고)
-    def run_strategy1(self):
-        # 5분봉, RSI+이동평균+거래량 전략 (저위험)
-        s = self.auto_trade_settings
-        ticker = s.get('enabled_tickers', [None])[0]
-        if not ticker:
-            return
-        cooldown_minutes = 10  # 전략1 쿨다운 10분
-        if self.is_cooldown(ticker, "전략1", cooldown_minutes):
-            return
-        df = self.get_technical_indicators(ticker, interval='minute5', count=200)
-        if df is None or len(df) < 30:
+            due = scheduler.wait_next()
+        # 자동매매를 껐다가 바로 다시 켜면 새 스레드가 새 스케줄러를 이미 등록했을 수 있음
+        if self.strategy_scheduler is scheduler:
+            self.strategy_scheduler = None
+
+    def _prefetch_strategy_frames(self, tickers, strategies, sell_check=True):
+        """켜진 전략들이 쓸 (종목, 주기) 프레임을 제한된 스레드 풀로 동시에 받아 indicator_cache에 채움."""
+        jobs = {}   # (ticker, interval) -> [최대 count, 필요한 컬럼]
+        frames = [(STRATEGY_FRAMES[name], STRATEGY_COLUMNS[name]) for name in strategies]
+        if sell_check:
+            frames.append((SELL_CHECK_FRAME, [c for name in strategies for c in STRATEGY_COLUMNS[name]]))
+        for ticker in tickers:
+            for (interval, count), columns in frames:
+                job = jobs.setdefault((ticker, interval), [0, []])
+                job[0] = max(job[0], count + 1)   # 진행 중인 봉을 뺄 몫 1개 (_strategy_frame)
+                job[1] += [c for c in columns if c not in job[1]]
+        if not jobs:
             return
-        last = df.iloc[-1]
-        prev = df.iloc[-2]
 
-        # 매수: RSI 30 이하 & 5MA > 20MA & 거래량 최근 10봉 평균의 2배 이상
-        vol_ma10 = df['volume'].rolling(10).mean().iloc[-1]
-        if last['rsi'] < 30 and last['ma5'] > last['ma20'] and last['volume'] > vol_ma10 * 2:
-            self.execute_buy(ticker, "전략1: RSI<30 & 5MA>20MA & 거래량급증")
-            return
-
-        # 매도: RSI 70 이상 & 5MA < 20MA
-        coin_info = self.balances_data.get(ticker)
-        if coin_info and float(coin_info.get('balance', 0)) > 0:
-            if last['rsi'] > 70 and last['ma5'] < last['ma20']:
-                self.execute_sell(ticker, coin_info, "전략1: RSI>70 & 5MA<20MA")
-
-    def run_strategy2(self):
-        # 1분봉, 볼린저밴드+캔들패턴 전략 (고수익)
-        s = self.auto_trade_settings
-        ticker = s.get('enabled_tickers', [None])[0]
-        if not ticker:
-            return
-        cooldown_minutes = 10  # 전략1 쿨다운 10분
-        if self.is_cooldown(ticker, "전략2", cooldown_minutes):
-            return
-        df = self.get_technical_indicators(ticker, interval='minute1', count=100)
-        if df is None or len(df) < 30:
-            return
-        last = df.iloc[-1]
-        prev = df.iloc[-2]
-        bb_period = 20
-        middle = df['close'].rolling(window=bb_period).mean()
-        std = df['close'].rolling(window=bb_period).std()
-        upper = middle + (std * 2)
-        lower = middle - (std * 2)
-
-        # 매수: 종가가 볼린저밴드 하단 돌파 + 해머형 캔들
-        if last['close'] < lower.iloc[-1] and last['pattern'] == 'hammer':
-            self.execute_buy(ticker, "전략2: BB하단돌파+해머형")
-            return
-
-        # 매도: 종가가 볼린저밴드 상단 돌파 + shooting_star
-        coin_info = self.balances_data.get(ticker)
-        if coin_info and float(coin_info.get('balance', 0)) > 0:
-            if last['close'] > upper.iloc[-1] and last['pattern'] == 'shooting_star':
-                self.execute_sell(ticker, coin_info, "전략2: BB상단돌파+슈팅스타")
-
-    def run_strategy3(self):
-        # 5분봉, MACD+트레일링스탑 전략 (추세추종)
-        s = self.auto_trade_settings
-        ticker = s.get('enabled_tickers', [None])[0]
-        if not ticker:
-            return
-        cooldown_minutes = 10  # 전략1 쿨다운 10분
-        if self.is_cooldown(ticker, "전략3", cooldown_minutes):
-            return
-        df = self.get_technical_indicators(ticker, interval='minute5', count=100)
-        if df is None or len(df) < 30:
-            return
-        last = df.iloc[-1]
-        prev = df.iloc[-2]
-
-        # 매수: MACD 시그널 상향돌파
-        if prev['macd'] < prev['signal'] and last['macd'] > last['signal']:
-            self.execute_buy(ticker, "전략3: MACD상향돌파")
-            return
-
-        # 매도: MACD 시그널 하향돌파 or 트레일링스탑(최고가 대비 -3% 하락)
-        coin_info = self.balances_data.get(ticker)
-        if coin_info and float(coin_info.get('balance', 0)) > 0:
-            buy_price = float(coin_info.get('avg_buy_price', 0))
-            max_high = df['high'].iloc[-20:].max()
-            cur_price = last['close']
-            if prev['macd'] > prev['signal'] and last['macd'] < last['signal']:
-                self.execute_sell(ticker, coin_info, "전략3: MACD하향돌파")
-            elif buy_price > 0 and cur_price < max_high * 0.97:
-                self.execute_sell(ticker, coin_info, "전략3: 트레일링스탑 -3%")
-
-    def run_strategy4(self):
-        # 1분봉, 강한캔들+볼륨펌핑 전략 (초단타)
-        s = self.auto_trade_settings
-        ticker = s.get('enabled_tickers', [None])[0]
-        if not ticker:
-            return
-        cooldown_minutes = 10  # 전략1 쿨다운 10분
-        if self.is_cooldown(ticker, "전략4", cooldown_minutes):
-            return
-        df = self.get_technical_indicators(ticker, interval='minute1', count=30)
-        if df is None or len(df) < 10:
-            return
-        last = df.iloc[-1]
-        prev = df.iloc[-2]
-        # 매수: 전봉 대비 거래량 3배 이상 + 양봉 + 몸통 길이 상위 20%
-        body_threshold = df['body'].quantile(0.8)
-        if last['is_green'] and last['volume'] > prev['volume'] * 3 and last['body'] > body_threshold:
-            self.execute_buy(ticker, "전략4: 강한양봉+볼륨펌핑")
-            return
-
-        # 매도: 음봉 + 거래량 급증
-        coin_info = self.balances_data.get(ticker)
-        if coin_info and float(coin_info.get('balance', 0)) > 0:
-            if not last['is_green'] and last['volume'] > prev['volume'] * 2:
-                self.execute_sell(ticker, coin_info, "전략4: 강한음봉+볼륨급증")
-
-    def run_strategy5(self):
-        # MA 골든/데드크로스 (5/20MA)
-        s = self.auto_trade_settings
-        ticker = s.get('enabled_tickers', [None])[0]
-        if not ticker:
-            return
-        cooldown_minutes = 10  # 전략1 쿨다운 10분
-        if self.is_cooldown(ticker, "전략5", cooldown_minutes):
-            return
-        df = self.get_technical_indicators(ticker, interval='minute5', count=100)
-        if df is None or len(df) < 30:
-            return
-        last = df.iloc[-1]
-        prev = df.iloc[-2]
-        # 골든크로스 매수
-        if prev['ma5'] < prev['ma20'] and last['ma5'] > last['ma20']:
-            self.execute_buy(ticker, "전략5: MA 골든크로스")
-            return
-        # 데드크로스 매도
-        coin_info = self.balances_data.get(ticker)
-        if coin_info and float(coin_info.get('balance', 0)) > 0:
-            if prev['ma5'] > prev['ma20'] and last['ma5'] < last['ma20']:
-                self.execute_sell(ticker, coin_info, "전략5: MA 데드크로스")
-
-    def run_strategy6(self):
-        # OBV 추세전환
-        s = self.auto_trade_settings
-        ticker = s.get('enabled_tickers', [None])[0]
-        if not ticker:
-            return
-        cooldown_minutes = 10  # 전략1 쿨다운 10분
-        if self.is_cooldown(ticker, "전략6", cooldown_minutes):
-            return
-        df = self.get_technical_indicators(ticker, interval='minute5', count=100)
-        if df is None or len(df) < 30:
-            return
-        # OBV 계산
-        obv = [0]
-        for i in range(1, len(df)):
-            if df['close'].iloc[i] > df['close'].iloc[i-1]:
-                obv.append(obv[-1] + df['volume'].iloc[i])
-            elif df['close'].iloc[i] < df['close'].iloc[i-1]:
-                obv.append(obv[-1] - df['volume'].iloc[i])
-            else:
-                obv.append(obv[-1])
-        df['obv'] = obv
-        last = df.iloc[-1]
-        prev = df.iloc[-2]
-        # 매수: OBV가 직전 저점 돌파(상승 전환)
-        if df['obv'].iloc[-2] < df['obv'].iloc[-3] and df['obv'].iloc[-1] > df['obv'].iloc[-2]:
-            self.execute_buy(ticker, "전략6: OBV 상승전환")
-            return
-        # 매도: OBV가 직전 고점 하락(하락 전환)
-        coin_info = self.balances_data.get(ticker)
-        if coin_info and float(coin_info.get('balance', 0)) > 0:
-            if df['obv'].iloc[-2] > df['obv'].iloc[-3] and df['obv'].iloc[-1] < df['obv'].iloc[-2]:
-                self.execute_sell(ticker, coin_info, "전략6: OBV 하락전환")
-
-    def run_strategy7(self):
-        # StochRSI 돌파
-        s = self.auto_trade_settings
-        ticker = s.get('enabled_tickers', [None])[0]
-        if not ticker:
-            return
-        cooldown_minutes = 10  # 전략1 쿨다운 10분
-        if self.is_cooldown(ticker, "전략7", cooldown_minutes):
-            return
-        df = self.get_technical_indicators(ticker, interval='minute5', count=100)
-        if df is None or len(df) < 30:
-            return
-        # StochRSI 계산
-        rsi = df['rsi']
-        min_rsi = rsi.rolling(window=14, min_periods=1).min()
-        max_rsi = rsi.rolling(window=14, min_periods=1).max()
-        stochrsi = (rsi - min_rsi) / (max_rsi - min_rsi)
-        df['stochrsi'] = stochrsi
-        last = df.iloc[-1]
-        prev = df.iloc[-2]
-        # 매수: StochRSI 0.2 이하에서 상향 돌파
-        if prev['stochrsi'] < 0.2 and last['stochrsi'] >= 0.2:
-            self.execute_buy(ticker, "전략7: StochRSI 상향돌파")
-            return
-        # 매도: StochRSI 0.8 이상에서 하향 돌파
-        coin_info = self.balances_data.get(ticker)
-        if coin_info and float(coin_info.get('balance', 0)) > 0:
-            if prev['stochrsi'] > 0.8 and last['stochrsi'] <= 0.8:
-                self.execute_sell(ticker, coin_info, "전략7: StochRSI 하향돌파")
-
-    def run_strategy8(self):
-        # CCI 돌파
-        s = self.auto_trade_settings
-        ticker = s.get('enabled_tickers', [None])[0]
-        if not ticker:
-            return
-        cooldown_minutes = 10  # 전략1 쿨다운 10분
-        if self.is_cooldown(ticker, "전략8", cooldown_minutes):
-            return
-        df = self.get_technical_indicators(ticker, interval='minute5', count=100)
-        if df is None or len(df) < 30:
-            return
-        # CCI 계산
-        tp = (df['high'] + df['low'] + df['close']) / 3
-        ma = tp.rolling(window=20, min_periods=1).mean()
-        md = tp.rolling(window=20, min_periods=1).apply(lambda x: np.mean(np.abs(x - np.mean(x))))
-        cci = (tp - ma) / (0.015 * md)
-        df['cci'] = cci
-        last = df.iloc[-1]
-        prev = df.iloc[-2]
-        # 매수: CCI 100 돌파
-        if prev['cci'] < 100 and last['cci'] >= 100:
-            self.execute_buy(ticker, "전략8: CCI 100 상향돌파")
+        def fetch(item):
+            (ticker, interval), (count, columns) = item
+            try:
+                self.get_strategy_indicators(ticker, interval=interval, count=count, columns=columns)
+            except Exception as e:
+                self.log_auto_trade(f"❗️ {ticker} {interval} 데이터 조회 오류: {e}")
+
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+            list(pool.map(fetch, jobs.items()))
+
+    # 3. [UpbitChartApp] 전략 실행 - 조건은 strategy_rules.STRATEGY_RULES (전략1~8 공통 경로)
+    def run_fused_strategies(self, ticker, fusion, coin_info, sell_only=False, closed_at=None, sell_check=True):
+        # 켜진 전략을 미리 받아 둔 프레임에서 한 번에 평가하고 결합 결과로 주문 하나만 실행
+        # closed_at(서버 시각)을 주면 그 시각에 진행 중인 봉은 빼고 마감된 봉으로 평가
+        holding = bool(coin_info) and float(coin_info.get('balance', 0)) > 0
+        frames = {name: self._strategy_frame(ticker, *STRATEGY_FRAMES[name], STRATEGY_COLUMNS[name], closed_at)
+                  for name in fusion.strategies}
+        decision = fusion.decide(frames, holding=holding)
+        if sell_check and holding and (decision is None or decision[0] != 'sell'):
+            # 결합 대상에서 빠졌더라도 매수한 전략의 매도 조건은 계속 적용
+            reason = self.check_sell_condition(ticker, closed_at)
+            decision = ('sell', reason) if reason else decision
+        if decision is None:
             return
-        # 매도: CCI -100 돌파
-        coin_info = self.balances_data.get(ticker)
-        if coin_info and float(coin_info.get('balance', 0)) > 0:
-            if prev['cci'] > -100 and last['cci'] <= -100:
-                self.execute_sell(ticker, coin_info, "전략8: CCI -100 하향돌파")
-
+        side, reason = decision
+        if side == 'sell':
+            self.execute_sell(ticker, coin_info, reason)
+        elif not sell_only:
+            # 종목별 재매수 쿨다운 10분. 신호는 buy_window개 봉 동안 계속 보이므로(안정형 등 최근 3봉 = 5분봉 15분)
+            # 같은 신호로 다시 사지 않도록 신호 낸 전략 주기의 buy_window개 봉 길이보다 짧지 않게 잡음
+            fired = [name for name in reason.split(":")[0].split('+') if name in STRATEGY_FRAMES]
+            bar_minutes = max((INTERVAL_MINUTES.get(STRATEGY_FRAMES[name][0], 1) for name in fired), default=0)
+            cooldown_minutes = max(10, fusion.buy_window * bar_minutes)
+            if not self.is_cooldown(ticker, reason.split(":")[0], cooldown_minutes):
+                self.execute_buy(ticker, reason)
+
+    def _strategy_frame(self, ticker, interval, count, columns, closed_at=None):
+        # 진행 중인 봉을 빼도 count개가 남도록 1개 더 받아 두고 뒤쪽 count개만 사용
+        df = self.get_strategy_indicators(ticker, interval=interval, count=count + 1, columns=columns)
+        if closed_at is not None:
+            df = closed_bars(df, interval, closed_at)
+        return df.iloc[-count:] if df is not None else df
+
+    @upbit_http.with_priority(upbit_http.PRIORITY_ORDER)
     def execute_sell(self, ticker, coin_info, reason):
         self.log_auto_trade(f"📉 [{reason}] {ticker} 매도 신호 포착")
         balance = float(coin_info['balance'])
@@ -826,19 +702,30 @@ class UpbitChartApp(tk.Tk):
         except Exception as e:
             self.log_auto_trade(f"❗️ {ticker} 매도 주문 실행 중 오류: {e}")
 
+    @upbit_http.with_priority(upbit_http.PRIORITY_ORDER)
     def execute_buy(self, ticker, reason):
         try:
-            krw_balance = upbit.get_balance("KRW")
             ratio = self.auto_trade_settings.get('investment_ratio', 10) / 100
-            buy_amount = krw_balance * ratio
+            # 여러 종목이 같은 루프에서 매수해도 루프 시작 시점 잔고를 나눠 쓰도록 공용 예산에서 차감
+            budget = getattr(self, 'capital_budget', None) or CapitalBudget(account_state.balance("KRW"))
+            buy_amount = budget.allocate(budget.total * ratio, minimum=5000)
 
             if buy_amount < 5000:
-                self.log_auto_trade(f"ℹ️ {ticker} 매수 건너뜀 (주문 금액 부족: {buy_amount:,.0f} KRW)")
+                self.log_auto_trade(f"ℹ️ {ticker} 매수 건너뜀 (주문 금액 부족: 남은 예산 {budget.remaining:,.0f} KRW)")
                 return
 
             price = pyupbit.get_current_price(ticker)
             self.log_auto_trade(f"📈 [{reason}] {ticker} 매수 신호 포착")
-            result = upbit.buy_market_order(ticker, buy_amount)
+            try:
+                result = upbit.buy_market_order(ticker, buy_amount)
+            except Exception:
+                budget.release(buy_amount)
+                raise
+            # pyupbit는 주문 오류를 예외 대신 None/오류 dict로 돌려주므로 uuid가 없으면 실패로 보고 예산을 되돌림
+            if not (isinstance(result, dict) and 'uuid' in result):
+                budget.release(buy_amount)
+                self.log_auto_trade(f"❗️ {ticker} 매수 주문 실패 (주문결과: {result})")
+                return
             # 업비트 수수료율(시장가 0.05%) 적용
             fee = buy_amount * 0.0005
             # --- [추가] 매수 전략명을 저장 ---
@@ -865,50 +752,20 @@ class UpbitChartApp(tk.Tk):
         except Exception as e:
             self.log_auto_trade(f"❗️ {ticker} 매수 주문 실행 중 오류: {e}")
 
-    def check_sell_condition(self, ticker, coin_info):
-        s = self.auto_trade_settings
-        df = self.get_technical_indicators(ticker, interval='minute5', count=200)
-        if df is None or len(df) < 10:
-            return
-        last = df.iloc[-1]
-        prev = df.iloc[-2]
-
-        # --- [변경] 매수 전략에 따라 매도 조건만 적용 ---
-        strategy_map = {
-            "전략1": lambda: last['rsi'] > 70 and last['ma5'] < last['ma20'],
-            "전략2": lambda: (
-                last['close'] > last['close'].rolling(20).mean().iloc[-1] + (last['close'].rolling(20).std().iloc[-1] * 2)
-                and last['pattern'] == 'shooting_star'
-            ),
-            "전략3": lambda: (
-                (prev['macd'] > prev['signal'] and last['macd'] < last['signal']) or
-                (float(coin_info.get('avg_buy_price', 0)) > 0 and last['close'] < df['high'].iloc[-20:].max() * 0.97)
-            ),
-            "전략4": lambda: (not last['is_green'] and last['volume'] > prev['volume'] * 2),
-            "전략5": lambda: (prev['ma5'] > prev['ma20'] and last['ma5'] < last['ma20']),
-            "전략6": lambda: (
-                'obv' in df.columns and prev['obv'] > last['obv']
-            ),
-            "전략7": lambda: (
-                (last['rsi'] - last['rsi'].rolling(14, min_periods=1).min().iloc[-1]) /
-                (last['rsi'].rolling(14, min_periods=1).max().iloc[-1] - last['rsi'].rolling(14, min_periods=1).min().iloc[-1]) <= 0.8
-                if last['rsi'].rolling(14, min_periods=1).max().iloc[-1] != last['rsi'].rolling(14, min_periods=1).min().iloc[-1] else False
-            ),
-            "전략8": lambda: (
-                ((last['high'] + last['low'] + last['close']) / 3 - ((last['high'] + last['low'] + last['close']) / 3).rolling(20, min_periods=1).mean().iloc[-1]) /
-                (0.015 * ((last['high'] + last['low'] + last['close']) / 3).rolling(20, min_periods=1).apply(lambda x: np.mean(np.abs(x - np.mean(x)))).iloc[-1]) <= -100
-                if ((last['high'] + last['low'] + last['close']) / 3).rolling(20, min_periods=1).apply(lambda x: np.mean(np.abs(x - np.mean(x)))).iloc[-1] != 0 else False
-            ),
-        }
-
-        # 매수 시 사용한 전략만 매도 조건 적용
-        buy_strategy = getattr(self, 'last_buy_strategy', {}).get(ticker)
-        if not buy_strategy:
-            return
-
-        if buy_strategy in strategy_map and strategy_map[buy_strategy]():
-            self.execute_sell(ticker, coin_info, f"{buy_strategy}: 매도조건")
-
+    def check_sell_condition(self, ticker, closed_at=None):
+        """매수한 전략(결합 매수면 '전략1+전략3'의 각 전략)의 매도 규칙이 맞으면 사유, 아니면 None."""
+        buy_strategy = getattr(self, 'last_buy_strategy', {}).get(ticker) or ''
+        names = [name for name in buy_strategy.split('+') if name in STRATEGY_COLUMNS]
+        if not names:
+            return None
+        # 매수 시 사용한 전략의 컬럼만 계산
+        columns = list(dict.fromkeys(column for name in names for column in STRATEGY_COLUMNS[name]))
+        df = self._strategy_frame(ticker, *SELL_CHECK_FRAME, columns, closed_at)
+        for name in names:
+            reason = strategy_rules.match(name, 'sell', df)
+            if reason:
+                return f"{name}: {reason}"
+        return None
 
     def create_buy_sell_tab(self, parent_frame, side):
         is_buy = (side == "buy")
@@ -1017,6 +874,7 @@ class UpbitChartApp(tk.Tk):
         if messagebox.askyesno("거래내역 새로고침 확인", "기존에 저장된 내역에 추가로 최신 거래내역을 동기화합니다.\n종목 수가 많을 경우 시간이 오래 걸릴 수 있습니다.\n\n계속하시겠습니까?"):
             threading.Thread(target=self._fetch_and_update_trade_history_worker, daemon=True).start()
 
+    @upbit_http.with_priority(upbit_http.PRIORITY_BACKFILL)
     def _fetch_and_update_trade_history_worker(self):
         self.after(0, lambda: messagebox.showinfo("조회 시작", "최신 거래 내역 동기화를 시작합니다. 완료되면 알려드립니다."))
         
@@ -1090,6 +948,12 @@ class UpbitChartApp(tk.Tk):
                     self._refresh_market_tree_gui()
                 elif task_name == "update_live_candle":
                     self._update_live_data(data)
+                elif task_name == "update_live_price":
+                    self._apply_live_price()
+                elif task_name == "update_market_meta":
+                    self._apply_market_meta_diff(data)
+                elif task_name == "update_market_delta":
+                    self._apply_market_delta(data)
                 elif task_name == "draw_chart":
                     self._finalize_chart_drawing(*data)
                 elif task_name == "draw_older_chart":
@@ -1104,7 +968,8 @@ class UpbitChartApp(tk.Tk):
         if not self.is_running:
             return
 
-        threading.Thread(target=self.fetch_current_price, daemon=True).start()
+        if not self.realtime_feed.is_connected:
+            threading.Thread(target=self.fetch_current_price, daemon=True).start()
 
         if self.update_loop_counter % 5 == 0:
             threading.Thread(target=self._fetch_portfolio_data_worker, daemon=True).start()
@@ -1115,6 +980,75 @@ class UpbitChartApp(tk.Tk):
         self.update_loop_counter += 1
         self.after(1000, self.update_loop)
 
+    def _on_realtime_ticker(self, msg):
+        # WebSocket 스레드에서 호출됨: 최신가만 보관하고 큐에는 처리 대기 중인 항목이 없을 때만 넣음
+        if msg.get('code') != self.live_ticker:
+            return
+        self._live_price = (msg['code'], msg['trade_price'])
+        if not self._live_price_pending:
+            self._live_price_pending = True
+            self.data_queue.put(("update_live_price", None))
+
+    def _refresh_realtime_codes(self):
+        # 차트 종목 + (자동매매 중이면) 대상 종목을 구독해 전략도 실시간 캔들을 사용
+        codes = [self.live_ticker]
+        if self.is_auto_trading:
+            codes += self.auto_trade_settings.get('enabled_tickers', [])
+        codes = [c for c in codes if c]
+        self.realtime_feed.set_codes(codes)
+        self.candle_builder.retain(codes)
+
+    def _apply_live_price(self):
+        self._live_price_pending = False
+        if self._live_price and self._live_price[0] == self.live_ticker:
+            self._roll_live_candle()
+            self._update_live_data(self._live_price[1])
+
+    def _roll_live_candle(self):
+        # 체결로 만든 새 봉이 생겼으면 차트에 이어 붙이고 지표를 다시 계산 (같은 봉이면 거래량만 맞춤)
+        if self.master_df is None or self.master_df.empty or not self.live_interval:
+            return
+        new_rows = self.candle_builder.get_since(self.live_ticker, self.live_interval, self.master_df.index[-1])
+        if new_rows is None or new_rows.empty:
+            return
+        if len(new_rows) == 1:
+            self.master_df.loc[self.master_df.index[-1], 'volume'] = new_rows['volume'].iloc[-1]
+            return
+        cols = ['open', 'high', 'low', 'close', 'volume']
+        ohlcv = self.master_df[cols]
+        combined = pd.concat([ohlcv[ohlcv.index < new_rows.index[0]], new_rows[cols]])
+        df = self.get_technical_indicators_from_raw(combined, key=(self.live_ticker, self.live_interval, 'chart'))
+        if df is None:
+            return
+        num_added = len(df) - len(self.master_df)
+        x0, x1 = self.ax.get_xlim()
+        is_following = x1 >= len(self.master_df) - 1  # 최신 봉을 보고 있었으면 뷰도 같이 이동
+        self._keep_view = True
+        self._finalize_chart_drawing(df, self.live_interval, self.selected_ticker_display.get())
+        if is_following and num_added > 0:
+            self.ax.set_xlim(x0 + num_added, x1 + num_added)
+            self.canvas.draw_idle()
+
+    def _on_realtime_trade(self, msg):
+        # WebSocket 스레드: 로컬 캔들 갱신 + 서버 시각 추정 + (자동매매 중) 기준가 대비 급변 시 매도 조건 즉시 확인
+        self.candle_builder.on_trade(msg)
+        server_clock.observe_ms(msg.get('timestamp'))
+        scheduler = self.strategy_scheduler
+        if scheduler is not None and self.tick_trigger.check(msg.get('code'), msg.get('trade_price')):
+            scheduler.trigger(TICK)
+
+    def _on_realtime_reconnect(self):
+        # 끊긴 동안 놓친 체결이 있으므로 로컬 캔들을 버리고 차트 종목은 REST로 다시 맞춤
+        self.candle_builder.clear()
+        if self.live_ticker and self.live_interval:
+            threading.Thread(target=self._reseed_live_candles, args=(self.live_ticker, self.live_interval), daemon=True).start()
+
+    def _reseed_live_candles(self, ticker, interval):
+        try:
+            self.candle_builder.seed(ticker, interval, candle_store.get_ohlcv(ticker, interval=interval, count=200))
+        except Exception as e:
+            print(f"❗️ 실시간 캔들 재설정 오류: {e}")
+
     def fetch_current_price(self):
         display_name = self.selected_ticker_display.get()
         ticker = self.display_name_to_ticker.get(display_name)
@@ -1128,8 +1062,7 @@ class UpbitChartApp(tk.Tk):
                 
     def _fetch_portfolio_data_worker(self):
         try:
-            balances = upbit.get_balances()
-            self.balances_data = {f"KRW-{b['currency']}": b for b in balances if b['currency'] != 'KRW'}
+            balances = account_state.get_balances()
             krw_balance = next((float(b['balance']) for b in balances if b['currency'] == 'KRW'), 0.0)
             krw_balances_data = {f"KRW-{b['currency']}": b for b in balances if b['currency'] != 'KRW' and float(b.get('balance', 0)) > 0}
 
@@ -1174,15 +1107,48 @@ class UpbitChartApp(tk.Tk):
         except Exception as e:
             print(f"❗️ 포트폴리오 업데이트 오류: {e}")
 
+    def _refresh_market_meta(self):
+        # 마켓 목록은 느린 주기로만 갱신하고, 바뀐 것(diff)이 있을 때만 GUI/자동매매에 알림
+        if not self.market_meta.needs_refresh():
+            return
+        try:
+            diff = self.market_meta.refresh()
+        except Exception as e:
+            print(f"❗️ 마켓 정보 갱신 실패 (이전 목록 사용): {e}")
+            return
+        if has_changes(diff):
+            self.data_queue.put(("update_market_meta", diff))
+
+    def _apply_market_meta_diff(self, diff):
+        for market in diff['listed']:
+            market_info = self.market_meta.markets.get(market)
+            if market_info:
+                self._add_ticker_name(market_info)
+            print(f"🆕 신규 상장: {self.ticker_to_display_name.get(market, market)}")
+        for market in diff['delisted']:
+            print(f"⛔ 거래지원 종료: {self.ticker_to_display_name.get(market, market)}")
+        for market, old, new in diff['warning_changed']:
+            print(f"⚠️ 유의/정지 상태 변경: {self.ticker_to_display_name.get(market, market)} ({old} → {new})")
+        enabled_tickers = set(self.auto_trade_settings.get('enabled_tickers', []))
+        changed = set(diff['delisted']) | {market for market, _, _ in diff['warning_changed']}
+        for market in sorted(enabled_tickers & changed):
+            state = "거래정지" if self.market_meta.is_suspended(market) else self.market_meta.markets.get(market, {}).get('market_warning', 'NONE')
+            self.log_auto_trade(f"⚠️ 자동매매 대상 {self.ticker_to_display_name.get(market, market)} 상태 변경: {state}")
+
+    def _put_market_update(self, market_data):
+        # 종목 구성이 바뀌었을 때만 전체 목록을, 평소에는 바뀐 값만 GUI로 보냄
+        delta = self.market_delta.update(market_data)
+        if delta['added'] or delta['removed']:
+            self.data_queue.put(("update_market", market_data))
+        elif delta['changed']:
+            self.data_queue.put(("update_market_delta", delta['changed']))
+
     def _fetch_market_data_worker(self):
         try:
-            all_tickers_krw = pyupbit.get_tickers(fiat="KRW")
-            url = f"https://api.upbit.com/v1/ticker?markets={','.join(all_tickers_krw)}"
-            response = requests.get(url)
-            response.raise_for_status()
-            market_data = response.json()
+            self._refresh_market_meta()
+            market_data = list(fetch_tickers(self.market_meta.tradable_markets()).values())
             if market_data:
-                self.data_queue.put(("update_market", market_data))
+                self._put_market_update(market_data)
         except Exception as e:
             print(f"❗️ KRW 마켓 목록 업데이트 중 오류: {e}")
     
@@ -1195,6 +1161,8 @@ class UpbitChartApp(tk.Tk):
             symbol = ticker.split('-')[1]
             self.buy_amount_symbol_label.config(text=symbol)
             self.sell_amount_symbol_label.config(text=symbol)
+            self.live_ticker = ticker
+            self._refresh_realtime_codes()
             
     def draw_base_chart(self, *args):
         display_name = self.selected_ticker_display.get()
@@ -1211,7 +1179,9 @@ class UpbitChartApp(tk.Tk):
 
     def _fetch_and_draw_chart(self, ticker, interval, display_name):
         try:
-            df = self.get_technical_indicators(ticker, interval=interval, count=200)
+            df = self.get_technical_indicators(ticker, interval=interval, count=200, key=(ticker, interval, 'chart'))
+            self.live_interval = interval
+            self.candle_builder.seed(ticker, interval, df)
             self.data_queue.put(("draw_chart", (df, interval, display_name)))
         except Exception as e:
             print(f"❗️ 차트 데이터 로딩 오류: {e}")
@@ -1228,10 +1198,22 @@ class UpbitChartApp(tk.Tk):
             self.master_df.loc[last_idx, 'high'] = price
         if price < self.master_df.loc[last_idx, 'low']:
             self.master_df.loc[last_idx, 'low'] = price
+        self._update_live_indicators()
 
         self.update_overlays() # 오버레이만 업데이트
         self.canvas.draw_idle()
 
+    def _update_live_indicators(self):
+        # 진행 중인 마지막 봉의 지표만 O(1)로 다시 계산해 반영
+        if not self.live_interval:
+            return
+        last_idx = self.master_df.index[-1]
+        values = self.indicator_engine.update_last((self.live_ticker, self.live_interval, 'chart'), last_idx,
+                                                 self.master_df.loc[last_idx])
+        if values:
+            for column, value in values.items():
+                self.master_df.at[last_idx, column] = value
+
     def _finalize_chart_drawing(self, df, interval, display_name):
         self.master_df = df
 
@@ -1282,9 +1264,9 @@ class UpbitChartApp(tk.Tk):
         
         if self.bb_var.get():
             bb_period = 20
-            middle = self.master_df['close'].rolling(window=bb_period).mean()
-            std = self.master_df['close'].rolling(window=bb_period).std()
-            bb_data_to_plot = {'upper': middle + (std * 2), 'middle': middle, 'lower': middle - (std * 2)}
+            middle, _, upper, lower = indicators.bollinger(self.master_df['close'], bb_period, 2)
+            bb_data_to_plot = {name: pd.Series(values, index=self.master_df.index)
+                               for name, values in (('upper', upper), ('middle', middle), ('lower', lower))}
         
         trade_plots = self.prepare_trade_history_plots(ticker, self.master_df)
         
@@ -1407,6 +1389,7 @@ class UpbitChartApp(tk.Tk):
             self.sell_percentage_var.set('')
         except (ValueError, TclError): pass
 
+    @upbit_http.with_priority(upbit_http.PRIORITY_ORDER)
     def place_order(self, side):
         display_name = self.selected_ticker_display.get()
         ticker = self.display_name_to_ticker.get(display_name, display_name)
@@ -1601,6 +1584,7 @@ class UpbitChartApp(tk.Tk):
         threading.Thread(target=self._fetch_older_data_worker, args=(ticker, interval, to_date, current_xlim), daemon=True).start()
 
     # <<<<< [핵심 수정] 과거 데이터 로딩 오류 해결 >>>>>
+    @upbit_http.with_priority(upbit_http.PRIORITY_BACKFILL)
     def _fetch_older_data_worker(self, ticker, interval, to_date, current_xlim):
             try:
                 # pyupbit의 to 파라미터는 해당 시점 '이전'까지 200개를 반환하므로, to_date에서 1초 빼기
@@ -1611,7 +1595,7 @@ class UpbitChartApp(tk.Tk):
                     to_date_str = to_date_str.strftime('%Y-%m-%d %H:%M:%S')
 
                 # 과거 데이터 요청 (최대 200개)
-                older_df_raw = pyupbit.get_ohlcv(ticker, interval=interval, count=200, to=to_date_str)
+                older_df_raw = candle_store.get_ohlcv_before(ticker, interval, to_date_str, count=200)
                 # 만약 데이터가 없거나 1개 이하만 반환되면, 더 이상 로드할 데이터가 없음
                 if older_df_raw is None or len(older_df_raw) < 2:
                     print("ℹ️ 더 이상 로드할 과거 데이터가 없습니다.")
@@ -1627,7 +1611,7 @@ class UpbitChartApp(tk.Tk):
                 combined_df_raw = combined_df_raw.sort_index()
 
                 # 지표 계산 최소 데이터 개수 완화 (신규상장 코인 대응)
-                df_with_indicators = self.get_technical_indicators_from_raw(combined_df_raw, min_length=2)
+                df_with_indicators = self.get_technical_indicators_from_raw(combined_df_raw, min_length=2, key=(ticker, interval, 'chart'))
                 # 기존 master_df보다 더 많은 데이터가 있으면 갱신
                 if df_with_indicators is not None and not df_with_indicators.empty:
                     num_candles_added = len(df_with_indicators) - len(self.master_df)
@@ -1770,26 +1754,62 @@ class UpbitChartApp(tk.Tk):
         self.buy_krw_balance_var.set(f"주문가능: {krw_balance:,.0f} KRW")
         self.sell_coin_balance_var.set(f"주문가능: {coin_balance:g} {coin_symbol}")
 
+    def _sorted_market_data(self):
+        sort_key_map = {'display_name': 'market', 'price': 'trade_price', 'change_rate': 'signed_change_rate', 'volume': 'acc_trade_price_24h'}
+        key_to_sort = sort_key_map.get(self.sort_column, 'acc_trade_price_24h')
+        return sorted(self.market_data, key=lambda x: x.get(key_to_sort, 0), reverse=not self.sort_ascending)
+
+    def _format_market_row(self, item):
+        ticker_name = item['market']; display_name = self.ticker_to_display_name.get(ticker_name, ticker_name)
+        price = item['trade_price']; change_rate = item['signed_change_rate'] * 100; volume = item['acc_trade_price_24h']
+        tag = 'red' if change_rate > 0 else 'blue' if change_rate < 0 else 'black'
+        price_str = f"{price:,.0f}" if price >= 100 else f"{price:g}"; change_rate_str = f"{change_rate:+.2f}%"; volume_str = self.format_trade_volume(volume)
+        return (display_name, price_str, change_rate_str, volume_str), (tag,)
+
     def _refresh_market_tree_gui(self):
         if not self.market_data: return
-        sort_key_map = { 'display_name': 'market', 'price': 'trade_price', 'change_rate': 'signed_change_rate', 'volume': 'acc_trade_price_24h' }
-        key_to_sort = sort_key_map.get(self.sort_column, 'acc_trade_price_24h')
-        sorted_data = sorted(self.market_data, key=lambda x: x[key_to_sort], reverse=not self.sort_ascending)
+        sorted_data = self._sorted_market_data()
         try:
             selected_id = self.market_tree.focus()
             selected_display_name = self.market_tree.item(selected_id, 'values')[0] if selected_id else None
             self.market_tree.delete(*self.market_tree.get_children()); new_selection_id = None
             for item in sorted_data:
-                ticker_name = item['market']; display_name = self.ticker_to_display_name.get(ticker_name, ticker_name)
-                price = item['trade_price']; change_rate = item['signed_change_rate'] * 100; volume = item['acc_trade_price_24h']
-                tag = 'red' if change_rate > 0 else 'blue' if change_rate < 0 else 'black'
-                price_str = f"{price:,.0f}" if price >= 100 else f"{price:g}"; change_rate_str = f"{change_rate:+.2f}%"; volume_str = self.format_trade_volume(volume)
-                item_id = self.market_tree.insert('', 'end', values=(display_name, price_str, change_rate_str, volume_str), tags=(tag,))
-                if display_name == selected_display_name: new_selection_id = item_id
+                values, tags = self._format_market_row(item)
+                item_id = self.market_tree.insert('', 'end', iid=item['market'], values=values, tags=tags)
+                if values[0] == selected_display_name: new_selection_id = item_id
             if new_selection_id:
                 self.market_tree.focus(new_selection_id); self.market_tree.selection_set(new_selection_id)
         except Exception: pass
 
+    def _apply_market_delta(self, changes):
+        # 값이 바뀐 종목의 바뀐 셀만 수정하고, 정렬 순서가 달라진 행만 이동
+        rows = {item['market']: item for item in self.market_data}
+        for market, fields in changes.items():
+            if market in rows: rows[market].update(fields)
+        try:
+            columns = self.market_tree['columns']
+            for market in changes:
+                if market not in rows or not self.market_tree.exists(market): continue
+                values, tags = self._format_market_row(rows[market])
+                current_values = self.market_tree.item(market, 'values')
+                for col, old, new in zip(columns, current_values, values):
+                    if str(old) != str(new): self.market_tree.set(market, col, new)
+                if tuple(self.market_tree.item(market, 'tags')) != tags: self.market_tree.item(market, tags=tags)
+            self._reorder_market_tree()
+        except Exception as e:
+            print(f"❗️ 마켓 목록 부분 갱신 오류: {e}")
+
+    def _reorder_market_tree(self):
+        order = [item['market'] for item in self._sorted_market_data()]
+        current = list(self.market_tree.get_children())
+        if current == order: return
+        for index, market in enumerate(order):
+            if index < len(current) and current[index] == market: continue
+            if not self.market_tree.exists(market): continue
+            self.market_tree.move(market, '', index)
+            if market in current: current.remove(market)
+            current.insert(index, market)
+
     def sort_market_list(self, col):
         if self.sort_column == col: self.sort_ascending = not self.sort_ascending
         else: self.sort_column = col; self.sort_ascending = False
@@ -1806,7 +1826,7 @@ class UpbitChartApp(tk.Tk):
         threading.Thread(target=self._load_my_tickers_worker, daemon=True).start()
 
     def _load_my_tickers_worker(self):
-        balances = upbit.get_balances()
+        balances = account_state.get_balances()
         my_tickers = [f"KRW-{b['currency']}" for b in balances if b['currency'] != 'KRW' and float(b.get('balance', 0)) > 0]
         
         all_display_names = sorted(list(self.display_name_to_ticker.keys()))
@@ -1858,6 +1878,8 @@ class UpbitChartApp(tk.Tk):
         """프로그램 종료 시 호출되는 함수"""
         # 필요시, 종료 전 저장할 작업이 있으면 여기에 추가
         self.is_running = False
+        self.realtime_feed.stop()
+        account_state.stop()
         if self.auto_trade_monitor is not None and self.auto_trade_monitor.winfo_exists():
             self.auto_trade_monitor.close()
         self.destroy()
@@ -1867,7 +1889,7 @@ class AutoTradeSettingsWindow(tk.Toplevel):
         super().__init__(master)
         self.master_app = master
         self.title("자동매매 시나리오 설정")
-        self.geometry("700x600")
+        self.geometry("700x680")
         self.resizable(False, False)
 
         self.vars = {
@@ -1881,6 +1903,7 @@ class AutoTradeSettingsWindow(tk.Toplevel):
             'strategy6': tk.BooleanVar(),
             'strategy7': tk.BooleanVar(),
             'strategy8': tk.BooleanVar(),
+            'fusion': tk.StringVar(),
         }
         self.setup_widgets()
         self.load_settings()
@@ -1895,19 +1918,15 @@ class AutoTradeSettingsWindow(tk.Toplevel):
             return
 
         try:
-            df_raw = pyupbit.get_ohlcv(ticker, interval='minute5', count=200)
+            df_raw = candle_store.get_ohlcv(ticker, interval='minute5', count=200)
             if df_raw is None or len(df_raw) < 30:
                 return
 
             # 기술적 지표 추가
-            df = self.master_app.get_technical_indicators_from_raw(df_raw)
+            df = self.master_app.get_technical_indicators_from_raw(df_raw, columns=SETTINGS_COLUMNS)
             if df is None or len(df) < 30:
                 return
 
-            close = df['close']
-            ma60 = close.rolling(window=60).mean()
-            ma20 = close.rolling(window=20).mean()
-            ma5 = close.rolling(window=5).mean()
             last = df.iloc[-1]
             prev = df.iloc[-2]
 
@@ -1916,16 +1935,12 @@ class AutoTradeSettingsWindow(tk.Toplevel):
                 self.vars[f'strategy{k}'].set(False)
 
             # 1. RSI+이동평균+거래량 (전략1) - 조건 완화
-            vol_ma10 = df['volume'].rolling(10).mean().iloc[-1]
+            vol_ma10 = indicators.sma(df['volume'], 10)[-1]
             if (last['rsi'] < 35 or last['ma5'] > last['ma20']) and last['volume'] > vol_ma10 * 1.5:
                 self.vars['strategy1'].set(True)
 
             # 2. 볼린저밴드+캔들패턴 (전략2) - 조건 완화
-            bb_period = 20
-            middle = close.rolling(window=bb_period).mean()
-            std = close.rolling(window=bb_period).std()
-            lower = middle + (std * -2)
-            if last['close'] < lower.iloc[-1] * 1.05 or last.get('pattern', '') == 'hammer':
+            if last['close'] < last['bb_lower'] * 1.05 or last.get('pattern', '') == 'hammer':
                 self.vars['strategy2'].set(True)
 
             # 3. MACD+트레일링스탑 (전략3) - 최근 3봉 중 1봉이라도 돌파
@@ -1974,6 +1989,13 @@ class AutoTradeSettingsWindow(tk.Toplevel):
         except Exception as e:
             print(e)
 
+    def on_fusion_selected(self, *args):
+        # 추천 조합을 고르면 해당 전략만 체크 (개별 실행은 현재 체크 유지)
+        strategies = FUSION_PRESETS.get(self.vars['fusion'].get(), {}).get('strategies')
+        if strategies:
+            for k in range(1, 9):
+                self.vars[f'strategy{k}'].set(f"전략{k}" in strategies)
+
     def setup_widgets(self):
         main_frame = ttk.Frame(self, padding=10)
         main_frame.pack(fill=tk.BOTH, expand=True)
@@ -2017,6 +2039,13 @@ class AutoTradeSettingsWindow(tk.Toplevel):
         cb8 = ttk.Checkbutton(strategy_frame, text="전략 8: CCI 돌파", variable=self.vars['strategy8'])
         cb8.pack(anchor='w', pady=2)
 
+        fusion_frame = ttk.LabelFrame(main_frame, text="[4] 신호 결합 (종목당 주문 1건)", padding=10)
+        fusion_frame.pack(fill=tk.X, pady=5)
+        ttk.Label(fusion_frame, text="추천 조합:").pack(side='left', padx=5)
+        fusion_combo = ttk.Combobox(fusion_frame, textvariable=self.vars['fusion'], values=list(FUSION_PRESETS), width=30, state="readonly")
+        fusion_combo.pack(side='left', padx=5)
+        fusion_combo.bind("<<ComboboxSelected>>", self.on_fusion_selected)
+
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(side="bottom", pady=(5, 0))
         ttk.Button(button_frame, text="저장", command=self.save_and_close, style="On.TButton").pack(side="left", padx=10, ipady=4)
@@ -2041,14 +2070,18 @@ class AutoTradeSettingsWindow(tk.Toplevel):
         self.vars['strategy6'].set(s.get('strategy6', False))
         self.vars['strategy7'].set(s.get('strategy7', False))
         self.vars['strategy8'].set(s.get('strategy8', False))
+        fusion = s.get('fusion')
+        self.vars['fusion'].set(fusion if fusion in FUSION_PRESETS else DEFAULT_PRESET)
 
     def save_and_close(self):
         try:
-            new = {}
-            # 선택된 종목 1개만 enabled_tickers에 저장
+            # 창에 없는 설정(auto_trade_settings.json에 직접 넣은 tick_trigger_pct 등)은 그대로 유지
+            new = dict(self.master_app.auto_trade_settings)
+            # 창에서는 첫 번째 종목만 바꾸고, 설정 파일에 추가로 넣어 둔 종목은 유지
             selected_display = self.vars['selected_ticker'].get()
             ticker = self.master_app.display_name_to_ticker.get(selected_display)
-            new['enabled_tickers'] = [ticker] if ticker else []
+            others = new.get('enabled_tickers', [])[1:]
+            new['enabled_tickers'] = list(dict.fromkeys(([ticker] if ticker else []) + others))
             new['investment_ratio'] = int(self.vars['investment_ratio'].get().replace('%', ''))
             # 아래처럼 bool()로 감싸서 저장
             new['strategy1'] = bool(self.vars['strategy1'].get())
@@ -2059,6 +2092,7 @@ class AutoTradeSettingsWindow(tk.Toplevel):
             new['strategy6'] = bool(self.vars['strategy6'].get())
             new['strategy7'] = bool(self.vars['strategy7'].get())
             new['strategy8'] = bool(self.vars['strategy8'].get())
+            new['fusion'] = self.vars['fusion'].get() or DEFAULT_PRESET
             # 미보유 코인 전체 자동매수 옵션은 제거
             new['is_unowned_buy_enabled'] = False
 
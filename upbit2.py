@@ -8,16 +8,34 @@ import mplfinance as mpf
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import threading
+import multiprocessing
 import time
 import platform
 import os
-import requests
 from queue import Queue, Empty
 import json
 from datetime import datetime, timedelta
-from scipy.signal import find_peaks
+from candle_store import CandleStore
+from timeframes import TimeframeStore
+from upbit_ws import UpbitRealtimeFeed
+from candle_builder import CandleBuilder
+import upbit_http
+from account_state import AccountState
+from indicator_engine import IndicatorEngine
+import indicators
+from indicator_columns import columns_of, ensure_columns
+from market_data import MarketMetadataCache, TickerDeltaTracker, fetch_tickers, has_changes
+from screener import MarketMatrix, StrategyScreener
+from signal_fusion import SignalFusion
+import strategy_rules
 from tkinter import filedialog
 
+# pyupbit 내부 요청까지 모두 전역 요청 스케줄러(그룹별 속도 제한, 우선순위)를 거치도록 설정
+upbit_http.install()
+
+# 차트에 필요한 지표 컬럼 (MA 오버레이 + 실시간으로 갱신되는 RSI/MACD) - 이 밖의 지표는 요청할 때만 계산
+CHART_COLUMNS = columns_of('trend')
+
 # -----------------------------------------------------------------------------
 # 한글 폰트 설정
 # -----------------------------------------------------------------------------
@@ -42,33 +60,43 @@ def select_login_file():
     root.destroy()
     return file_path
 
-login_file = select_login_file()
-if not login_file:
-    messagebox.showerror("로그인 파일 오류", "login.txt 파일을 선택하지 않았습니다. 프로그램을 종료합니다.")
-    exit()
-
-try:
-    with open(login_file, "r") as f:
-        lines = f.readlines()
-        if len(lines) < 3:
-            raise ValueError("파일에 access key, secret key, 자동매매 비밀번호가 모두 필요합니다.")
-        access = lines[0].strip()
-        secret = lines[1].strip()
-        trade_password = lines[2].strip()
-except FileNotFoundError:
-    messagebox.showerror("로그인 파일 오류", "login.txt 파일을 찾을 수 없습니다.\n선택한 파일을 확인해주세요.")
-    exit()
-except Exception as e:
-    messagebox.showerror("로그인 파일 오류", f"login.txt 파일 처리 중 오류가 발생했습니다.\n\n{e}")
-    exit()
-
-try:
-    upbit = pyupbit.Upbit(access, secret)
-    balances = upbit.get_balances()
-    print("✅ 업비트 로그인 성공")
-except Exception as e:
-    messagebox.showerror("로그인 실패", f"API 키가 유효하지 않거나 네트워크에 문제가 있습니다.\nlogin.txt 파일을 확인해주세요.\n\n{e}")
-    exit()
+# 스크리너 프로세스 풀 워커(spawn)는 이 파일을 '__mp_main__'으로 다시 불러오므로 로그인은 메인 프로세스에서만
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    login_file = select_login_file()
+    if not login_file:
+        messagebox.showerror("로그인 파일 오류", "login.txt 파일을 선택하지 않았습니다. 프로그램을 종료합니다.")
+        exit()
+
+    try:
+        with open(login_file, "r") as f:
+            lines = f.readlines()
+            if len(lines) < 3:
+                raise ValueError("파일에 access key, secret key, 자동매매 비밀번호가 모두 필요합니다.")
+            access = lines[0].strip()
+            secret = lines[1].strip()
+            trade_password = lines[2].strip()
+    except FileNotFoundError:
+        messagebox.showerror("로그인 파일 오류", "login.txt 파일을 찾을 수 없습니다.\n선택한 파일을 확인해주세요.")
+        exit()
+    except Exception as e:
+        messagebox.showerror("로그인 파일 오류", f"login.txt 파일 처리 중 오류가 발생했습니다.\n\n{e}")
+        exit()
+
+    try:
+        upbit = pyupbit.Upbit(access, secret)
+        balances = upbit.get_balances()
+        print("✅ 업비트 로그인 성공")
+    except Exception as e:
+        messagebox.showerror("로그인 실패", f"API 키가 유효하지 않거나 네트워크에 문제가 있습니다.\nlogin.txt 파일을 확인해주세요.\n\n{e}")
+        exit()
+
+    # 로컬 캔들 저장소 (candle_cache/ 폴더에 종목·주기별로 보관)
+    # minute3~240은 minute1, 주봉은 일봉을 묶어서 만들어 종목당 기본 주기 캔들만 조회
+    candle_store = TimeframeStore(CandleStore())
+
+    # 계좌 잔고 캐시 (모든 잔고 조회는 여기서 읽고, 타이머와 주문 직후에 갱신)
+    account_state = AccountState(upbit, balances=balances)
 
 # -----------------------------------------------------------------------------
 # 2. GUI 클래스 및 기능
@@ -88,7 +116,6 @@ class UpbitChartApp(tk.Tk):
         self.selected_interval = tk.StringVar(value='day')
         self.current_price = 0.0
         self.avg_buy_price = 0.0
-        self.balances_data = {}
         self.krw_balance = 0.0
         self.coin_balance = 0.0
         self.master_df = None
@@ -98,12 +125,28 @@ class UpbitChartApp(tk.Tk):
         self._ignore_market_select_event = False
         self.data_bounds = {'x': None, 'y': None}
         self.data_queue = Queue()
+        # 실시간 시세(WebSocket): 선택 종목 체결가를 받아 차트에 반영, 끊겨 있는 동안만 REST 폴링
+        # 체결(trade)로는 로컬 캔들을 만들어 새 봉을 이어 붙이고 지표 계산에도 사용
+        self.candle_builder = CandleBuilder()
+        self.indicator_engine = IndicatorEngine()  # (종목, 주기)별 증분 지표 (새 봉/마지막 봉만 다시 계산)
+        self.realtime_feed = UpbitRealtimeFeed(on_ticker=self._on_realtime_ticker,
+                                               on_trade=self.candle_builder.on_trade,
+                                               on_reconnect=self._on_realtime_reconnect)
+        self.live_ticker = None
+        self.live_interval = None
+        self._live_price = None
+        self._live_price_pending = False
 
         self.ma_vars = {'5': tk.BooleanVar(value=True), '20': tk.BooleanVar(value=True), '60': tk.BooleanVar(), '120': tk.BooleanVar()}
         self.bb_var = tk.BooleanVar(value=True)
         self.is_panning = False
         self.pan_start_pos = None
 
+        self.market_meta = MarketMetadataCache()  # 마켓 목록/유의·정지 상태 (스냅샷 + 느린 주기 갱신)
+        self.market_delta = TickerDeltaTracker()   # 직전 시세 대비 바뀐 값만 GUI로 전달
+        self.market_screener = MarketMatrix()      # KRW 마켓 전체 (종목 x 시간) 지표 매트릭스
+        self._screener_seeding = False
+        self.strategy_screener = StrategyScreener()  # 전략 규칙을 전체 종목에 평가 (프로세스 풀)
         self.ticker_to_display_name = {}
         self.display_name_to_ticker = {}
         self.market_data = []
@@ -134,6 +177,12 @@ class UpbitChartApp(tk.Tk):
         self.load_my_tickers()
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
 
+    @property
+    def balances_data(self):
+        # 보유 코인 잔고 {'KRW-BTC': {...}} - 잔고 캐시(account_state)의 마지막 값 (GUI에서 읽으므로 REST 조회 없음,
+        # 갱신은 타이머/주문 스레드가 담당). 주문 판단에는 account_state.balances_by_market()을 사용
+        return account_state.cached_by_market()
+
     def load_auto_trade_settings(self):
         try:
             with open("auto_trade_settings.json", "r", encoding="utf-8") as f:
@@ -156,6 +205,8 @@ class UpbitChartApp(tk.Tk):
         백그라운드 작업을 처리할 장기 실행 워커 스레드를 시작합니다.
         반복적인 스레드 생성을 피해 시스템 부하를 줄입니다.
         """
+        account_state.start()
+        self.realtime_feed.start()
         data_worker = threading.Thread(target=self.data_update_worker, daemon=True)
         data_worker.start()
         self.process_queue()
@@ -166,22 +217,24 @@ class UpbitChartApp(tk.Tk):
         """
         counter = 0
         while self.is_running:
-            self.fetch_current_price() # 매초 현재가 업데이트
+            if not self.realtime_feed.is_connected:
+                self.fetch_current_price() # 매초 현재가 업데이트
             if counter % 5 == 0: self._fetch_portfolio_data_worker() # 5초마다 포트폴리오
             if counter % 10 == 0: self._fetch_market_data_worker() # 10초마다 마켓
             time.sleep(1)
             counter += 1
 
+    def _add_ticker_name(self, market_info):
+        market, korean_name, symbol = market_info['market'], market_info['korean_name'], market_info['market'].split('-')[1]
+        display_name = f"{korean_name}({symbol})"
+        self.ticker_to_display_name[market], self.display_name_to_ticker[display_name] = display_name, market
+
     def load_ticker_names(self):
         print("🔍 종목 이름 정보를 로드합니다...")
         try:
-            url = "https://api.upbit.com/v1/market/all?isDetails=true"
-            response = requests.get(url); response.raise_for_status()
-            for market_info in response.json():
-                if market_info['market'].startswith('KRW-'):
-                    market, korean_name, symbol = market_info['market'], market_info['korean_name'], market_info['market'].split('-')[1]
-                    display_name = f"{korean_name}({symbol})"
-                    self.ticker_to_display_name[market], self.display_name_to_ticker[display_name] = display_name, market
+            # 스냅샷이 있으면 네트워크 없이 바로 사용 (최신 목록은 마켓 워커가 갱신)
+            if not self.market_meta.markets: self.market_meta.refresh()
+            for market_info in self.market_meta.markets.values(): self._add_ticker_name(market_info)
             print("✅ 종목 이름 정보 로드 완료.")
         except Exception as e: print(f"❗️ 종목 이름 정보 로드 실패: {e}\n종목 코드를 그대로 사용합니다.")
 
@@ -344,42 +397,24 @@ class UpbitChartApp(tk.Tk):
             time.sleep(10)
         self.log_auto_trade("자동매매 스레드가 종료되었습니다.")
 
-    def get_technical_indicators(self, ticker, interval='day', count=200):
+    def get_technical_indicators(self, ticker, interval='day', count=200, key=None, columns=CHART_COLUMNS):
         try:
-            df = pyupbit.get_ohlcv(ticker, interval=interval, count=count)
-            return self.get_technical_indicators_from_raw(df)
+            # 실시간 체결로 만든 캔들이 충분하면 REST 조회 없이 사용
+            df = self.candle_builder.get_frame(ticker, interval, count) if self.realtime_feed.is_connected else None
+            if df is None:
+                df = candle_store.get_ohlcv(ticker, interval=interval, count=count)
+                if ticker in self.realtime_feed.codes:
+                    self.candle_builder.seed(ticker, interval, df)
+            return self.get_technical_indicators_from_raw(df, key=key or (ticker, interval, count), columns=columns)
         except Exception as e:
             print(f"❗️ {ticker} 지표 계산 오류: {e}")
             return None
 
-    def get_technical_indicators_from_raw(self, df, min_length=2):
+    def get_technical_indicators_from_raw(self, df, min_length=2, key=None, columns=CHART_COLUMNS):
         if df is None or len(df) < min_length: return None
-        for p in [5, 20, 60, 120]: df[f'ma{p}'] = df['close'].rolling(window=p, min_periods=1).mean()
-        delta = df['close'].diff(1); gain = (delta.where(delta > 0, 0)).rolling(window=14, min_periods=1).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14, min_periods=1).mean()
-        rs = gain / loss.replace(0, np.nan); df['rsi'] = 100 - (100 / (1 + rs))
-        df['ema12'] = df['close'].ewm(span=12, adjust=False, min_periods=1).mean()
-        df['ema26'] = df['close'].ewm(span=26, adjust=False, min_periods=1).mean()
-        df['macd'] = df['ema12'] - df['ema26']; df['signal'] = df['macd'].ewm(span=9, adjust=False, min_periods=1).mean()
-        try:
-            rsi_peaks, _ = find_peaks(df['rsi'].fillna(0), distance=5, width=1)
-            rsi_troughs, _ = find_peaks(-df['rsi'].fillna(0), distance=5, width=1)
-        except Exception: rsi_peaks, rsi_troughs = [], []
-        df['bearish_div'] = self._check_divergence_static(df, rsi_peaks, 'bearish')
-        df['bullish_div'] = self._check_divergence_static(df, rsi_troughs, 'bullish')
-        return df
-
-    @staticmethod
-    def _check_divergence_static(df, peaks, div_type):
-        if len(peaks) < 2: return [False] * len(df)
-        result = [False] * len(df)
-        for i in range(1, len(peaks)):
-            idx1, idx2 = peaks[i-1], peaks[i]
-            if div_type == 'bearish':
-                if df['rsi'].iloc[idx2] < df['rsi'].iloc[idx1] and df['high'].iloc[idx2] > df['high'].iloc[idx1]: result[idx2] = True
-            elif div_type == 'bullish':
-                if df['rsi'].iloc[idx2] > df['rsi'].iloc[idx1] and df['low'].iloc[idx2] < df['low'].iloc[idx1]: result[idx2] = True
-        return result
+        # columns(와 의존 컬럼)만 계산 - MA/RSI/MACD는 key(종목, 주기, 용도)를 주면 새 봉/마지막 봉만 계산
+        # (bearish_div, bullish_div, div_rsi_*, div_macd_hist_* 등 다이버전스는 요청할 때만)
+        return ensure_columns(df, columns, engine=self.indicator_engine, key=key)
 
     def create_buy_sell_tab(self, parent_frame, side):
         is_buy = (side == "buy")
@@ -434,6 +469,9 @@ class UpbitChartApp(tk.Tk):
             elif task_name == "update_market":
                 self.market_data = data; self._refresh_market_tree_gui()
             elif task_name == "update_live_candle": self._update_live_data(data)
+            elif task_name == "update_live_price": self._apply_live_price()
+            elif task_name == "update_market_meta": self._apply_market_meta_diff(data)
+            elif task_name == "update_market_delta": self._apply_market_delta(data)
             elif task_name == "draw_chart": self._finalize_chart_drawing(*data)
             elif task_name == "draw_older_chart": self._update_chart_after_loading(*data)
         except Empty:
@@ -442,6 +480,58 @@ class UpbitChartApp(tk.Tk):
             if self.is_running:
                 self.after(100, self.process_queue)
 
+    def _on_realtime_ticker(self, msg):
+        # WebSocket 스레드에서 호출됨: 최신가만 보관하고 큐에는 처리 대기 중인 항목이 없을 때만 넣음
+        if msg.get('code') != self.live_ticker:
+            return
+        self._live_price = (msg['code'], msg['trade_price'])
+        if not self._live_price_pending:
+            self._live_price_pending = True
+            self.data_queue.put(("update_live_price", None))
+
+    def _apply_live_price(self):
+        self._live_price_pending = False
+        if self._live_price and self._live_price[0] == self.live_ticker:
+            self._roll_live_candle()
+            self._update_live_data(self._live_price[1])
+
+    def _roll_live_candle(self):
+        # 체결로 만든 새 봉이 생겼으면 차트에 이어 붙이고 지표를 다시 계산 (같은 봉이면 거래량만 맞춤)
+        if self.master_df is None or self.master_df.empty or not self.live_interval:
+            return
+        new_rows = self.candle_builder.get_since(self.live_ticker, self.live_interval, self.master_df.index[-1])
+        if new_rows is None or new_rows.empty:
+            return
+        if len(new_rows) == 1:
+            self.master_df.loc[self.master_df.index[-1], 'volume'] = new_rows['volume'].iloc[-1]
+            return
+        cols = ['open', 'high', 'low', 'close', 'volume']
+        ohlcv = self.master_df[cols]
+        combined = pd.concat([ohlcv[ohlcv.index < new_rows.index[0]], new_rows[cols]])
+        df = self.get_technical_indicators_from_raw(combined, key=(self.live_ticker, self.live_interval, 'chart'))
+        if df is None:
+            return
+        num_added = len(df) - len(self.master_df)
+        x0, x1 = self.ax.get_xlim()
+        is_following = x1 >= len(self.master_df) - 1  # 최신 봉을 보고 있었으면 뷰도 같이 이동
+        self._keep_view = True
+        self._finalize_chart_drawing(df, self.live_interval, self.selected_ticker_display.get())
+        if is_following and num_added > 0:
+            self.ax.set_xlim(x0 + num_added, x1 + num_added)
+            self.canvas.draw_idle()
+
+    def _on_realtime_reconnect(self):
+        # 끊긴 동안 놓친 체결이 있으므로 로컬 캔들을 버리고 차트 종목은 REST로 다시 맞춤
+        self.candle_builder.clear()
+        if self.live_ticker and self.live_interval:
+            threading.Thread(target=self._reseed_live_candles, args=(self.live_ticker, self.live_interval), daemon=True).start()
+
+    def _reseed_live_candles(self, ticker, interval):
+        try:
+            self.candle_builder.seed(ticker, interval, candle_store.get_ohlcv(ticker, interval=interval, count=200))
+        except Exception as e:
+            print(f"❗️ 실시간 캔들 재설정 오류: {e}")
+
     def fetch_current_price(self):
         display_name = self.selected_ticker_display.get()
         ticker = self.display_name_to_ticker.get(display_name)
@@ -453,8 +543,7 @@ class UpbitChartApp(tk.Tk):
 
     def _fetch_portfolio_data_worker(self):
         try:
-            balances = upbit.get_balances()
-            self.balances_data = {f"KRW-{b['currency']}": b for b in balances if b['currency'] != 'KRW'}
+            balances = account_state.get_balances()
             krw_balance = next((float(b['balance']) for b in balances if b['currency'] == 'KRW'), 0.0)
             krw_balances_data = {f"KRW-{b['currency']}": b for b in balances if b['currency'] != 'KRW' and float(b.get('balance', 0)) > 0}
             display_name = self.selected_ticker_display.get()
@@ -480,15 +569,99 @@ class UpbitChartApp(tk.Tk):
             self.data_queue.put(("update_portfolio", result_data))
         except Exception as e: print(f"❗️ 포트폴리오 업데이트 오류: {e}")
 
+    def _refresh_market_meta(self):
+        # 마켓 목록은 느린 주기로만 갱신하고, 바뀐 것(diff)이 있을 때만 GUI/자동매매에 알림
+        if not self.market_meta.needs_refresh():
+            return
+        try:
+            diff = self.market_meta.refresh()
+        except Exception as e:
+            print(f"❗️ 마켓 정보 갱신 실패 (이전 목록 사용): {e}")
+            return
+        if has_changes(diff):
+            self.data_queue.put(("update_market_meta", diff))
+
+    def _apply_market_meta_diff(self, diff):
+        for market in diff['listed']:
+            market_info = self.market_meta.markets.get(market)
+            if market_info:
+                self._add_ticker_name(market_info)
+            print(f"🆕 신규 상장: {self.ticker_to_display_name.get(market, market)}")
+        for market in diff['delisted']:
+            print(f"⛔ 거래지원 종료: {self.ticker_to_display_name.get(market, market)}")
+        for market, old, new in diff['warning_changed']:
+            print(f"⚠️ 유의/정지 상태 변경: {self.ticker_to_display_name.get(market, market)} ({old} → {new})")
+        enabled_tickers = set(self.auto_trade_settings.get('enabled_tickers', []))
+        changed = set(diff['delisted']) | {market for market, _, _ in diff['warning_changed']}
+        for market in sorted(enabled_tickers & changed):
+            state = "거래정지" if self.market_meta.is_suspended(market) else self.market_meta.markets.get(market, {}).get('market_warning', 'NONE')
+            self.log_auto_trade(f"⚠️ 자동매매 대상 {self.ticker_to_display_name.get(market, market)} 상태 변경: {state}")
+
+    def _put_market_update(self, market_data):
+        # 종목 구성이 바뀌었을 때만 전체 목록을, 평소에는 바뀐 값만 GUI로 보냄
+        delta = self.market_delta.update(market_data)
+        if delta['added'] or delta['removed']:
+            self.data_queue.put(("update_market", market_data))
+        elif delta['changed']:
+            self.data_queue.put(("update_market_delta", delta['changed']))
+
     def _fetch_market_data_worker(self):
         try:
-            all_tickers_krw = pyupbit.get_tickers(fiat="KRW")
-            url = f"https://api.upbit.com/v1/ticker?markets={','.join(all_tickers_krw)}"
-            response = requests.get(url); response.raise_for_status()
-            market_data = response.json()
-            if market_data: self.data_queue.put(("update_market", market_data))
+            self._refresh_market_meta()
+            market_data = list(fetch_tickers(self.market_meta.tradable_markets()).values())
+            if market_data:
+                self._put_market_update(market_data)
+                self._update_market_screener(market_data)
         except Exception as e: print(f"❗️ KRW 마켓 목록 업데이트 중 오류: {e}")
 
+    def _update_market_screener(self, tickers):
+        # 전체 종목 스크리너: 현재가 스냅샷으로 진행 중인 봉을 갱신하고, 아직 캔들이 없는 종목은 백그라운드로 채움
+        self.market_screener.update_tickers(tickers)
+        missing = self.market_screener.missing([item['market'] for item in tickers])
+        if missing and not self._screener_seeding:
+            self._screener_seeding = True
+            threading.Thread(target=self._seed_market_screener, args=(missing,), daemon=True).start()
+
+    @upbit_http.with_priority(upbit_http.PRIORITY_BACKFILL)
+    def _seed_market_screener(self, markets, batch_size=20):
+        try:
+            for i in range(0, len(markets), batch_size):
+                if not self.is_running: break
+                frames = {}
+                for market in markets[i:i + batch_size]:
+                    try:
+                        # 스크리너 주기 캔들을 직접 조회 (기본 주기로 묶지 않고 종목당 요청 1회)
+                        frames[market] = candle_store.store.get_ohlcv(market, interval=self.market_screener.interval,
+                                                                      count=self.market_screener.window)
+                    except Exception as e:
+                        print(f"❗️ {market} 스크리너 캔들 조회 실패: {e}")
+                self.market_screener.seed(frames)
+            print(f"✅ 스크리너 캔들 채우기 완료 ({len(self.market_screener.markets)}개 종목)")
+        finally:
+            self._screener_seeding = False
+
+    def screener_top_tickers(self, count=10):
+        """스크리너 점수 상위 종목 (거래정지 제외). 아직 채워진 종목이 count개 미만이면 None."""
+        table = self.market_screener.screen()
+        markets = [m for m in table['market'] if not self.market_meta.is_suspended(m)]
+        return markets[:count] if len(markets) >= count else None
+
+    def strategy_signal_tickers(self):
+        """
+        지금 매수 신호가 난 종목 [(market, reason)] (거래정지 제외). 스크리너 캔들이 아직 없으면 None.
+        전략 규칙(전략1~8)을 스크리너 주기(minute5) 캔들에서 하나라도 신호가 나는지 봅니다. 결과를 기다리는 동안 블록되므로
+        백그라운드 스레드에서 호출합니다.
+        """
+        markets, data = self.market_screener.snapshot()
+        if not markets:
+            return None
+        fusion = SignalFusion.from_settings(self.auto_trade_settings)
+        if not fusion.strategies:
+            fusion = SignalFusion(list(strategy_rules.STRATEGY_RULES))
+        table = self.strategy_screener.scan(markets, data, fusion)
+        return [(market, reason) for market, reason in zip(table['market'], table['reason'])
+                if not self.market_meta.is_suspended(market)]
+
     def on_ticker_select(self, event=None):
         self.draw_base_chart()
         self._update_order_ui_state()
@@ -497,6 +670,9 @@ class UpbitChartApp(tk.Tk):
         if ticker:
             symbol = ticker.split('-')[1]
             self.buy_amount_symbol_label.config(text=symbol); self.sell_amount_symbol_label.config(text=symbol)
+            self.live_ticker = ticker
+            self.realtime_feed.set_codes([ticker])
+            self.candle_builder.retain([ticker])
 
     def draw_base_chart(self, *args, keep_current_view=False):
         display_name = self.selected_ticker_display.get()
@@ -514,10 +690,23 @@ class UpbitChartApp(tk.Tk):
 
     def _fetch_and_draw_chart(self, ticker, interval, display_name):
         try:
-            df = self.get_technical_indicators(ticker, interval=interval, count=200)
+            df = self.get_technical_indicators(ticker, interval=interval, count=200, key=(ticker, interval, 'chart'))
+            self.live_interval = interval
+            self.candle_builder.seed(ticker, interval, df)
             self.data_queue.put(("draw_chart", (df, interval, display_name)))
         except Exception as e: print(f"❗️ 차트 데이터 로딩 오류: {e}")
 
+    def _update_live_indicators(self):
+        # 진행 중인 마지막 봉의 지표만 O(1)로 다시 계산해 반영
+        if not self.live_interval:
+            return
+        last_idx = self.master_df.index[-1]
+        values = self.indicator_engine.update_last((self.live_ticker, self.live_interval, 'chart'), last_idx,
+                                                 self.master_df.loc[last_idx])
+        if values:
+            for column, value in values.items():
+                self.master_df.at[last_idx, column] = value
+
     def _update_live_data(self, price):
         if self.master_df is None or self.master_df.empty: return
         self.current_price = price
@@ -525,6 +714,7 @@ class UpbitChartApp(tk.Tk):
         self.master_df.loc[last_idx, 'close'] = price
         if price > self.master_df.loc[last_idx, 'high']: self.master_df.loc[last_idx, 'high'] = price
         if price < self.master_df.loc[last_idx, 'low']: self.master_df.loc[last_idx, 'low'] = price
+        self._update_live_indicators()
         
         current_time = time.time()
         # 1.5초 -> 3.0초로 변경하여 CPU 사용량 감소
@@ -577,9 +767,8 @@ class UpbitChartApp(tk.Tk):
         for period, var in self.ma_vars.items():
             if var.get() and f'ma{period}' in self.master_df.columns: ma_data_to_plot[period] = self.master_df[f'ma{period}']
         if self.bb_var.get():
-            bb_period = 20; middle = self.master_df['close'].rolling(window=bb_period).mean()
-            std = self.master_df['close'].rolling(window=bb_period).std()
-            bb_data_to_plot = {'upper': middle + (std * 2), 'middle': middle, 'lower': middle - (std * 2)}
+            bb_period = 20; middle, _, upper, lower = indicators.bollinger(self.master_df['close'], bb_period, 2)
+            bb_data_to_plot = {name: pd.Series(values, index=self.master_df.index) for name, values in (('upper', upper), ('middle', middle), ('lower', lower))}
         current_interval = self.selected_interval.get()
         dt_format = '%m-%d %H:%M' if current_interval not in ['day', 'week'] else '%Y-%m-%d'
         
@@ -682,6 +871,7 @@ class UpbitChartApp(tk.Tk):
             self.sell_percentage_var.set('')
         except (ValueError, TclError) as e: print(f"매도 비율 계산 중 오류: {e}")
 
+    @upbit_http.with_priority(upbit_http.PRIORITY_ORDER)
     def place_order(self, side):
         display_name = self.selected_ticker_display.get()
         ticker = self.display_name_to_ticker.get(display_name, display_name)
@@ -707,7 +897,7 @@ class UpbitChartApp(tk.Tk):
                     if not user_amount_str: raise ValueError("시장가 매도 시 주문 수량(COIN)을 입력해야 합니다.")
                     user_amount = float(user_amount_str)
                     if user_amount <= 0: raise ValueError("주문 수량은 0보다 커야 합니다.")
-                    sellable_balance, current_price = upbit.get_balance(ticker), pyupbit.get_current_price(ticker)
+                    sellable_balance, current_price = account_state.balance(ticker), pyupbit.get_current_price(ticker)
                     amount_to_sell = min(user_amount, sellable_balance)
                     if current_price and (amount_to_sell * current_price < 5000): raise ValueError(f"주문 금액이 최소 기준(5,000원) 미만입니다.\n(예상 주문액: {amount_to_sell * current_price:,.0f}원)")
                     if amount_to_sell <= 0: raise ValueError("매도 가능한 코인 수량이 없습니다.")
@@ -826,16 +1016,17 @@ class UpbitChartApp(tk.Tk):
         ticker, interval, to_date, current_xlim = self.display_name_to_ticker.get(display_name), self.selected_interval.get(), self.master_df.index[0], self.ax.get_xlim()
         threading.Thread(target=self._fetch_older_data_worker, args=(ticker, interval, to_date, current_xlim), daemon=True).start()
 
+    @upbit_http.with_priority(upbit_http.PRIORITY_BACKFILL)
     def _fetch_older_data_worker(self, ticker, interval, to_date, current_xlim):
         try:
             to_date_str = (pd.to_datetime(to_date) - timedelta(seconds=1)).strftime('%Y-%m-%d %H:%M:%S')
-            older_df_raw = pyupbit.get_ohlcv(ticker, interval=interval, count=200, to=to_date_str)
+            older_df_raw = candle_store.get_ohlcv_before(ticker, interval, to_date_str, count=200)
             if older_df_raw is None or len(older_df_raw) < 2:
                 print("ℹ️ 더 이상 로드할 과거 데이터가 없습니다."); self.is_loading_older = False; return
             current_ohlcv = self.master_df[['open', 'high', 'low', 'close', 'volume']]
             combined_df_raw = pd.concat([older_df_raw, current_ohlcv])
             combined_df_raw = combined_df_raw[~combined_df_raw.index.duplicated(keep='last')].sort_index()
-            df_with_indicators = self.get_technical_indicators_from_raw(combined_df_raw, min_length=2)
+            df_with_indicators = self.get_technical_indicators_from_raw(combined_df_raw, min_length=2, key=(ticker, interval, 'chart'))
             
             if df_with_indicators is not None and not df_with_indicators.empty:
                 if len(df_with_indicators) > self.MAX_CANDLES:
@@ -904,25 +1095,62 @@ class UpbitChartApp(tk.Tk):
         self.pie_fig.tight_layout(); self.pie_canvas.draw()
         self.buy_krw_balance_var.set(f"주문가능: {krw_balance:,.0f} KRW"); self.sell_coin_balance_var.set(f"주문가능: {coin_balance:g} {coin_symbol}")
 
-    def _refresh_market_tree_gui(self):
-        if not self.market_data: return
+    def _sorted_market_data(self):
         sort_key_map = {'display_name': 'market', 'price': 'trade_price', 'change_rate': 'signed_change_rate', 'volume': 'acc_trade_price_24h'}
         key_to_sort = sort_key_map.get(self.sort_column, 'acc_trade_price_24h')
-        sorted_data = sorted(self.market_data, key=lambda x: x.get(key_to_sort, 0), reverse=not self.sort_ascending)
+        return sorted(self.market_data, key=lambda x: x.get(key_to_sort, 0), reverse=not self.sort_ascending)
+
+    def _format_market_row(self, item):
+        ticker_name = item['market']; display_name = self.ticker_to_display_name.get(ticker_name, ticker_name)
+        price = item['trade_price']; change_rate = item['signed_change_rate'] * 100; volume = item['acc_trade_price_24h']
+        tag = 'red' if change_rate > 0 else 'blue' if change_rate < 0 else 'black'
+        price_str = f"{price:,.0f}" if price >= 100 else f"{price:g}"; change_rate_str = f"{change_rate:+.2f}%"; volume_str = self.format_trade_volume(volume)
+        return (display_name, price_str, change_rate_str, volume_str), (tag,)
+
+    def _refresh_market_tree_gui(self):
+        if not self.market_data: return
+        sorted_data = self._sorted_market_data()
         try:
             selected_id = self.market_tree.focus()
             selected_display_name = self.market_tree.item(selected_id, 'values')[0] if selected_id else None
             self.market_tree.delete(*self.market_tree.get_children()); new_selection_id = None
             for item in sorted_data:
-                ticker_name, display_name = item['market'], self.ticker_to_display_name.get(item['market'], item['market'])
-                price, change_rate, volume = item['trade_price'], item['signed_change_rate'] * 100, item['acc_trade_price_24h']
-                tag = 'red' if change_rate > 0 else 'blue' if change_rate < 0 else 'black'
-                price_str, change_rate_str, volume_str = f"{price:,.0f}" if price >= 100 else f"{price:g}", f"{change_rate:+.2f}%", self.format_trade_volume(volume)
-                item_id = self.market_tree.insert('', 'end', values=(display_name, price_str, change_rate_str, volume_str), tags=(tag,))
-                if display_name == selected_display_name: new_selection_id = item_id
-            if new_selection_id: self.market_tree.focus(new_selection_id); self.market_tree.selection_set(new_selection_id)
+                values, tags = self._format_market_row(item)
+                item_id = self.market_tree.insert('', 'end', iid=item['market'], values=values, tags=tags)
+                if values[0] == selected_display_name: new_selection_id = item_id
+            if new_selection_id:
+                self.market_tree.focus(new_selection_id); self.market_tree.selection_set(new_selection_id)
         except Exception: pass
 
+    def _apply_market_delta(self, changes):
+        # 값이 바뀐 종목의 바뀐 셀만 수정하고, 정렬 순서가 달라진 행만 이동
+        rows = {item['market']: item for item in self.market_data}
+        for market, fields in changes.items():
+            if market in rows: rows[market].update(fields)
+        try:
+            columns = self.market_tree['columns']
+            for market in changes:
+                if market not in rows or not self.market_tree.exists(market): continue
+                values, tags = self._format_market_row(rows[market])
+                current_values = self.market_tree.item(market, 'values')
+                for col, old, new in zip(columns, current_values, values):
+                    if str(old) != str(new): self.market_tree.set(market, col, new)
+                if tuple(self.market_tree.item(market, 'tags')) != tags: self.market_tree.item(market, tags=tags)
+            self._reorder_market_tree()
+        except Exception as e:
+            print(f"❗️ 마켓 목록 부분 갱신 오류: {e}")
+
+    def _reorder_market_tree(self):
+        order = [item['market'] for item in self._sorted_market_data()]
+        current = list(self.market_tree.get_children())
+        if current == order: return
+        for index, market in enumerate(order):
+            if index < len(current) and current[index] == market: continue
+            if not self.market_tree.exists(market): continue
+            self.market_tree.move(market, '', index)
+            if market in current: current.remove(market)
+            current.insert(index, market)
+
     def sort_market_list(self, col):
         if self.sort_column == col: self.sort_ascending = not self.sort_ascending
         else: self.sort_column, self.sort_ascending = col, False
@@ -938,7 +1166,7 @@ class UpbitChartApp(tk.Tk):
         threading.Thread(target=self._load_my_tickers_worker, daemon=True).start()
 
     def _load_my_tickers_worker(self):
-        balances = upbit.get_balances()
+        balances = account_state.get_balances()
         my_tickers = [f"KRW-{b['currency']}" for b in balances if b['currency'] != 'KRW' and float(b.get('balance', 0)) > 0]
         all_display_names = sorted(list(self.display_name_to_ticker.keys()))
         self.after(0, lambda: self.ticker_combobox.config(values=all_display_names))
@@ -951,26 +1179,36 @@ class UpbitChartApp(tk.Tk):
 
     def on_closing(self):
         self.is_running = False
+        self.realtime_feed.stop()
+        self.strategy_screener.shutdown()
+        account_state.stop()
         time.sleep(1.1) # 워커 스레드가 루프를 마치고 종료될 시간을 줍니다.
         if self.settings_window and self.settings_window.winfo_exists():
             self.settings_window.destroy()
         self.destroy()
 
 class AutoTradeSettingsWindow(tk.Toplevel):
+    SIGNAL_REFRESH_SEC = 10   # 전략 신호 종목 모드의 재스캔 간격
+
     def __init__(self, master):
         super().__init__(master)
         self.master_app = master
         self.title("자동매매 설정")
-        self.geometry("400x450")
+        self.geometry("400x480")
         self.resizable(False, False)
         self.vars = {'investment_amount': tk.StringVar(), 'max_additional_buys': tk.StringVar()}
+        self.listed_markets = []        # 리스트박스 행 순서대로의 종목 코드
+        self.signal_mode = tk.BooleanVar(value=False)
+        self._signal_on = False
+        self._signal_wake = threading.Event()
+        self._signal_thread = None
         self.setup_widgets()
         self.load_settings()
 
     def setup_widgets(self):
         main_frame = ttk.Frame(self, padding=10)
         main_frame.pack(fill=tk.BOTH, expand=True)
-        tickers_frame = ttk.LabelFrame(main_frame, text="[1] 자동매매 대상 종목 (거래대금 상위 10개, 단일 선택)", padding=10)
+        tickers_frame = ttk.LabelFrame(main_frame, text="[1] 자동매매 대상 종목 (스크리너 상위 10개, 단일 선택)", padding=10)
         tickers_frame.pack(fill=tk.BOTH, expand=True, pady=5)
         list_frame = ttk.Frame(tickers_frame)
         list_frame.pack(fill=tk.BOTH, expand=True)
@@ -980,6 +1218,8 @@ class AutoTradeSettingsWindow(tk.Toplevel):
         self.ticker_listbox.config(yscrollcommand=scrollbar.set); scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         refresh_button = ttk.Button(tickers_frame, text="목록 새로고침", command=self.populate_top_tickers)
         refresh_button.pack(pady=(5,0), fill='x')
+        ttk.Checkbutton(tickers_frame, text="전략 신호 종목만 보기 (실시간 갱신)", variable=self.signal_mode,
+                        command=self.on_signal_mode_toggled).pack(anchor='w', pady=(5,0))
         options_frame = ttk.LabelFrame(main_frame, text="[2] 설정 금액", padding=10)
         options_frame.pack(fill=tk.X, pady=5)
         ttk.Label(options_frame, text="1회 매수 금액 (원):").pack(side=tk.LEFT, padx=5)
@@ -997,45 +1237,97 @@ class AutoTradeSettingsWindow(tk.Toplevel):
         ttk.Button(button_frame, text="닫기", command=self.destroy).pack(side=tk.RIGHT)
 
     def populate_top_tickers(self):
+        if self._signal_on:
+            self._signal_wake.set(); return   # 전략 신호 모드에서는 바로 다시 스캔
         self.ticker_listbox.delete(0, END)
+        self.listed_markets = []
         market_data = self.master_app.market_data
         if not market_data:
             messagebox.showwarning("데이터 없음", "아직 마켓 데이터가 로드되지 않았습니다.\n잠시 후 다시 시도해주세요.", parent=self)
             return
         try:
-            top_10 = sorted(market_data, key=lambda x: x.get('acc_trade_price_24h', 0), reverse=True)[:10]
-            for item in top_10:
-                display_name = self.master_app.ticker_to_display_name.get(item['market'], item['market'])
+            # 스크리너 점수 상위 10개 (스크리너 캔들을 채우는 중이면 거래대금 상위 10개)
+            top_10 = self.master_app.screener_top_tickers(10)
+            source = "스크리너 점수"
+            if top_10 is None:
+                top_10 = [item['market'] for item in sorted(market_data, key=lambda x: x.get('acc_trade_price_24h', 0), reverse=True)[:10]]
+                source = "거래대금"
+            for market in top_10:
+                display_name = self.master_app.ticker_to_display_name.get(market, market)
                 self.ticker_listbox.insert(END, display_name)
+            self.listed_markets = list(top_10)
             self.restore_selection()
-            print("✅ 거래대금 상위 10개 종목을 리스트에 업데이트했습니다.")
+            print(f"✅ {source} 상위 10개 종목을 리스트에 업데이트했습니다.")
         except Exception as e: messagebox.showerror("오류", f"종목 목록을 불러오는 중 오류가 발생했습니다:\n{e}", parent=self)
 
+    def on_signal_mode_toggled(self):
+        # 켜면 백그라운드 스레드가 SIGNAL_REFRESH_SEC초마다 전체 종목 전략 신호를 다시 스캔해 목록을 바꿈
+        self._signal_on = self.signal_mode.get()
+        self._signal_wake.set()
+        if self._signal_on and (self._signal_thread is None or not self._signal_thread.is_alive()):
+            self._signal_thread = threading.Thread(target=self._signal_worker, daemon=True)
+            self._signal_thread.start()
+        elif not self._signal_on:
+            self.populate_top_tickers()
+
+    def _signal_worker(self):
+        while self._signal_on:
+            self._signal_wake.clear()
+            try:
+                signals = self.master_app.strategy_signal_tickers()
+                if signals is None:
+                    print("⏳ 스크리너 캔들을 채우는 중이라 전략 신호 스캔을 건너뜁니다.")
+                else:
+                    self.after(0, self._show_signals, signals)
+            except (TclError, RuntimeError):
+                break   # 창이 닫혔거나 앱 종료로 프로세스 풀이 정리됨
+            except Exception as e:
+                print(f"❗️ 전략 신호 스캔 중 오류: {e}")
+            self._signal_wake.wait(self.SIGNAL_REFRESH_SEC)
+
+    def _show_signals(self, signals):
+        if not self._signal_on or not self.winfo_exists(): return
+        selected = self.selected_market()
+        self.listed_markets = [market for market, _ in signals]
+        self.ticker_listbox.delete(0, END)
+        for market, reason in signals:
+            display_name = self.master_app.ticker_to_display_name.get(market, market)
+            self.ticker_listbox.insert(END, f"{display_name}  [{reason}]")
+        self.restore_selection(selected)
+        print(f"✅ 전략 신호 종목 {len(signals)}개를 리스트에 업데이트했습니다.")
+
+    def selected_market(self):
+        indices = self.ticker_listbox.curselection()
+        if indices and indices[0] < len(self.listed_markets):
+            return self.listed_markets[indices[0]]
+        return None
+
+    def destroy(self):
+        self._signal_on = False
+        self._signal_wake.set()
+        super().destroy()
+
     def load_settings(self):
         s = self.master_app.auto_trade_settings
         self.vars['investment_amount'].set(str(s.get('investment_amount', 5000)))
         self.vars['max_additional_buys'].set(str(s.get('max_additional_buys', 5)))
         self.populate_top_tickers()
 
-    def restore_selection(self):
-        s = self.master_app.auto_trade_settings
-        enabled_tickers = s.get('enabled_tickers', [])
-        if not enabled_tickers: return
-        selected_ticker = enabled_tickers[0] 
-        for i in range(self.ticker_listbox.size()):
-            display_name = self.ticker_listbox.get(i)
-            if self.master_app.display_name_to_ticker.get(display_name) == selected_ticker:
-                self.ticker_listbox.selection_set(i); self.ticker_listbox.activate(i); break
+    def restore_selection(self, selected_ticker=None):
+        if selected_ticker is None:
+            enabled_tickers = self.master_app.auto_trade_settings.get('enabled_tickers', [])
+            if not enabled_tickers: return
+            selected_ticker = enabled_tickers[0]
+        if selected_ticker in self.listed_markets:
+            i = self.listed_markets.index(selected_ticker)
+            self.ticker_listbox.selection_set(i); self.ticker_listbox.activate(i)
 
     def save_and_close(self):
         try:
             new_settings = {}; selected_ticker_for_chart = None
-            selected_indices = self.ticker_listbox.curselection()
             enabled_tickers = []
-            if selected_indices:
-                display_name = self.ticker_listbox.get(selected_indices[0])
-                ticker = self.master_app.display_name_to_ticker.get(display_name)
-                if ticker: enabled_tickers.append(ticker); selected_ticker_for_chart = ticker
+            ticker = self.selected_market()
+            if ticker: enabled_tickers.append(ticker); selected_ticker_for_chart = ticker
             new_settings['enabled_tickers'] = enabled_tickers
             amount = int(self.vars['investment_amount'].get())
             if amount < 5000:
@@ -0,0 +1,264 @@
+import re
+import time
+import random
+import heapq
+import itertools
+import threading
+from functools import wraps
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+import pyupbit.request_api as request_api
+from pyupbit.errors import error_handler
+
+# -----------------------------------------------------------------------------
+# 업비트 요청 그룹별 전역 속도 제한 + 우선순위 스케줄러
+# -----------------------------------------------------------------------------
+# 업비트 요청 수 제한 (초당, IP/계정 기준). Remaining-Req 헤더를 받으면 그 값에 맞춰 줄여서 사용합니다.
+GROUP_RATES = {
+    'market': 10, 'candles': 10, 'ticker': 10, 'trade': 10, 'orderbook': 10,
+    'default': 30, 'order': 8,
+}
+
+# 숫자가 작을수록 먼저 처리
+PRIORITY_ORDER = 0      # 주문 (매수/매도/취소)
+PRIORITY_ACCOUNT = 1    # 잔고/주문 확인
+PRIORITY_NORMAL = 2     # 현재가, 포트폴리오, 마켓 목록, 전략 계산
+PRIORITY_BACKFILL = 3   # 과거 차트 불러오기, 거래내역 동기화 등 급하지 않은 작업
+
+# 그룹별 (연결, 응답) 타임아웃(초). 호출 시 timeout을 직접 주면 그 값을 사용
+GROUP_TIMEOUTS = {
+    'market': (3, 10), 'candles': (3, 10), 'ticker': (3, 5), 'trade': (3, 5), 'orderbook': (3, 5),
+    'default': (3, 10), 'order': (3, 10),
+}
+MAX_RETRIES = 3
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+REMAINING_REQ_PATTERN = re.compile(r"group=([a-z\-]+); (?:min=([0-9]+); )?sec=([0-9]+)")
+
+
+def request_group(method, url):
+    """요청 URL/메서드로 업비트 요청 그룹을 판별."""
+    path = urlparse(url).path
+    if path.startswith('/v1/market'):
+        return 'market'
+    if path.startswith('/v1/candles'):
+        return 'candles'
+    if path.startswith('/v1/ticker'):
+        return 'ticker'
+    if path.startswith('/v1/trades'):
+        return 'trade'
+    if path.startswith('/v1/orderbook'):
+        return 'orderbook'
+    if path.startswith('/v1/order') and method in ('POST', 'DELETE'):
+        return 'order'
+    return 'default'
+
+
+def create_session(pool_size=20):
+    """keep-alive 연결 풀을 쓰는 공용 세션. 업비트는 쿠키를 쓰지 않으므로 여러 스레드가 함께 사용해도 됩니다."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Accept': 'application/json', 'Accept-Encoding': 'gzip, deflate',
+                            'Connection': 'keep-alive'})
+    return session
+
+
+def retry_delay(attempt):
+    """지수 백오프 + 지터 (여러 스레드가 동시에 재시도하지 않도록)."""
+    base = 0.3 * (2 ** attempt)
+    return base + random.uniform(0, base)
+
+
+class TokenBucket:
+    def __init__(self, rate):
+        self.rate = rate
+        self.capacity = rate
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now):
+        """토큰 1개를 쓸 수 있을 때까지 남은 시간(초). 0이면 바로 사용 가능."""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RequestScheduler:
+    """
+    모든 업비트 REST 요청이 거쳐가는 전역 스케줄러.
+    그룹별 토큰 버킷으로 초당 요청 수를 지키고, 토큰을 기다리는 요청은 우선순위 → 도착 순서로 처리합니다.
+    """
+    def __init__(self, rates=None, session=None):
+        self.session = session or create_session()
+        self.buckets = {group: TokenBucket(rate) for group, rate in (rates or GROUP_RATES).items()}
+        self._waiters = {group: [] for group in self.buckets}   # group -> heap[(priority, seq)]
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self.order_listeners = []   # 주문 요청(POST/DELETE /v1/order...) 완료 후 호출할 콜백
+        self.response_listeners = []   # 모든 응답마다 호출할 콜백 (서버 시각 추정 등)
+
+    # --- 우선순위 지정 ------------------------------------------------------
+    def current_priority(self):
+        return getattr(self._local, 'priority', PRIORITY_NORMAL)
+
+    def priority(self, priority):
+        """with scheduler.priority(PRIORITY_BACKFILL): ... 블록 안의 요청에 우선순위를 지정."""
+        scheduler = self
+
+        class _PriorityContext:
+            def __enter__(self):
+                self.previous = scheduler.current_priority()
+                scheduler._local.priority = priority
+
+            def __exit__(self, *exc):
+                scheduler._local.priority = self.previous
+        return _PriorityContext()
+
+    # --- 토큰 획득 ----------------------------------------------------------
+    def acquire(self, group, priority=None):
+        group = group if group in self.buckets else 'default'
+        priority = self.current_priority() if priority is None else priority
+        bucket, waiters = self.buckets[group], self._waiters[group]
+        entry = (priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(waiters, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    bucket.refill(now)
+                    wait = bucket.wait_time(now)
+                    if waiters[0] == entry and wait == 0:
+                        heapq.heappop(waiters)
+                        bucket.tokens -= 1
+                        return
+                    self._cond.wait(wait if waiters[0] == entry else None)
+            finally:
+                if entry in waiters:
+                    waiters.remove(entry)
+                    heapq.heapify(waiters)
+                self._cond.notify_all()
+
+    def observe(self, group, response):
+        """응답의 Remaining-Req / 429 상태를 반영해 버킷을 조정."""
+        matched = REMAINING_REQ_PATTERN.search(response.headers.get('Remaining-Req', ''))
+        with self._cond:
+            if matched and matched.group(1) in self.buckets:
+                group = matched.group(1)
+            bucket = self.buckets.get(group, self.buckets['default'])
+            now = time.monotonic()
+            bucket.refill(now)
+            if matched:
+                remaining_sec = int(matched.group(3))
+                # 다른 프로세스/앱이 같은 키로 요청 중일 수 있으므로 서버가 알려준 잔여량을 넘지 않게
+                bucket.tokens = min(bucket.tokens, float(remaining_sec))
+            if response.status_code == 429:
+                bucket.tokens = 0.0
+                bucket.blocked_until = now + 1.0
+                print(f"⏳ 업비트 요청 제한 초과({group}) - 1초 대기합니다.")
+            self._cond.notify_all()
+
+    def _notify_order(self, method, url, response):
+        for listener in list(self.order_listeners):
+            try:
+                listener(method, url, response)
+            except Exception as e:
+                print(f"❗️ 주문 이벤트 처리 오류: {e}")
+
+    def _notify_response(self, method, url, response):
+        for listener in list(self.response_listeners):
+            try:
+                listener(method, url, response)
+            except Exception as e:
+                print(f"❗️ 응답 이벤트 처리 오류: {e}")
+
+    # --- 요청 ---------------------------------------------------------------
+    def request(self, method, url, priority=None, **kwargs):
+        method = method.upper()
+        group = request_group(method, url)
+        if group == 'order' and priority is None:
+            priority = PRIORITY_ORDER
+        kwargs.setdefault('timeout', GROUP_TIMEOUTS.get(group, GROUP_TIMEOUTS['default']))
+        # GET은 멱등이라 오류/5xx에 재시도. 주문(POST/DELETE)은 서버에 도달하지 않은 게 확실한 경우(연결 실패, 429)만 재시도
+        is_idempotent = method == 'GET'
+        for attempt in range(MAX_RETRIES + 1):
+            self.acquire(group, priority)
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectTimeout, requests.exceptions.ConnectionError,
+                    requests.exceptions.ReadTimeout) as e:
+                is_safe = is_idempotent or isinstance(e, requests.exceptions.ConnectTimeout)
+                if attempt >= MAX_RETRIES or not is_safe:
+                    raise
+                time.sleep(retry_delay(attempt))
+                continue
+            self.observe(group, response)
+            self._notify_response(method, url, response)
+            if group == 'order':
+                self._notify_order(method, url, response)
+            is_retryable = response.status_code == 429 or (is_idempotent and response.status_code in RETRY_STATUS)
+            if not is_retryable or attempt >= MAX_RETRIES:
+                return response
+            time.sleep(retry_delay(attempt))
+        return response
+
+
+scheduler = RequestScheduler()
+
+
+def get(url, **kwargs):
+    return scheduler.request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    return scheduler.request('POST', url, **kwargs)
+
+
+def delete(url, **kwargs):
+    return scheduler.request('DELETE', url, **kwargs)
+
+
+def request_priority(priority):
+    return scheduler.priority(priority)
+
+
+def with_priority(priority):
+    """메서드 안에서 발생하는 모든 요청에 우선순위를 지정하는 데코레이터."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with scheduler.priority(priority):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def add_order_listener(listener):
+    """주문 요청이 끝날 때마다 listener(method, url, response)를 호출 (잔고 캐시 갱신 등)."""
+    scheduler.order_listeners.append(listener)
+
+
+def add_response_listener(listener):
+    """모든 REST 응답마다 listener(method, url, response)를 호출 (Date 헤더로 서버 시각 추정 등)."""
+    scheduler.response_listeners.append(listener)
+
+
+def install():
+    """pyupbit 내부 HTTP 호출(request_api._call_get/post/delete)을 전역 스케줄러로 돌립니다."""
+    if getattr(request_api, '_scheduled', False):
+        return
+    request_api._call_get = error_handler(get)
+    request_api._call_post = error_handler(post)
+    request_api._call_delete = error_handler(delete)
+    request_api._scheduled = True
@@ -0,0 +1,259 @@
+import os
+import json
+import time
+import uuid
+import random
+import threading
+
+import websocket  # websocket-client
+
+# -----------------------------------------------------------------------------
+# 업비트 실시간 시세(WebSocket) 구독
+# -----------------------------------------------------------------------------
+# UPBIT_WS_URL 환경변수로 접속 주소를 바꿀 수 있습니다. (예: 로컬 테스트 서버 ws://127.0.0.1:8765)
+UPBIT_WS_URL = os.environ.get("UPBIT_WS_URL", "wss://api.upbit.com/websocket/v1")
+
+
+class UpbitRealtimeFeed:
+    """
+    업비트 ticker/trade 채널을 구독하는 백그라운드 WebSocket 클라이언트.
+    연결이 끊기면 지수 백오프로 재접속하고, 접속될 때마다 현재 구독 종목을 다시 요청합니다.
+    콜백은 워커 스레드에서 호출되므로 GUI 갱신은 data_queue를 거쳐야 합니다.
+    """
+    def __init__(self, on_ticker=None, on_trade=None, on_reconnect=None, url=None,
+                 channels=("ticker", "trade"), max_backoff=30):
+        self.url = url or UPBIT_WS_URL
+        self.channels = tuple(channels)
+        self.on_ticker = on_ticker
+        self.on_trade = on_trade
+        self.on_reconnect = on_reconnect  # 재접속 시 호출 (끊긴 동안 놓친 체결이 있을 수 있음)
+        self.max_backoff = max_backoff
+        self.codes = []
+        self.last_price = {}          # code -> 마지막 체결가
+        self.last_message_time = None
+        self.is_connected = False
+        self._connect_count = 0
+        self._ws = None
+        self._running = False
+        self._thread = None
+        self._lock = threading.Lock()
+
+    # --- 구독 관리 ---------------------------------------------------------
+    def set_codes(self, codes):
+        """구독 종목을 교체합니다. 연결 중이면 즉시 새 구독 요청을 보냅니다."""
+        codes = sorted(set(c for c in codes if c))
+        with self._lock:
+            if codes == self.codes:
+                return
+            self.codes = codes
+        self._send_subscription()
+
+    def _subscription_message(self):
+        request = [{"ticket": str(uuid.uuid4())}]
+        for channel in self.channels:
+            request.append({"type": channel, "codes": list(self.codes)})
+        return json.dumps(request)
+
+    def _send_subscription(self):
+        ws = self._ws
+        if ws is None or not self.is_connected or not self.codes:
+            return
+        try:
+            ws.send(self._subscription_message())
+        except Exception as e:
+            print(f"❗️ 실시간 시세 구독 요청 실패: {e}")
+
+    # --- 수명 관리 ---------------------------------------------------------
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        ws = self._ws
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+
+    def _run(self):
+        backoff = 1
+        while self._running:
+            opened_at = None
+            self._ws = websocket.WebSocketApp(
+                self.url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close,
+            )
+            try:
+                opened_at = time.time()
+                # 업비트는 120초간 송수신이 없으면 연결을 끊으므로 주기적으로 ping
+                self._ws.run_forever(ping_interval=30, ping_timeout=10)
+            except Exception as e:
+                print(f"❗️ 실시간 시세 연결 오류: {e}")
+            self.is_connected = False
+            if not self._running:
+                break
+            # 한동안 정상 연결되어 있었다면 백오프 초기화
+            if opened_at and time.time() - opened_at > 60:
+                backoff = 1
+            delay = backoff + random.uniform(0, backoff / 2)
+            print(f"🔌 실시간 시세 연결 끊김 - {delay:.1f}초 후 재접속합니다.")
+            time.sleep(delay)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    # --- WebSocketApp 콜백 -------------------------------------------------
+    def _on_open(self, ws):
+        self.is_connected = True
+        self._connect_count += 1
+        print("✅ 실시간 시세 연결 성공")
+        self._send_subscription()
+        if self._connect_count > 1 and self.on_reconnect:
+            try:
+                self.on_reconnect()
+            except Exception as e:
+                print(f"❗️ 실시간 시세 재접속 처리 오류: {e}")
+
+    def _on_message(self, ws, message):
+        if isinstance(message, bytes):
+            message = message.decode("utf-8")
+        try:
+            data = json.loads(message)
+        except ValueError:
+            return
+        if not isinstance(data, dict):
+            return
+        self.last_message_time = time.time()
+        msg_type, code = data.get("type"), data.get("code")
+        if "trade_price" in data and code:
+            self.last_price[code] = data["trade_price"]
+        try:
+            if msg_type == "ticker" and self.on_ticker:
+                self.on_ticker(data)
+            elif msg_type == "trade" and self.on_trade:
+                self.on_trade(data)
+        except Exception as e:
+            print(f"❗️ 실시간 시세 콜백 오류: {e}")
+
+    def _on_error(self, ws, error):
+        print(f"❗️ 실시간 시세 오류: {error}")
+
+    def _on_close(self, ws, status_code, msg):
+        self.is_connected = False
+
+
+# -----------------------------------------------------------------------------
+# 오프라인 테스트용 로컬 업비트 WebSocket 대체 서버
+# -----------------------------------------------------------------------------
+class MockUpbitServer:
+    """
+    업비트 WebSocket과 같은 형식(바이너리 JSON)으로 가짜 ticker/trade 메시지를 보내는 로컬 서버.
+    UPBIT_WS_URL=ws://127.0.0.1:8765 로 앱을 실행하면 실제 서버 없이 실시간 시세를 확인할 수 있습니다.
+    drop_connections()로 접속을 강제로 끊어 재접속/재구독 동작을 확인할 수 있습니다.
+    """
+    def __init__(self, host="127.0.0.1", port=8765, tick_interval=0.05, start_price=100_000_000):
+        self.host, self.port = host, port
+        self.tick_interval = tick_interval
+        self.start_price = start_price
+        self.prices = {}
+        self.subscriptions = []       # 받은 구독 요청 기록
+        self._connections = set()
+        self._server = None
+        self._sequence = 0
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self):
+        from websockets.sync.server import serve
+        self._server = serve(self._handler, self.host, self.port)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+
+    def drop_connections(self):
+        for conn in list(self._connections):
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _make_messages(self, code):
+        price = self.prices.get(code, self.start_price)
+        price = max(1, round(price * (1 + random.gauss(0, 0.0005))))
+        self.prices[code] = price
+        now_ms = int(time.time() * 1000)
+        volume = round(random.uniform(0.0001, 0.5), 8)
+        self._sequence += 1
+        trade = {
+            "type": "trade", "code": code, "trade_price": price, "trade_volume": volume,
+            "ask_bid": random.choice(["ASK", "BID"]), "trade_timestamp": now_ms,
+            "timestamp": now_ms, "sequential_id": self._sequence, "stream_type": "REALTIME",
+        }
+        ticker = {
+            "type": "ticker", "code": code, "trade_price": price, "trade_volume": volume,
+            "signed_change_rate": 0.0, "acc_trade_price_24h": 0.0,
+            "trade_timestamp": now_ms, "timestamp": now_ms, "stream_type": "REALTIME",
+        }
+        return trade, ticker
+
+    def _handler(self, conn):
+        self._connections.add(conn)
+        subscribed = {}
+        try:
+            while True:
+                try:
+                    raw = conn.recv(timeout=self.tick_interval)
+                    request = json.loads(raw)
+                    self.subscriptions.append(request)
+                    subscribed = {item["type"]: item.get("codes", []) for item in request if "type" in item}
+                except TimeoutError:
+                    pass
+                for code in set(c for codes in subscribed.values() for c in codes):
+                    trade, ticker = self._make_messages(code)
+                    if "trade" in subscribed:
+                        conn.send(json.dumps(trade).encode("utf-8"))
+                    if "ticker" in subscribed:
+                        conn.send(json.dumps(ticker).encode("utf-8"))
+        except Exception:
+            pass
+        finally:
+            self._connections.discard(conn)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="업비트 실시간 시세 WebSocket 확인")
+    parser.add_argument("--mock", action="store_true", help="로컬 대체 서버로 접속")
+    parser.add_argument("--code", default="KRW-BTC")
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    server = MockUpbitServer().start() if args.mock else None
+    counts = {"ticker": 0, "trade": 0}
+    feed = UpbitRealtimeFeed(
+        on_ticker=lambda m: counts.__setitem__("ticker", counts["ticker"] + 1),
+        on_trade=lambda m: counts.__setitem__("trade", counts["trade"] + 1),
+        url=server.url if server else None,
+    )
+    feed.set_codes([args.code])
+    feed.start()
+    time.sleep(args.seconds / 2)
+    if server:
+        server.drop_connections()  # 재접속/재구독 확인
+    time.sleep(args.seconds / 2)
+    feed.stop()
+    print(f"ticker {counts['ticker']}건, trade {counts['trade']}건, 마지막 체결가 {feed.last_price.get(args.code)}")
+    if server:
+        server.stop()